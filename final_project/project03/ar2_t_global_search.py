@@ -171,28 +171,24 @@ def from_est_ar2_t(est):
 
   return theta
 
-if __name__ == "__main__":
-  # Make output directory
-  outdir = Path("ar2_t_model_results")
-  outdir.mkdir(parents=True, exist_ok=True)
-
-  # run the global search
-  output = run_global_search(ys = ys,
-        n_starts=260,
-        reps = 10,
-        rinit = rinit_ar2,
-        rproc = rproc_filt_ar2,
-        dmeas = dmeas_t_errors,
-        to_est = to_est_ar2_t,
-        from_est = from_est_ar2_t,
-        covars = covars,
-        statenames = statenames,
-        J1 = 2000,
-        J2 = 2000,
-        J3 = 2000,
-        M1 = 50,
-        M2 = 250,
-         theta = {
+# settings for the global search, shared with run_all_global_searches.py
+global_search_args = dict(
+  ys = ys,
+  n_starts=260,
+  reps = 10,
+  rinit = rinit_ar2,
+  rproc = rproc_filt_ar2,
+  dmeas = dmeas_t_errors,
+  to_est = to_est_ar2_t,
+  from_est = from_est_ar2_t,
+  covars = covars,
+  statenames = statenames,
+  J1 = 2000,
+  J2 = 2000,
+  J3 = 2000,
+  M1 = 50,
+  M2 = 250,
+  theta = {
     "sigma_nu": .01,
     "mu_h": -0.1,
     "phi_1": .95,
@@ -202,7 +198,7 @@ if __name__ == "__main__":
     "H_0": 0.1,
     "nu": 5.0
   },
-        grid = {
+  grid = {
     "sigma_nu":  (0.002, 0.01),
     "mu_h":      (-3, 3),
     "phi_1":       (-0.95, 0.95),
@@ -211,18 +207,27 @@ if __name__ == "__main__":
     "G_0":       (-5, 5),
     "H_0":       (-5, 5),
     "nu": (2.5, 8)
-    },
-    sigmas = {
-        "sigma_nu":  rw_sd_rp,
-        "mu_h":      rw_sd_rp,
-        "phi_1":       rw_sd_rp,
-        "phi_2":       rw_sd_rp,
-        "sigma_eta": rw_sd_rp,
-        "G_0":       rw_sd_ivp,
-        "H_0":       rw_sd_ivp,
-        "nu": .1
-    }
-    )
+  },
+  sigmas = {
+    "sigma_nu":  rw_sd_rp,
+    "mu_h":      rw_sd_rp,
+    "phi_1":       rw_sd_rp,
+    "phi_2":       rw_sd_rp,
+    "sigma_eta": rw_sd_rp,
+    "G_0":       rw_sd_ivp,
+    "H_0":       rw_sd_ivp,
+    "nu": .1
+  },
+)
+
+
+if __name__ == "__main__":
+  # Make output directory
+  outdir = Path("ar2_t_model_results")
+  outdir.mkdir(parents=True, exist_ok=True)
+
+  # run the global search
+  output = run_global_search(**global_search_args)
 
   outfile = outdir / "ar2_t_global_search.pkl"
   with open(outfile, "wb") as f:
@@ -105,35 +105,40 @@ rw_sd_ivp = 0.1
 cooling_fraction_50 = 0.5
 
 
-if __name__ == "__main__":
-  # Make output directory
-  outdir = Path("basic_model_results")
-  outdir.mkdir(parents=True, exist_ok=True)
-
-  # run the global search
-  output = run_global_search(ys = ys,
-        n_starts=250,
-        reps = 10,
-        rinit = rinit_basic,
-        rproc = rproc_filt_basic,
-        dmeas = dmeas_basic,
-        to_est = to_est_basic,
-        from_est = from_est_basic,
-        covars = covars,
-        J1 = 2000,
-        J2 = 2000,
-        J3 = 2000,
-        M1 = 50,
-        M2 = 250,
-        grid = {
+# settings for the global search, shared with run_all_global_searches.py
+global_search_args = dict(
+  ys = ys,
+  n_starts=250,
+  reps = 10,
+  rinit = rinit_basic,
+  rproc = rproc_filt_basic,
+  dmeas = dmeas_basic,
+  to_est = to_est_basic,
+  from_est = from_est_basic,
+  covars = covars,
+  J1 = 2000,
+  J2 = 2000,
+  J3 = 2000,
+  M1 = 50,
+  M2 = 250,
+  grid = {
     "sigma_nu":  (0.002, 0.05),
     "mu_h":      (-5, 5),
     "phi":       (0.01, 0.99),
     "sigma_eta": (0.1, 5),
     "G_0":       (-5, 5),
     "H_0":       (-5, 5),
-    }
-    )
+  },
+)
+
+
+if __name__ == "__main__":
+  # Make output directory
+  outdir = Path("basic_model_results")
+  outdir.mkdir(parents=True, exist_ok=True)
+
+  # run the global search
+  output = run_global_search(**global_search_args)
 
   outfile = outdir / "basic_global_search.pkl"
   with open(outfile, "wb") as f:
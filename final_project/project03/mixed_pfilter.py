@@ -0,0 +1,95 @@
+import jax
+import jax.numpy as jnp
+
+# A particle filter for the SV models (any pypomp-style rinit / rproc /
+# dmeas on dicts) whose precision can be chosen. With "float32" the particle
+# states, covariates and weights are float32, halving the memory traffic of
+# the resampling and state updates, while every log-likelihood increment is
+# formed and summed in float64. That needs x64, which importing this module
+# does not turn on: call enable_x64() first (make_pfilter checks).
+#
+# Timing follows pypomp with t0 = 0, nstep = 1 and unit spaced observations:
+# the step to observation n uses the covariates at time n - 1, dmeas the
+# covariates at time n. covars must be indexed by 0..N like the project03
+# scripts build it.
+
+
+def enable_x64():
+  jax.config.update("jax_enable_x64", True)
+
+
+PRECISIONS = {"float64": jnp.float64, "float32": jnp.float32}
+
+
+def make_pfilter(rinit, rproc, dmeas, ys, covars, J, precision = "float64"):
+  # returns a jitted pfilter(theta, key) -> float64 log-likelihood
+  if not jax.config.jax_enable_x64:
+    raise RuntimeError("make_pfilter needs x64, call enable_x64() first")
+  dtype = PRECISIONS[precision]
+  obs = {c: jnp.asarray(ys[c].to_numpy(), dtype) for c in ys.columns}
+  times = jnp.asarray(ys.index.to_numpy(), dtype)
+  cov = {} if covars is None else {
+    c: jnp.asarray(covars[c].to_numpy(), dtype) for c in covars.columns}
+  n_obs = len(ys)
+
+  def cast(tree):
+    return jax.tree_util.tree_map(lambda a: jnp.asarray(a, dtype), tree)
+
+  def in_precision(fn):
+    # in float32 mode the model code is traced with x64 off, so the normals
+    # it draws and its constants are float32 rather than float64 draws
+    # cast down afterwards
+    if precision == "float64":
+      return fn
+    def wrapped(*args):
+      with jax.enable_x64(False):
+        return fn(*args)
+    return wrapped
+
+  rinit_, rproc_, dmeas_ = map(in_precision, (rinit, rproc, dmeas))
+
+  def resample(key, w):
+    u = (jax.random.uniform(key, dtype=dtype)
+      + jnp.arange(J, dtype=dtype)) / J
+    # a float32 cumsum can end short of 1, which would send the largest
+    # positions to the last particle; normalize it to end at exactly 1
+    cs = jnp.cumsum(w)
+    idx = jnp.searchsorted(cs / cs[-1], u)
+    return jnp.minimum(idx, J - 1)
+
+  @jax.jit
+  def pfilter(theta, key):
+    theta = cast(theta)
+    key, k0 = jax.random.split(key)
+    cov0 = {c: v[0] for c, v in cov.items()}
+    X = jax.vmap(lambda k: cast(rinit_(theta, k, cov0, 0.0)))(
+      jax.random.split(k0, J))
+
+    def step(carry, n):
+      X, key, loglik = carry
+      key, kp, kr = jax.random.split(key, 3)
+      t = times[n]
+      cov_start = {c: v[n] for c, v in cov.items()}
+      cov_t = {c: v[n + 1] for c, v in cov.items()}
+      X = jax.vmap(
+        lambda x, k: cast(rproc_(x, theta, k, cov_start, t - 1.0, 1.0)))(
+        X, jax.random.split(kp, J))
+
+      y_t = {c: v[n] for c, v in obs.items()}
+      log_w = jax.vmap(lambda x: dmeas_(y_t, x, theta, cov_t, t))(X)
+      log_w = log_w.astype(dtype)
+      max_lw = jnp.max(log_w)
+      w = jnp.exp(log_w - max_lw)
+      sum_w = jnp.sum(w)
+      loglik = (loglik + max_lw.astype(jnp.float64)
+        + jnp.log(sum_w.astype(jnp.float64) / J))
+
+      idx = resample(kr, w / sum_w)
+      X = jax.tree_util.tree_map(lambda a: a[idx], X)
+      return (X, key, loglik), None
+
+    (X, key, loglik), _ = jax.lax.scan(
+      step, (X, key, jnp.float64(0.0)), jnp.arange(n_obs))
+    return loglik
+
+  return pfilter
@@ -0,0 +1,127 @@
+import argparse
+import pickle
+import time
+from pathlib import Path
+
+import jax
+import pandas as pd
+
+from search_helpers import run_global_search
+from start_designs import DESIGNS
+from search_output import RETENTION, save_search
+from sv_models import MODELS, search_args as model_search_args
+
+# Runs the global search for every stochastic-volatility variant in one
+# process. Compiled executables are written to a persistent JAX cache, so
+# a second sweep (or a crashed one restarted) loads them from disk instead
+# of recompiling. Compile time is reported separately from run time.
+
+# monitoring events JAX records while tracing, lowering and compiling
+# (backend compile also covers loading an executable from the cache)
+COMPILE_EVENTS = (
+  "/jax/core/compile/jaxpr_trace_duration",
+  "/jax/core/compile/jaxpr_to_mlir_module_duration",
+  "/jax/core/compile/backend_compile_duration",
+)
+
+compile_stats = {"compile_time": 0.0, "cache_hits": 0, "cache_misses": 0}
+
+
+def record_duration(event, duration, **kwargs):
+  if event in COMPILE_EVENTS:
+    compile_stats["compile_time"] += duration
+
+
+def record_event(event, **kwargs):
+  if event == "/jax/compilation_cache/cache_hits":
+    compile_stats["cache_hits"] += 1
+  elif event == "/jax/compilation_cache/cache_misses":
+    compile_stats["cache_misses"] += 1
+
+
+def enable_compilation_cache(cache_dir):
+  Path(cache_dir).mkdir(parents=True, exist_ok=True)
+  jax.config.update("jax_compilation_cache_dir", str(cache_dir))
+  # cache every executable, not only the ones that took > 1s to compile
+  jax.config.update("jax_persistent_cache_min_compile_time_secs", 0)
+  jax.monitoring.register_event_duration_secs_listener(record_duration)
+  jax.monitoring.register_event_listener(record_event)
+
+
+def run_model(name, n_starts = None, halving = False, design = "uniform",
+    design_cache = None, trace_retention = "full"):
+  search_args = model_search_args(name, halving = halving, design = design,
+    cache_dir = design_cache, trace_retention = trace_retention)
+  if n_starts is not None:
+    search_args["n_starts"] = n_starts
+
+  for k in compile_stats:
+    compile_stats[k] = 0
+  start_time = time.time()
+  output = run_global_search(**search_args)
+  total_time = time.time() - start_time
+
+  timing = {
+    "model": name,
+    "n_starts": search_args["n_starts"],
+    "compile_time": compile_stats["compile_time"],
+    "run_time": total_time - compile_stats["compile_time"],
+    "total_time": total_time,
+    "cache_hits": compile_stats["cache_hits"],
+    "cache_misses": compile_stats["cache_misses"],
+  }
+  output["timing"] = timing
+  return output
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description = "Run the global search for several SV models in one process")
+  parser.add_argument("--models", nargs = "+", choices = MODELS,
+    default = MODELS)
+  parser.add_argument("--cache-dir", default = ".jax_cache")
+  parser.add_argument("--n-starts", type = int, default = None,
+    help = "override the number of starts of every model (e.g. quick sweeps)")
+  parser.add_argument("--halving", action = "store_true",
+    help = "successive-halving mode of run_global_search")
+  parser.add_argument("--design", choices = DESIGNS, default = "uniform")
+  parser.add_argument("--design-cache", default = None,
+    help = "directory of evaluated designs; reruns with more starts only "
+      "evaluate the new ones")
+  parser.add_argument("--trace-retention", choices = RETENTION,
+    default = "full")
+  parser.add_argument("--format", choices = ["pickle", "npy"],
+    default = "pickle",
+    help = "npy writes a directory of memory-mappable arrays, "
+      "read back with search_output.load_search")
+  args = parser.parse_args()
+
+  enable_compilation_cache(args.cache_dir)
+
+  timings = []
+  for name in args.models:
+    output = run_model(name, n_starts = args.n_starts,
+      halving = args.halving, design = args.design,
+      design_cache = args.design_cache,
+      trace_retention = args.trace_retention)
+    t = output["timing"]
+    timings.append(t)
+
+    outdir = Path(f"{name}_model_results")
+    outdir.mkdir(parents=True, exist_ok=True)
+    if args.format == "npy":
+      outfile = outdir / f"{name}_global_search"
+      save_search(output, outfile)
+    else:
+      outfile = outdir / f"{name}_global_search.pkl"
+      with open(outfile, "wb") as f:
+        pickle.dump(output, f)
+
+    print(f"{name}: compile {t['compile_time']:.2f}s, "
+      f"run {t['run_time']:.2f}s "
+      f"(cache hits {t['cache_hits']}, misses {t['cache_misses']})")
+    print(f"Saved results to: {outfile}")
+
+  timings = pd.DataFrame(timings)
+  timings.to_csv("global_search_timings.csv", index = False)
+  print(timings.to_string(index = False))
@@ -5,12 +5,61 @@ import pypomp as pp
 import jax
 import time
 
+from start_designs import (
+    draw_starts, design_key, content_hash, load_design_cache,
+    save_design_cache,
+)
+from search_output import retain_traces
+
 from pypomp.types import (
     StateDict, ParamDict, CovarDict,
     TimeFloat, StepSizeFloat, RNGKey,
     ObservationDict, InitialTimeFloat,
 )
 
+# defaults of the basic Breto model, used when a search is not given its
+# own theta / sigmas / grid
+rw_sd_rp = 0.02
+rw_sd_ivp = 0.1
+
+DEFAULT_THETA = {
+  "sigma_nu": .01,
+  "mu_h": -0.1,
+  "phi": .95,
+  "sigma_eta":.9,
+  "G_0": 0.0,
+  "H_0": 0.0,
+}
+
+DEFAULT_SIGMAS = {
+  "sigma_nu":  rw_sd_rp,
+  "mu_h":      rw_sd_rp,
+  "phi":       rw_sd_rp,
+  "sigma_eta": rw_sd_rp,
+  "G_0":       rw_sd_ivp,
+  "H_0":       rw_sd_ivp,
+}
+
+DEFAULT_GRID = {
+  "sigma_nu": (0.005, 0.05),
+  "mu_h": (-1.0, 1.0),
+  "phi": (0.9, 0.99),
+  "sigma_eta": (0.5, 2.0),
+  "G_0": (-1.0, 1.0),
+  "H_0": (-1.0, 1.0),
+}
+
+
+# defined once at module level so repeated searches in one process
+# (see run_all_global_searches.py) reuse the same traced function
+def rmeas(X_: StateDict, theta_: ParamDict,
+      key: RNGKey, covars: CovarDict,
+      t: TimeFloat):
+  H = X_["H"]
+  return jnp.array(
+      [jax.random.normal(key) * jnp.exp(H / 2)])
+
+
 # local search
 
 def run_local_search(ys,
@@ -28,42 +77,25 @@ def run_local_search(ys,
   init_names = ["G_0", "H_0"],
   statenames = ["H", "G", "Y_state"],
   a = 0.5, 
-  key = 42):
-    
-  rw_sd_rp = 0.02
-  rw_sd_ivp = 0.1
-  def rmeas(X_: StateDict, theta_: ParamDict,
-        key: RNGKey, covars: CovarDict,
-        t: TimeFloat):
-    H = X_["H"]
-    return jnp.array(
-        [jax.random.normal(key) * jnp.exp(H / 2)])
+  key = 42,
+  rw_sd = None, # prebuilt pp.RWSigma / pp.ParTrans, e.g. from sv_models
+  par_trans = None):
 
   start_time = time.time()
   if theta is None:
-    theta = {
-    "sigma_nu": .01,
-    "mu_h": -0.1,
-    "phi": .95,
-    "sigma_eta":.9,
-    "G_0": 0.0,
-    "H_0": 0.0,
-  }
+    theta = dict(DEFAULT_THETA)
   
   if sigmas is None:
-    sigmas = {
-        "sigma_nu":  rw_sd_rp,
-        "mu_h":      rw_sd_rp,
-        "phi":       rw_sd_rp,
-        "sigma_eta": rw_sd_rp,
-        "G_0":       rw_sd_ivp,
-        "H_0":       rw_sd_ivp,
-    }
+    sigmas = dict(DEFAULT_SIGMAS)
   
   
-  rw_sd_local = pp.RWSigma(sigmas=sigmas, init_names=init_names)
+  rw_sd_local = rw_sd
+  if rw_sd_local is None:
+    rw_sd_local = pp.RWSigma(sigmas=sigmas, init_names=init_names)
   theta_list = [theta.copy() for _ in range(n_local)]
-  par_trans_local = pp.ParTrans(to_est=to_est, from_est=from_est)
+  par_trans_local = par_trans
+  if par_trans_local is None:
+    par_trans_local = pp.ParTrans(to_est=to_est, from_est=from_est)
   
   mod_local = pp.Pomp(
       rinit=rinit, rproc=rproc,
@@ -106,6 +138,15 @@ def run_local_search(ys,
 
 # global search
 
+def halving_schedule(J1, J2, M1, M2, n_rungs):
+  # (J, M) for each successive-halving rung, geometric from (J1, M1)
+  # on the first rung to (J2, M2) on the last
+  frac = np.linspace(0, 1, n_rungs)
+  Js = np.round(J1 * (J2 / J1) ** frac).astype(int)
+  Ms = np.round(M1 * (M2 / M1) ** frac).astype(int)
+  return list(zip(Js.tolist(), Ms.tolist()))
+
+
 def run_global_search(ys,
   n_starts, 
   reps,
@@ -127,101 +168,176 @@ def run_global_search(ys,
   theta = None,
   sigmas = None,
   seed = 42, 
-  key = 42):
-    
-  rw_sd_rp = 0.02
-  rw_sd_ivp = 0.1
-  
-  def rmeas(X_: StateDict, theta_: ParamDict,
-        key: RNGKey, covars: CovarDict,
-        t: TimeFloat):
-    H = X_["H"]
-    return jnp.array(
-        [jax.random.normal(key) * jnp.exp(H / 2)])
-  
-  
+  key = 42,
+  halving = False, # successive halving over the IF2 budget, see below
+  eta = 3,
+  n_rungs = 3,
+  J_score = 500,
+  rw_sd = None, # prebuilt pp.RWSigma / pp.ParTrans, e.g. from sv_models
+  par_trans = None,
+  design = "uniform", # "uniform", "lhs" or "sobol", see start_designs.py
+  cache_dir = None,
+  trace_retention = "full", # see search_output.RETENTION
+  trace_every = 10):
+
   start_time = time.time()
   if theta is None:
-    theta = {
-    "sigma_nu": .01,
-    "mu_h": -0.1,
-    "phi": .95,
-    "sigma_eta":.9,
-    "G_0": 0.0,
-    "H_0": 0.0,
-  }
+    theta = dict(DEFAULT_THETA)
   
   if sigmas is None:
-    sigmas = {
-        "sigma_nu":  rw_sd_rp,
-        "mu_h":      rw_sd_rp,
-        "phi":       rw_sd_rp,
-        "sigma_eta": rw_sd_rp,
-        "G_0":       rw_sd_ivp,
-        "H_0":       rw_sd_ivp,
-    }
+    sigmas = dict(DEFAULT_SIGMAS)
   
   if grid is None:
-    grid = {
-            "sigma_nu": (0.005, 0.05),
-            "mu_h": (-1.0, 1.0),
-            "phi": (0.9, 0.99),
-            "sigma_eta": (0.5, 2.0),
-            "G_0": (-1.0, 1.0),
-            "H_0": (-1.0, 1.0),
-        }
+    grid = dict(DEFAULT_GRID)
   
-  rw_sd_local = pp.RWSigma(sigmas=sigmas, init_names=init_names)
-  par_trans_local = pp.ParTrans(to_est=to_est, from_est=from_est)
-
-  np.random.seed(seed)
-  theta_list = []
-  for i in range(n_starts):
-    th = theta.copy()
-    for pname, bounds in grid.items():
-      low, high = bounds
-      th[pname] = np.random.uniform(low, high)
-    
-    theta_list.append(th)
-
-  mod = pp.Pomp(
-    rinit=rinit, rproc=rproc,
-    dmeas=dmeas, rmeas=rmeas,
-    ys=ys, theta=theta_list,
-    statenames=statenames,
-    par_trans=par_trans_local,
-    t0=0.0, nstep=1,
-    ydim=1, covars=covars)
+  rw_sd_local = rw_sd
+  if rw_sd_local is None:
+    rw_sd_local = pp.RWSigma(sigmas=sigmas, init_names=init_names)
+  par_trans_local = par_trans
+  if par_trans_local is None:
+    par_trans_local = pp.ParTrans(to_est=to_est, from_est=from_est)
+
+  # with a cache_dir, starts that an earlier call with the same grid, seed
+  # and settings already evaluated are loaded instead of rerun
+  n_done = 0
+  cached = None
+  if cache_dir is not None:
+    ckey = design_key(grid, seed, design,
+      data=(content_hash(ys), content_hash(covars)),
+      model=content_hash([rinit, rproc, dmeas, rmeas,
+        par_trans_local.to_est, par_trans_local.from_est]),
+      statenames=statenames, init_names=init_names,
+      reps=reps, J1=J1, J2=J2, J3=J3, M1=M1, M2=M2, a=a, key=key,
+      theta=sorted(theta.items()), sigmas=sorted(sigmas.items()),
+      halving=(halving, eta, n_rungs, J_score) if halving else False)
+    cached = load_design_cache(cache_dir, ckey)
+    if cached is not None:
+      n_done = min(cached["n_starts"], n_starts)
+
+  mif1_traces = mif2_traces = pf = pruned = rung_traces = None
+  new_rows = pd.DataFrame()
+  if n_starts > n_done:
+    starts_design = draw_starts(grid, n_starts - n_done, design=design,
+                                seed=seed, skip=n_done)
+    theta_list = [{**theta, **dict(zip(grid, row.tolist()))}
+      for row in starts_design]
+
+    def build_pomp(theta_list):
+      return pp.Pomp(
+        rinit=rinit, rproc=rproc,
+        dmeas=dmeas, rmeas=rmeas,
+        ys=ys, theta=theta_list,
+        statenames=statenames,
+        par_trans=par_trans_local,
+        t0=0.0, nstep=1,
+        ydim=1, covars=covars)
+
+    mod = build_pomp(theta_list)
     
-  base_key = jax.random.key(key)
-  key1, key2, key3 = jax.random.split(base_key, 3)
-  mod.mif(J=J1, M=M1,
-            rw_sd=rw_sd_local, a=a, key=key1)
-  mif1 = mod.results_history.last()
+    base_key = jax.random.key(key)
+    if n_done > 0:
+      # fresh keys for the starts that extend a cached search
+      base_key = jax.random.fold_in(base_key, n_done)
+    key1, key2, key3 = jax.random.split(base_key, 3)
+    mod.mif(J=J1, M=M1,
+              rw_sd=rw_sd_local, a=a, key=key1)
+    mif1 = mod.results_history.last()
   
-  mod.mif(J=J2, M=M2,
-            rw_sd=rw_sd_local, a=a, key=key2)
-  mif2 = mod.results_history.last()
-
-  mod.pfilter(key=key3, J=J3, reps=reps, ESS = True)
-  pf = mod.results_history.last()
-
-  rows = []
-  for i in range(n_starts):
-    lls = pf.logLiks.values[i, :]
-    rows.append({
-          **mod.theta[i],
-          'loglik': pp.logmeanexp(lls),
-          'loglik_se': pp.logmeanexp_se(lls)
-      })
-  results_df = pd.DataFrame(rows)
+    if halving:
+      # Successive halving: rung 0 is the (J1, M1) round on every start.
+      # After each rung the chains are scored with a single cheap pfilter
+      # (J_score particles) and only the best 1/eta continue, with J and M
+      # growing geometrically up to (J2, M2) on the last rung.
+      if n_rungs < 2:
+        raise ValueError("halving needs n_rungs >= 2")
+      starts = np.arange(n_done, n_starts)
+      records = []
+      rung_traces = [mif1.traces_da]
+      rung_keys = jax.random.split(key2, 2 * (n_rungs - 1))
+      for r, (J_r, M_r) in enumerate(halving_schedule(J1, J2, M1, M2, n_rungs)):
+        if r > 0:
+          mod.mif(J=J_r, M=M_r,
+                    rw_sd=rw_sd_local, a=a, key=rung_keys[2 * r - 1])
+          rung_traces.append(mod.results_history.last().traces_da)
+        if r == n_rungs - 1:
+          break
+        mod.pfilter(key=rung_keys[2 * r], J=J_score, reps=1)
+        score = np.asarray(mod.results_history.last().logLiks.values[:, 0])
+        score = np.where(np.isfinite(score), score, -np.inf)
+        n_keep = max(1, int(np.ceil(len(starts) / eta)))
+        keep = np.sort(np.argsort(-score, kind="stable")[:n_keep])
+        for i, start in enumerate(starts):
+          records.append({
+              "start_id": start, "rung": r, "J": J_r, "M": M_r,
+              "score": score[i], "pruned": i not in keep,
+          })
+        starts = starts[keep]
+        mod = build_pomp([mod.theta[i] for i in keep])
+      mif2 = mod.results_history.last()
+    else:
+      starts = np.arange(n_done, n_starts)
+      mod.mif(J=J2, M=M2,
+                rw_sd=rw_sd_local, a=a, key=key2)
+      mif2 = mod.results_history.last()
+
+    mod.pfilter(key=key3, J=J3, reps=reps, ESS = True)
+    pf = mod.results_history.last()
+
+    mif1_traces = mif1.traces_da
+    mif2_traces = mif2.traces_da
+
+    if halving:
+      # the last rung is not pruned; its survivors are scored by the final
+      # (J3, reps) pfilter so every start_id has a row for the rung it
+      # reached
+      for i, start in enumerate(starts):
+        records.append({
+            "start_id": start, "rung": n_rungs - 1, "J": J_r, "M": M_r,
+            "score": pp.logmeanexp(pf.logLiks.values[i, :]), "pruned": False,
+        })
+      pruned = pd.DataFrame(records)
+
+    rows = []
+    for i, start in enumerate(starts):
+      lls = pf.logLiks.values[i, :]
+      rows.append({
+            "start": start,
+            **mod.theta[i],
+            'loglik': pp.logmeanexp(lls),
+            'loglik_se': pp.logmeanexp_se(lls)
+        })
+    new_rows = pd.DataFrame(rows)
+
+  # traces, pf and pruned only cover the starts evaluated in this call
+  all_rows = new_rows
+  if cached is not None:
+    old_rows = cached["rows"][cached["rows"]["start"] < n_starts]
+    all_rows = pd.concat([old_rows, new_rows], ignore_index=True)
+  if cache_dir is not None and n_starts > n_done:
+    save_design_cache(cache_dir, ckey,
+      {"n_starts": n_starts, "rows": all_rows})
+
+  results_df = all_rows.drop(columns="start")
   results_df = results_df[np.isfinite(results_df['loglik'])]
+
+  # thousands of starts times M iterations of traces add up to gigabytes,
+  # so drop what the caller doesn't want before it is returned or pickled
+  mif1_traces = retain_traces(mif1_traces, trace_retention, trace_every)
+  mif2_traces = retain_traces(mif2_traces, trace_retention, trace_every)
+  if rung_traces is not None:
+    rung_traces = [retain_traces(da, trace_retention, trace_every)
+      for da in rung_traces]
+  if pf is not None and trace_retention != "full":
+    # keep the loglik array only, not the per-time ESS and the model
+    pf = pf.logLiks
   elapsed_time = time.time() - start_time
   return {
       "results": results_df,
-      "mif1_traces": mif1.traces_da,
-      "mif2_traces": mif2.traces_da,
+      "mif1_traces": mif1_traces,
+      "mif2_traces": mif2_traces,
       "pf": pf,
+      "pruned": pruned, # None unless halving
+      "rung_traces": rung_traces,
       "runtime": elapsed_time,
       "settings": {
           "n_starts": n_starts,
@@ -232,6 +348,14 @@ def run_global_search(ys,
           "J3": J3,
           "M1": M1,
           "M2": M2,
+          "halving": halving,
+          "eta": eta,
+          "n_rungs": n_rungs,
+          "J_score": J_score,
+          "design": design,
+          "trace_retention": trace_retention,
+          "trace_every": trace_every,
+          "n_cached": n_done,
           "key": key,
           "seed": seed,
           "theta": theta,
@@ -0,0 +1,99 @@
+import json
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Trace retention for run_global_search output, and a columnar on-disk
+# format (one .npy per array) that notebooks can memory-map instead of
+# unpickling everything.
+
+RETENTION = ["full", "none", "thin", "final", "float32"]
+
+TRACE_FIELDS = ["mif1_traces", "mif2_traces"]
+
+
+def retain_traces(traces_da, retention = "full", every = 10):
+  # traces_da has dims (replicate, iteration, variable)
+  if traces_da is None or retention == "full":
+    return traces_da
+  if retention == "none":
+    return None
+  if retention == "thin":
+    # every k-th iteration, always keeping the last one
+    n_iter = traces_da.sizes["iteration"]
+    idx = np.union1d(np.arange(0, n_iter, every), [n_iter - 1])
+    return traces_da.isel(iteration=idx)
+  if retention == "final":
+    return traces_da.isel(iteration=[-1])
+  if retention == "float32":
+    return traces_da.astype(np.float32)
+  raise ValueError(
+    f"unknown trace retention {retention!r}, expected one of {RETENTION}")
+
+
+def save_search(output, outdir):
+  # results columns, traces and pfilter logliks as .npy files, plus a
+  # meta.json with the trace coordinates and the remaining small fields
+  outdir = Path(outdir)
+  outdir.mkdir(parents=True, exist_ok=True)
+  meta = {"results": [], "traces": {}}
+
+  for col in output["results"].columns:
+    np.save(outdir / f"results_{col}.npy", output["results"][col].to_numpy())
+    meta["results"].append(col)
+
+  traces = {f: output.get(f) for f in TRACE_FIELDS}
+  for i, da in enumerate(output.get("rung_traces") or []):
+    traces[f"rung{i}_traces"] = da
+  pf = output.get("pf")
+  if pf is not None:
+    traces["pf_logliks"] = getattr(pf, "logLiks", pf)
+  for name, da in traces.items():
+    if da is None:
+      continue
+    np.save(outdir / f"{name}.npy", np.ascontiguousarray(da.values))
+    meta["traces"][name] = {
+      "dims": list(da.dims),
+      "coords": {d: da.coords[d].values.tolist()
+        for d in da.dims if d in da.coords},
+    }
+
+  if output.get("pruned") is not None:
+    output["pruned"].to_csv(outdir / "pruned.csv", index=False)
+  # settings, runtime etc. hold tuples and arbitrary values, so they stay
+  # pickled; they are small
+  arrays = ["results", "pf", "pruned", "rung_traces"] + TRACE_FIELDS
+  with open(outdir / "settings.pkl", "wb") as f:
+    pickle.dump({k: v for k, v in output.items() if k not in arrays}, f)
+
+  tmp = outdir / "meta.json.tmp"
+  with open(tmp, "w") as f:
+    json.dump(meta, f, indent=1)
+  os.replace(tmp, outdir / "meta.json")
+
+
+def load_search(outdir, mmap = True):
+  # inverse of save_search; with mmap the trace arrays are read lazily
+  outdir = Path(outdir)
+  with open(outdir / "meta.json") as f:
+    meta = json.load(f)
+  mode = "r" if mmap else None
+
+  results = pd.DataFrame({
+    col: np.load(outdir / f"results_{col}.npy") for col in meta["results"]
+  })
+  output = {"results": results}
+  for name, info in meta["traces"].items():
+    output[name] = xr.DataArray(
+      np.load(outdir / f"{name}.npy", mmap_mode=mode),
+      dims=info["dims"], coords=info["coords"])
+
+  pruned = outdir / "pruned.csv"
+  output["pruned"] = pd.read_csv(pruned) if pruned.exists() else None
+  with open(outdir / "settings.pkl", "rb") as f:
+    output.update(pickle.load(f))
+  return output
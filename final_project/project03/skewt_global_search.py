@@ -198,27 +198,23 @@ rw_sd_ivp = 0.1
 cooling_fraction_50 = 0.5
 
   
-if __name__ == "__main__":
-  # Make output directory
-  outdir = Path("skewt_model_results")
-  outdir.mkdir(parents=True, exist_ok=True)
-
-  # run the global search
-  output = run_global_search(ys = ys,
-        n_starts=250,
-        reps = 10,
-        rinit = rinit_skewt,
-        rproc = rproc_filt_basic,
-        dmeas = dmeas_skewt,
-        to_est = to_est_skewt,
-        from_est = from_est_skewt,
-        covars = covars,
-        J1 = 2000,
-        J2 = 2000,
-        J3 = 2000,
-        M1 = 50,
-        M2 = 250,
-        grid = {
+# settings for the global search, shared with run_all_global_searches.py
+global_search_args = dict(
+  ys = ys,
+  n_starts=250,
+  reps = 10,
+  rinit = rinit_skewt,
+  rproc = rproc_filt_basic,
+  dmeas = dmeas_skewt,
+  to_est = to_est_skewt,
+  from_est = from_est_skewt,
+  covars = covars,
+  J1 = 2000,
+  J2 = 2000,
+  J3 = 2000,
+  M1 = 50,
+  M2 = 250,
+  grid = {
     "sigma_nu":  (0.002, 0.01),
     "mu_h":      (-3, 3),
     "phi":       (0.5, 0.99),
@@ -227,8 +223,8 @@ if __name__ == "__main__":
     "H_0":       (-5, 5),
     "nu": (2.5, 8),
     "lam": (-.9, .9)
-    },
-    theta = {
+  },
+  theta = {
     "sigma_nu": .01,
     "mu_h": -0.1,
     "phi": .95,
@@ -239,16 +235,25 @@ if __name__ == "__main__":
     "lam": 0.0
   },
   sigmas = {
-        "sigma_nu":  rw_sd_rp,
-        "mu_h":      rw_sd_rp,
-        "phi":       rw_sd_rp,
-        "sigma_eta": rw_sd_rp,
-        "G_0":       rw_sd_ivp,
-        "H_0":       rw_sd_ivp,
-        "nu": .1,
-        "lam": .02
-    }
-    )
+    "sigma_nu":  rw_sd_rp,
+    "mu_h":      rw_sd_rp,
+    "phi":       rw_sd_rp,
+    "sigma_eta": rw_sd_rp,
+    "G_0":       rw_sd_ivp,
+    "H_0":       rw_sd_ivp,
+    "nu": .1,
+    "lam": .02
+  },
+)
+
+
+if __name__ == "__main__":
+  # Make output directory
+  outdir = Path("skewt_model_results")
+  outdir.mkdir(parents=True, exist_ok=True)
+
+  # run the global search
+  output = run_global_search(**global_search_args)
 
   outfile = outdir / "skewt_global_search.pkl"
   with open(outfile, "wb") as f:
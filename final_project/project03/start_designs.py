@@ -0,0 +1,103 @@
+import hashlib
+import inspect
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+# Start designs for run_global_search and a small on-disk cache of searches
+# that were already evaluated, so that a search can be extended with more
+# starts without rerunning the old ones.
+
+DESIGNS = ["uniform", "lhs", "sobol"]
+
+
+def draw_starts(grid, n_starts, design = "uniform", seed = 42, skip = 0):
+  # (n_starts, len(grid)) array of start values, columns in grid order.
+  # skip drops the first points of the design, which is how a search is
+  # extended: for "uniform" and "sobol" the points skip..skip+n_starts-1 are
+  # exactly the tail of the design with skip + n_starts points. A Latin
+  # hypercube can't be extended, so for "lhs" the new points are a separate
+  # hypercube seeded by (seed, skip).
+  names = list(grid)
+  low = np.array([grid[p][0] for p in names], dtype=float)
+  high = np.array([grid[p][1] for p in names], dtype=float)
+  d = len(names)
+
+  if design == "uniform":
+    # same draws, in the same order, as calling np.random.uniform once per
+    # start and parameter after np.random.seed(seed)
+    u = np.random.RandomState(seed).random_sample((skip + n_starts, d))[skip:]
+  elif design == "lhs":
+    rng = np.random.default_rng([seed, skip])
+    u = qmc.LatinHypercube(d, rng = rng).random(n_starts)
+  elif design == "sobol":
+    sampler = qmc.Sobol(d, scramble = True, rng = np.random.default_rng(seed))
+    if skip > 0:
+      sampler.fast_forward(skip)
+    u = sampler.random(n_starts)
+  else:
+    raise ValueError(f"unknown design {design!r}, expected one of {DESIGNS}")
+  return low + (high - low) * u
+
+
+def design_key(grid, seed, design, **settings):
+  # everything that changes the evaluated results goes into the key
+  blob = repr((list(grid.items()), seed, design, sorted(settings.items())))
+  return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def content_hash(obj):
+  # hash of model inputs by value for design_key: frames and arrays by
+  # their contents, functions by their source code, so that editing the
+  # data or a model function gives a new key
+  h = hashlib.sha256()
+  _update_hash(h, obj)
+  return h.hexdigest()[:16]
+
+
+def _update_hash(h, obj):
+  if obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+    h.update(repr(obj).encode())
+  elif isinstance(obj, (pd.DataFrame, pd.Series)):
+    names = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+    h.update(repr(list(names)).encode())
+    h.update(pd.util.hash_pandas_object(obj, index = True).to_numpy().tobytes())
+  elif isinstance(obj, dict):
+    for k in sorted(obj, key = repr):
+      _update_hash(h, k)
+      _update_hash(h, obj[k])
+  elif isinstance(obj, (list, tuple)):
+    h.update(f"{type(obj).__name__}{len(obj)}".encode())
+    for item in obj:
+      _update_hash(h, item)
+  elif callable(obj):
+    try:
+      h.update(inspect.getsource(obj).encode())
+    except (OSError, TypeError):
+      # builtins and functions defined in a REPL have no source
+      h.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+  else:
+    arr = np.asarray(obj)
+    h.update(f"{arr.dtype}{arr.shape}".encode())
+    h.update(np.ascontiguousarray(arr).tobytes())
+
+
+def load_design_cache(cache_dir, key):
+  path = Path(cache_dir) / f"design_{key}.pkl"
+  if not path.exists():
+    return None
+  with open(path, "rb") as f:
+    return pickle.load(f)
+
+
+def save_design_cache(cache_dir, key, entry):
+  path = Path(cache_dir) / f"design_{key}.pkl"
+  path.parent.mkdir(parents=True, exist_ok=True)
+  tmp = path.with_suffix(".tmp")
+  with open(tmp, "wb") as f:
+    pickle.dump(entry, f)
+  os.replace(tmp, path)
@@ -0,0 +1,49 @@
+import importlib
+from functools import lru_cache
+
+import pypomp as pp
+
+from search_helpers import DEFAULT_THETA, DEFAULT_SIGMAS
+
+# Registry of the stochastic-volatility variants: the settings of each
+# model's *_global_search.py script plus one pp.RWSigma / pp.ParTrans built
+# from them, so the drivers wire up every model the same way. It is plain
+# wiring; no speedup over building the objects per search is claimed.
+
+MODEL_MODULES = {
+  "basic": "basic_global_search",
+  "t_errors": "t_errors_global_search",
+  "gjr_t": "gjr_t_global_search",
+  "skewt": "skewt_global_search",
+  "ar2_t": "ar2_t_global_search",
+}
+
+MODELS = list(MODEL_MODULES)
+
+
+@lru_cache(maxsize=None)
+def get_model(name):
+  module = importlib.import_module(MODEL_MODULES[name])
+  args = module.global_search_args
+  theta = dict(args.get("theta", DEFAULT_THETA))
+  sigmas = dict(args.get("sigmas", DEFAULT_SIGMAS))
+  init_names = list(args.get("init_names", ["G_0", "H_0"]))
+
+  return {
+    "name": name,
+    "search_args": args,
+    "theta": theta,
+    "rw_sigma": pp.RWSigma(sigmas=sigmas, init_names=init_names),
+    "par_trans": pp.ParTrans(to_est=args["to_est"],
+      from_est=args["from_est"]),
+  }
+
+
+def search_args(name, **overrides):
+  # keyword arguments for search_helpers.run_global_search
+  model = get_model(name)
+  args = dict(model["search_args"])
+  args["rw_sd"] = model["rw_sigma"]
+  args["par_trans"] = model["par_trans"]
+  args.update(overrides)
+  return args
@@ -121,27 +121,23 @@ rw_sd_rp = 0.02
 rw_sd_ivp = 0.1
 cooling_fraction_50 = 0.5
   
-if __name__ == "__main__":
-  # Make output directory
-  outdir = Path("t_errors_model_results")
-  outdir.mkdir(parents=True, exist_ok=True)
-
-  # run the global search
-  output = run_global_search(ys = ys,
-        n_starts=275,
-        reps = 10,
-        rinit = rinit_t_errors,
-        rproc = rproc_filt_basic,
-        dmeas = dmeas_t_errors,
-        to_est = to_est_t_errors,
-        from_est = from_est_t_errors,
-        covars = covars,
-        J1 = 2000,
-        J2 = 2000,
-        J3 = 2000,
-        M1 = 50,
-        M2 = 250,
-        grid = {
+# settings for the global search, shared with run_all_global_searches.py
+global_search_args = dict(
+  ys = ys,
+  n_starts=275,
+  reps = 10,
+  rinit = rinit_t_errors,
+  rproc = rproc_filt_basic,
+  dmeas = dmeas_t_errors,
+  to_est = to_est_t_errors,
+  from_est = from_est_t_errors,
+  covars = covars,
+  J1 = 2000,
+  J2 = 2000,
+  J3 = 2000,
+  M1 = 50,
+  M2 = 250,
+  grid = {
     "sigma_nu":  (0.002, 0.01),
     "mu_h":      (-3, 3),
     "phi":       (0.5, 0.99),
@@ -149,8 +145,8 @@ if __name__ == "__main__":
     "G_0":       (-5, 5),
     "H_0":       (-5, 5),
     "nu": (2.5, 8)
-    },
-    theta = {
+  },
+  theta = {
     "sigma_nu": .01,
     "mu_h": -0.1,
     "phi": .95,
@@ -160,15 +156,24 @@ if __name__ == "__main__":
     "nu": 5.0
   },
   sigmas = {
-        "sigma_nu":  rw_sd_rp,
-        "mu_h":      rw_sd_rp,
-        "phi":       rw_sd_rp,
-        "sigma_eta": rw_sd_rp,
-        "G_0":       rw_sd_ivp,
-        "H_0":       rw_sd_ivp,
-        "nu": .1
-    }
-    )
+    "sigma_nu":  rw_sd_rp,
+    "mu_h":      rw_sd_rp,
+    "phi":       rw_sd_rp,
+    "sigma_eta": rw_sd_rp,
+    "G_0":       rw_sd_ivp,
+    "H_0":       rw_sd_ivp,
+    "nu": .1
+  },
+)
+
+
+if __name__ == "__main__":
+  # Make output directory
+  outdir = Path("t_errors_model_results")
+  outdir.mkdir(parents=True, exist_ok=True)
+
+  # run the global search
+  output = run_global_search(**global_search_args)
 
   outfile = outdir / "t_errors_global_search.pkl"
   with open(outfile, "wb") as f:
@@ -0,0 +1,97 @@
+import argparse
+import time
+
+import jax
+import numpy as np
+import pypomp as pp
+
+import sv_models
+from mixed_pfilter import enable_x64, make_pfilter
+from search_helpers import rmeas
+
+# Checks the float64 particle filter against pypomp's own pfilter, and the
+# float32 filter against the float64 one, for each SV model: the same number
+# of replicate filters at J particles (5000 by default) at the model's start
+# theta, reporting the mean logLik, its standard error, the time per filter
+# and z = difference / combined se (z64 for float64 vs pypomp, z32 for
+# float32 vs float64). A model fails when either |z| exceeds --z.
+
+
+def run_precision(model, J, reps, precision, seed):
+  args = model["search_args"]
+  pfilter = make_pfilter(args["rinit"], args["rproc"], args["dmeas"],
+    args["ys"], args["covars"], J, precision = precision)
+  theta = model["theta"]
+  # first call compiles
+  jax.block_until_ready(pfilter(theta, jax.random.key(seed)))
+
+  lls = np.zeros(reps)
+  start_time = time.time()
+  for r in range(reps):
+    lls[r] = float(pfilter(theta, jax.random.key(seed + 1 + r)))
+  per_filter = (time.time() - start_time) / reps
+  return {
+    "mean": lls.mean(),
+    "se": lls.std(ddof=1) / np.sqrt(reps),
+    "per_filter": per_filter,
+  }
+
+
+def run_pypomp(model, J, reps, seed):
+  args = model["search_args"]
+  mod = pp.Pomp(
+    rinit=args["rinit"], rproc=args["rproc"],
+    dmeas=args["dmeas"], rmeas=rmeas,
+    ys=args["ys"], theta=[dict(model["theta"])],
+    statenames=args.get("statenames", ["H", "G", "Y_state"]),
+    par_trans=model["par_trans"],
+    t0=0.0, nstep=1,
+    ydim=1, covars=args["covars"])
+  mod.pfilter(key=jax.random.key(seed), J=J, reps=reps)
+  lls = np.asarray(mod.results_history.last().logLiks.values[0, :])
+  return {
+    "mean": lls.mean(),
+    "se": lls.std(ddof=1) / np.sqrt(reps),
+  }
+
+
+def z_score(a, b):
+  return (a["mean"] - b["mean"]) / np.hypot(a["se"], b["se"])
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description = "float32 vs float64 particle filter logLik")
+  parser.add_argument("--models", nargs = "+", choices = sv_models.MODELS,
+    default = sv_models.MODELS)
+  parser.add_argument("--J", type = int, default = 5000)
+  parser.add_argument("--reps", type = int, default = 10)
+  parser.add_argument("--z", type = float, default = 3.0)
+  parser.add_argument("--seed", type = int, default = 1)
+  args = parser.parse_args()
+
+  enable_x64()
+  print(f"J={args.J}, {args.reps} filters per precision")
+  print(f"{'model':9} {'pypomp':>10} {'float64':>10} {'float32':>10} "
+    f"{'se64':>6} {'se32':>6} {'z64':>6} {'z32':>6} "
+    f"{'s/filter 64':>12} {'s/filter 32':>12}")
+  failed = []
+  for name in args.models:
+    model = sv_models.get_model(name)
+    ref = run_pypomp(model, args.J, args.reps, args.seed)
+    r64 = run_precision(model, args.J, args.reps, "float64", args.seed)
+    r32 = run_precision(model, args.J, args.reps, "float32", args.seed)
+    z64 = z_score(r64, ref)
+    z32 = z_score(r32, r64)
+    if not (abs(z64) <= args.z and abs(z32) <= args.z):
+      failed.append(name)
+    print(f"{name:9} {ref['mean']:10.2f} {r64['mean']:10.2f} "
+      f"{r32['mean']:10.2f} {r64['se']:6.2f} {r32['se']:6.2f} "
+      f"{z64:6.2f} {z32:6.2f} "
+      f"{r64['per_filter']:12.3f} {r32['per_filter']:12.3f}")
+
+  if failed:
+    print(f"float64 vs pypomp or float32 vs float64 disagree for: "
+      f"{', '.join(failed)}")
+    raise SystemExit(1)
+  print("float64 agrees with pypomp and float32 with float64 for all models")
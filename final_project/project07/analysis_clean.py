@@ -26,14 +26,21 @@ Run:
     python analysis.py --race "White"
     python analysis.py --quick
     python analysis.py --force-recompute
+    python analysis.py --all-races --workers 4
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import inspect
+import multiprocessing as mp
 import os
 import pickle
-from dataclasses import dataclass
+import queue
+import tempfile
+import traceback
+from dataclasses import dataclass, fields, replace
 from typing import Any, Dict, List, Tuple
 
 import numpy as np
@@ -53,6 +60,8 @@ from pypomp import logmeanexp
 
 DATA_FILE = "Group_By_Race.csv"
 CACHE_DIR = "cache_race_model"
+CACHE_MAX_MB = 2048
+CACHED_STAGES = ["arma", "garch", "simstudy", "local", "global", "profile"]
 EPS = 1e-9
 
 
@@ -65,6 +74,10 @@ class RunConfig:
     race: str = "White"
     quick: bool = False
     force_recompute: bool = False
+    profile_points: int | None = None  # overrides profile_grid_n
+    recompute_stages: Tuple[str, ...] = ()
+    cache_max_mb: int = CACHE_MAX_MB
+    across_races: bool = True  # step 6; off in the per-race workers of run_all_races
 
     @property
     def mif_J(self):
@@ -92,6 +105,8 @@ class RunConfig:
 
     @property
     def profile_grid_n(self):
+        if self.profile_points is not None:
+            return self.profile_points
         return 5 if self.quick else 12
 
     @property
@@ -103,23 +118,128 @@ class RunConfig:
 # Cache utilities
 # =============================================================================
 
-def cache_path(tag: str, race: str) -> str:
-    return os.path.join(CACHE_DIR, f"{tag}_{race.replace(' ', '_')}.pkl")
-
+class ResultStore:
+    """Content-addressed pickle store for stage results.
+
+    Entries live at `root/<key[:2]>/<key>.pkl`, where the key is a hash of
+    everything the stage depends on (see `stage_key`), so changed inputs
+    simply miss instead of returning stale results. Writes go to a temp file
+    in the same directory and are published with os.replace, so readers never
+    see a partial pickle. Every hit refreshes the entry's mtime; once the
+    store exceeds `max_bytes`, the least recently used entries are deleted
+    down to 90% of it. The store size is scanned once, then tracked by adding
+    each write, and only rescanned when that running total passes `max_bytes`
+    (writes by other processes are picked up at that rescan).
+    """
 
-def maybe_load(path: str, force: bool):
-    if force or not os.path.exists(path):
-        return None
-    try:
-        with open(path, "rb") as f:
-            return pickle.load(f)
-    except Exception:
-        return None
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = CACHE_MAX_MB * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes: int | None = None
 
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
 
-def save_cache(path: str, obj: Any) -> None:
-    with open(path, "wb") as f:
-        pickle.dump(obj, f)
+    def get(self, key: str):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                obj = pickle.load(f)
+        except Exception:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by another process meanwhile
+        return obj
+
+    def put(self, key: str, obj: Any) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(obj, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        if self.total_bytes is None:
+            self.evict(keep=path)
+            return
+        self.total_bytes += os.path.getsize(path)
+        if self.total_bytes > self.max_bytes:
+            self.evict(keep=path)
+
+    def evict(self, keep: str | None = None) -> None:
+        entries = []
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".pkl"):
+                    full = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(full)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, full))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes if total <= self.max_bytes else 0.9 * self.max_bytes
+        for _, size, full in sorted(entries):
+            if total <= target:
+                break
+            if full == keep:
+                continue
+            try:
+                os.unlink(full)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.total_bytes = total
+
+
+def _config_fingerprint(cfg: "RunConfig") -> Dict[str, Any]:
+    """The RunConfig values that change results: every effective setting,
+    but not the flags that only steer caching."""
+    skip = {
+        "force_recompute", "recompute_stages", "cache_max_mb", "profile_points",
+        "across_races",
+    }
+    out = {f.name: getattr(cfg, f.name) for f in fields(cfg) if f.name not in skip}
+    for name, attr in vars(RunConfig).items():
+        if isinstance(attr, property):
+            out[name] = getattr(cfg, name)
+    return out
+
+
+def stage_key(stage: str, cfg: "RunConfig", ys, fns=(), deps=()) -> str:
+    """Hash of a stage's inputs: config, observations, the source of the model
+    and of the stage's own functions `fns`, and upstream results `deps`.
+    Editing one stage's code invalidates that stage only."""
+    h = hashlib.sha256()
+    h.update(stage.encode())
+    h.update(repr(sorted(_config_fingerprint(cfg).items())).encode())
+    h.update(np.ascontiguousarray(ys.to_numpy(dtype=float)).tobytes())
+    h.update(np.ascontiguousarray(ys.index.to_numpy(dtype=float)).tobytes())
+    for fn in MODEL_FUNCTIONS + list(fns):
+        h.update(inspect.getsource(fn).encode())
+    h.update(repr(deps).encode())
+    return h.hexdigest()
+
+
+def cached_stage(store: ResultStore, stage: str, cfg: "RunConfig", ys, compute,
+                 fns=(), deps=(), keep=None):
+    """Return the stored result of `stage` or compute and store it. `keep`
+    limits what is stored to those keys (the full result is still returned)."""
+    key = stage_key(stage, cfg, ys, fns=fns, deps=deps)
+    if not (cfg.force_recompute or stage in cfg.recompute_stages):
+        hit = store.get(key)
+        if hit is not None:
+            return hit
+    result = compute()
+    if result is not None:
+        store.put(key, result if keep is None else {k: result[k] for k in keep})
+    return result
 
 
 def safe_name(race: str) -> str:
@@ -586,51 +706,129 @@ def build_seir_model(ys, theta):
     )
 
 
-def make_rw_sigma(scale_reg: float = 0.02, scale_ivp: float = 0.05):
+def make_rw_sigma(scale_reg: float = 0.02, scale_ivp: float = 0.05, fixed=()):
     regular = ["b0", "b1", "b2", "mu_EI", "mu_IR", "mu_RS",   # ADD mu_RS
            "rho", "k", "sigma_env", "covid_shift"]
     sigmas = {p: scale_reg for p in regular}
     sigmas["N"] = 0.0  # fixed
     sigmas["eta"] = scale_ivp
     sigmas["iota"] = scale_ivp
+    for p in fixed:  # e.g. the profiled parameter
+        sigmas[p] = 0.0
     return RWSigma(sigmas=sigmas, init_names=["eta", "iota"])
 
 
 # --- IF2 and pfilter wrappers ---
 
-def _pfilter_batched_logliks(mod, key, J: int, reps: int):
-    """Run pfilter once on a model that may carry multiple thetas, and return
-    a 1-D numpy array of per-theta log-likelihoods (logmeanexp over reps).
-
-    This avoids the JAX JIT-recompile trap of building a fresh Pomp per theta.
-    """
-    mod.pfilter(J=J, key=key, reps=reps, ESS=False)
-    res = mod.results_history.last()
-    ll_arr = np.asarray(res.logLiks.values, dtype=float)
-
+def _per_theta_logliks(ll_arr: np.ndarray, n_thetas: int) -> np.ndarray:
+    """logmeanexp over reps of a pfilter logLiks array, one value per theta."""
     if ll_arr.ndim == 1:
         return np.array([float(logmeanexp(ll_arr))])
     # Shape is (n_thetas, reps) or (reps, n_thetas); pick the axis matching theta count.
-    n_thetas = len(mod.theta.to_list())
     if ll_arr.shape[0] == n_thetas:
         return np.array([float(logmeanexp(ll_arr[i])) for i in range(n_thetas)])
     return np.array([float(logmeanexp(ll_arr[:, i])) for i in range(n_thetas)])
 
 
-def _pfilter_loglik(mod, key, J: int, reps: int, ESS: bool = False):
-    mod.pfilter(J=J, key=key, reps=reps, ESS=ESS)
-    res = mod.results_history.last()
+class PfilterEvaluator:
+    """Long-lived particle-filter evaluator for one race and data set.
 
-    ll_arr = np.asarray(res.logLiks.values, dtype=float)
-    row = ll_arr if ll_arr.ndim == 1 else ll_arr[0]
-    ll = float(logmeanexp(row))
+    Building a fresh Pomp per evaluation risks a JAX JIT recompile every time.
+    The evaluator owns a single Pomp and passes each batch of thetas to its
+    pfilter, so calls with the same batch size, J, reps and ESS setting reuse
+    one compiled filter. Batches are not padded: each batch size in this
+    workflow is filtered about once per run, so padding would add filter work
+    without saving a compile. `calls` counts pfilter calls; `compiles` and
+    `compile_seconds` are the XLA backend compiles JAX reports (through
+    jax.monitoring) while this evaluator's pfilter runs.
+    """
 
-    ess_df = None
-    if ESS:
-        ess_attr = getattr(res, "ESS", None)
-        if ess_attr is not None and hasattr(ess_attr, "to_dataframe"):
-            ess_df = ess_attr.to_dataframe(name="ESS").reset_index()
-    return ll, ess_df
+    def __init__(self, race: str, ys):
+        self.race = race
+        self.ys = ys
+        self.mod = None
+        self.calls = 0
+        self.compiles = 0
+        self.compile_seconds = 0.0
+
+    def _run(self, thetas: List[Dict[str, float]], key, J: int, reps: int, ESS: bool):
+        global _ACTIVE_EVALUATOR
+        _register_compile_listener()
+        batch = [dict(th) for th in thetas]
+        if self.mod is None:
+            self.mod = build_seir_model(self.ys, batch)
+        self.calls += 1
+        _ACTIVE_EVALUATOR = self
+        try:
+            self.mod.pfilter(J=J, key=key, theta=batch, reps=reps, ESS=ESS)
+        finally:
+            _ACTIVE_EVALUATOR = None
+        return self.mod.results_history.last()
+
+    def logliks(self, thetas, key, J: int, reps: int) -> np.ndarray:
+        """Per-theta log-likelihoods (logmeanexp over reps) for a batch of thetas."""
+        thetas = thetas if isinstance(thetas, list) else [thetas]
+        res = self._run(thetas, key, J, reps, ESS=False)
+        ll_arr = np.asarray(res.logLiks.values, dtype=float)
+        return _per_theta_logliks(ll_arr, len(thetas))
+
+    def loglik(self, theta: Dict[str, float], key, J: int, reps: int, ESS: bool = False):
+        """Log-likelihood of a single theta, plus its ESS frame when ESS=True."""
+        res = self._run([theta], key, J, reps, ESS=ESS)
+        ll_arr = np.asarray(res.logLiks.values, dtype=float)
+        ll = float(_per_theta_logliks(ll_arr, 1)[0])
+
+        ess_df = None
+        if ESS:
+            ess_attr = getattr(res, "ESS", None)
+            if ess_attr is not None and hasattr(ess_attr, "to_dataframe"):
+                ess_df = ess_attr.to_dataframe(name="ESS").reset_index()
+        return ll, ess_df
+
+
+_EVALUATORS: Dict[Tuple[str, str], PfilterEvaluator] = {}
+_ACTIVE_EVALUATOR: PfilterEvaluator | None = None
+_COMPILE_LISTENER_REGISTERED = False
+
+
+def _on_compile_duration(event: str, duration: float, **kwargs) -> None:
+    if event == "/jax/core/compile/backend_compile_duration" and _ACTIVE_EVALUATOR is not None:
+        _ACTIVE_EVALUATOR.compiles += 1
+        _ACTIVE_EVALUATOR.compile_seconds += duration
+
+
+def _register_compile_listener() -> None:
+    """Attribute JAX's backend-compile events to the running evaluator (once per process)."""
+    global _COMPILE_LISTENER_REGISTERED
+    if not _COMPILE_LISTENER_REGISTERED:
+        jax.monitoring.register_event_duration_secs_listener(_on_compile_duration)
+        _COMPILE_LISTENER_REGISTERED = True
+
+
+def get_evaluator(race: str, ys) -> PfilterEvaluator:
+    """The evaluator for `race` and these observations, created on first use."""
+    data_hash = hashlib.sha1(
+        np.ascontiguousarray(ys.to_numpy(dtype=float)).tobytes()
+        + np.ascontiguousarray(ys.index.to_numpy(dtype=float)).tobytes()
+    ).hexdigest()
+    key = (race, data_hash)
+    if key not in _EVALUATORS:
+        _EVALUATORS[key] = PfilterEvaluator(race, ys)
+    return _EVALUATORS[key]
+
+
+def evaluator_stats() -> pd.DataFrame:
+    """pfilter calls and XLA backend compiles of every evaluator created so far."""
+    return pd.DataFrame([
+        {
+            "race": ev.race,
+            "n_obs": len(ev.ys),
+            "calls": ev.calls,
+            "compiles": ev.compiles,
+            "compile_seconds": round(ev.compile_seconds, 2),
+        }
+        for ev in _EVALUATORS.values()
+    ])
 
 
 def _mif_once(mod, key, J: int, M: int, rw_sd, a: float = 0.5):
@@ -693,8 +891,8 @@ def run_simulation_study(ys, race: str, cfg: RunConfig):
         index=y_sim1["time"].to_numpy(),
     )
 
-    mod_fake = build_seir_model(ys_fake, theta_true)
-    ll_truth, _ = _pfilter_loglik(mod_fake, jax.random.key(1), J=cfg.pf_J, reps=cfg.pf_reps)
+    evaluator = get_evaluator(f"{race} (simulated)", ys_fake)
+    ll_truth, _ = evaluator.loglik(theta_true, jax.random.key(1), J=cfg.pf_J, reps=cfg.pf_reps)
 
     # Perturb + refit to confirm IF2 recovers a loglik close to truth.
     theta_pert = dict(theta_true)
@@ -709,9 +907,8 @@ def run_simulation_study(ys, race: str, cfg: RunConfig):
         rw_sd=make_rw_sigma(), a=0.5,
     )
     theta_hat = mod_refit.theta.to_list()[0]
-    ll_refit, _ = _pfilter_loglik(
-        build_seir_model(ys_fake, theta_hat),
-        jax.random.key(3), J=cfg.pf_J, reps=cfg.pf_reps,
+    ll_refit, _ = evaluator.loglik(
+        theta_hat, jax.random.key(3), J=cfg.pf_J, reps=cfg.pf_reps,
     )
 
     plt.figure(figsize=(11, 4))
@@ -763,17 +960,17 @@ def run_local_search(ys, race: str, cfg: RunConfig, theta0: Dict[str, float]):
     traces = mod.results_history.last().traces()
 
     # Particle-filter log-likelihood at each final theta, batched in ONE pfilter
-    # call on the MIF'd model to avoid JAX JIT recompilation per chain.
+    # call on the race's shared evaluator to avoid JAX JIT recompilation per chain.
+    evaluator = get_evaluator(race, ys)
     thetas_end = mod.theta.to_list()
-    ll_per = _pfilter_batched_logliks(
-        mod, jax.random.key(1000), J=cfg.pf_J, reps=cfg.pf_reps,
+    ll_per = evaluator.logliks(
+        thetas_end, jax.random.key(1000), J=cfg.pf_J, reps=cfg.pf_reps,
     )
     theta_best = thetas_end[int(np.argmax(ll_per))]
 
     # ESS trace for the best chain.
-    ll_best, ess_df = _pfilter_loglik(
-        build_seir_model(ys, theta_best),
-        jax.random.key(777),
+    ll_best, ess_df = evaluator.loglik(
+        theta_best, jax.random.key(777),
         J=cfg.pf_J, reps=cfg.pf_reps, ESS=True,
     )
 
@@ -836,6 +1033,15 @@ def _sample_start(rng, anchor: Dict[str, float]) -> Dict[str, float]:
     return th
 
 
+# Model code and the shared pfilter/IF2 helpers that every POMP stage depends
+# on; part of each stage's cache key.
+MODEL_FUNCTIONS = [
+    nbinom_logpmf, rinit, rproc, dmeas, rmeas,
+    init_theta_from_data, build_seir_model, make_rw_sigma,
+    _per_theta_logliks, PfilterEvaluator, _mif_once, _sample_start,
+]
+
+
 def run_global_search(ys, race: str, cfg: RunConfig, theta_anchor: Dict[str, float]):
     tag = safe_name(race)
     rng = np.random.default_rng(2026)
@@ -850,8 +1056,8 @@ def run_global_search(ys, race: str, cfg: RunConfig, theta_anchor: Dict[str, flo
     traces = mod.results_history.last().traces()
 
     thetas_end = mod.theta.to_list()
-    ll_per = _pfilter_batched_logliks(
-        mod, jax.random.key(500),
+    ll_per = get_evaluator(race, ys).logliks(
+        thetas_end, jax.random.key(500),
         J=cfg.pf_J, reps=max(2, cfg.pf_reps // 2),
     )
     theta_best = thetas_end[int(np.argmax(ll_per))]
@@ -996,34 +1202,34 @@ def run_profile_likelihood(
     parameters via IF2 while holding `param_name = g` (zero-SD random walk),
     then evaluate the particle-filter log-likelihood. This is the Ionides-style
     profile: maximization over nuisance parameters at each fixed value.
+
+    All grid points are stacked into one multi-theta Pomp, so a single mif
+    call re-optimizes the whole profile and a single batched pfilter
+    evaluates it.
     """
-    lls = []
-    for i, g in enumerate(grid):
+    starts = []
+    for g in grid:
         th = dict(theta_hat)
         th[param_name] = float(g)
+        starts.append(th)
 
-        mod = build_seir_model(ys, th)
-        rw = make_rw_sigma(scale_reg=0.02, scale_ivp=0.05)
-        rw.sigmas[param_name] = 0.0  # clamp the profile parameter
-
-        _mif_once(
-            mod, jax.random.key(7000 + i),
-            J=max(200, cfg.mif_J // 2),
-            M=max(15, cfg.mif_M // 2),
-            rw_sd=rw, a=0.5,
-        )
-        th_star = mod.theta.to_list()[0]
-        th_star[param_name] = float(g)
-
-        ll, _ = _pfilter_loglik(
-            build_seir_model(ys, th_star),
-            jax.random.key(8000 + i),
-            J=max(300, cfg.pf_J // 2),
-            reps=max(2, cfg.pf_reps // 2),
-        )
-        lls.append(ll)
+    mod = build_seir_model(ys, starts)
+    rw = make_rw_sigma(scale_reg=0.02, scale_ivp=0.05, fixed=(param_name,))
+    _mif_once(
+        mod, jax.random.key(7000),
+        J=max(200, cfg.mif_J // 2),
+        M=max(15, cfg.mif_M // 2),
+        rw_sd=rw, a=0.5,
+    )
+    thetas_star = mod.theta.to_list()
+    for th, g in zip(thetas_star, grid):
+        th[param_name] = float(g)
 
-    return np.asarray(lls, dtype=float)
+    return get_evaluator(race, ys).logliks(
+        thetas_star, jax.random.key(8000),
+        J=max(300, cfg.pf_J // 2),
+        reps=max(2, cfg.pf_reps // 2),
+    )
 
 
 def plot_profiles(race: str, profs: Dict[str, Tuple[np.ndarray, np.ndarray]]):
@@ -1087,9 +1293,8 @@ def compare_across_races(df, cfg: RunConfig):
     out = []
     for i, race in enumerate(sorted(df["Race"].dropna().unique().tolist())):
         race_df, ys = prepare_race_data(df, race)
-        mod = build_seir_model(ys, init_theta_from_data(race_df))
-        ll, _ = _pfilter_loglik(
-            mod, jax.random.key(33000 + i),
+        ll, _ = get_evaluator(race, ys).loglik(
+            init_theta_from_data(race_df), jax.random.key(33000 + i),
             J=max(300, cfg.pf_J // 2),
             reps=max(2, cfg.pf_reps // 2),
         )
@@ -1120,7 +1325,7 @@ def compare_across_races(df, cfg: RunConfig):
 # =============================================================================
 
 def run(cfg: RunConfig):
-    os.makedirs(CACHE_DIR, exist_ok=True)
+    store = ResultStore(CACHE_DIR, max_bytes=cfg.cache_max_mb * 2**20)
     df = load_data(DATA_FILE)
     race_df, ys = prepare_race_data(df, cfg.race)
 
@@ -1135,10 +1340,10 @@ def run(cfg: RunConfig):
         print(f"    {k}: {v}")
 
     # 2. ARMA
-    arma = maybe_load(cache_path("arma", cfg.race), cfg.force_recompute)
-    if arma is None:
-        arma = run_arma_benchmark(race_df, cfg.race)
-        save_cache(cache_path("arma", cfg.race), arma)
+    arma = cached_stage(
+        store, "arma", cfg, ys, lambda: run_arma_benchmark(race_df, cfg.race),
+        fns=[run_arma_benchmark],
+    )
     if arma is not None:
         print(
             f"\n[2] ARMA benchmark: best = ARMA({arma['p']},{arma['q']}),"
@@ -1146,49 +1351,48 @@ def run(cfg: RunConfig):
         )
 
     # 3. GARCH
-    garch = maybe_load(cache_path("garch", cfg.race), cfg.force_recompute)
-    if garch is None:
-        garch = run_garch_benchmarks(race_df, cfg.race)
-        save_cache(cache_path("garch", cfg.race), garch)
+    garch = cached_stage(
+        store, "garch", cfg, ys, lambda: run_garch_benchmarks(race_df, cfg.race),
+        fns=[run_garch_benchmarks],
+    )
     if garch is not None:
         print("\n[3] GARCH benchmarks")
         for name, info in garch.items():
             print(f"    {name}: logLik={info['loglik']:.2f}, AIC={info['aic']:.2f}")
 
     # 4a. Simulation study
-    simstudy = maybe_load(cache_path("simstudy", cfg.race), cfg.force_recompute)
-    if simstudy is None:
-        simstudy = run_simulation_study(ys, cfg.race, cfg)
-        save_cache(cache_path("simstudy", cfg.race), simstudy)
+    simstudy = cached_stage(
+        store, "simstudy", cfg, ys, lambda: run_simulation_study(ys, cfg.race, cfg),
+        fns=[run_simulation_study],
+    )
     print(
         f"\n[4a] Simulation-study logLiks: at_truth={simstudy['loglik_at_truth']:.2f},"
         f" after_refit={simstudy['loglik_after_refit']:.2f}"
     )
 
     # 4b. Local IF2
-    local = maybe_load(cache_path("local", cfg.race), cfg.force_recompute)
-    if local is None:
-        local = run_local_search(
+    local = cached_stage(
+        store, "local", cfg, ys,
+        lambda: run_local_search(
             ys, cfg.race, cfg,
             theta0=init_theta_from_data(race_df),
-        )
-        save_cache(
-            cache_path("local", cfg.race),
-            {k: local[k] for k in ["theta_best", "ll_best", "ll_per_chain"]},
-        )
+        ),
+        fns=[run_local_search],
+        keep=["theta_best", "ll_best", "ll_per_chain"],
+    )
     print(f"\n[4b] Local IF2: best logLik = {local['ll_best']:.2f}")
 
     # 4c. Global IF2
-    glob = maybe_load(cache_path("global", cfg.race), cfg.force_recompute)
-    if glob is None:
-        glob = run_global_search(
+    glob = cached_stage(
+        store, "global", cfg, ys,
+        lambda: run_global_search(
             ys, cfg.race, cfg,
             theta_anchor=local["theta_best"],
-        )
-        save_cache(
-            cache_path("global", cfg.race),
-            {k: glob[k] for k in ["theta_best", "ll_best", "ll_per_chain"]},
-        )
+        ),
+        fns=[run_global_search],
+        deps=sorted(local["theta_best"].items()),
+        keep=["theta_best", "ll_best", "ll_per_chain"],
+    )
     print(f"\n[4c] Global IF2: best logLik = {glob['ll_best']:.2f}")
 
     # Select overall best.
@@ -1214,8 +1418,7 @@ def run(cfg: RunConfig):
         )
 
     # 4e. Profiles
-    profs = maybe_load(cache_path("profile", cfg.race), cfg.force_recompute)
-    if profs is None:
+    def compute_profiles():
         b0_grid = np.linspace(
             max(0.2, 0.5 * theta_mle["b0"]),
             1.8 * theta_mle["b0"],
@@ -1226,7 +1429,7 @@ def run(cfg: RunConfig):
             min(0.5, 2.5 * min(theta_mle["rho"], 0.2)),
             cfg.profile_grid_n,
         )
-        profs = {
+        return {
             "b0": (
                 b0_grid,
                 run_profile_likelihood(ys, cfg.race, cfg, theta_mle, "b0", b0_grid),
@@ -1236,7 +1439,12 @@ def run(cfg: RunConfig):
                 run_profile_likelihood(ys, cfg.race, cfg, theta_mle, "rho", rho_grid),
             ),
         }
-        save_cache(cache_path("profile", cfg.race), profs)
+
+    profs = cached_stage(
+        store, "profile", cfg, ys, compute_profiles,
+        fns=[run_profile_likelihood, compute_profiles],
+        deps=sorted(theta_mle.items()),
+    )
 
     plot_profiles(cfg.race, profs)
     for name, (grid, ll) in profs.items():
@@ -1253,9 +1461,13 @@ def run(cfg: RunConfig):
     print(comparison.to_string(index=False))
 
     # 6. Across-race
-    race_comp = compare_across_races(df, cfg)
-    print("\n[6] Across-race baseline fit")
-    print(race_comp.to_string(index=False))
+    if cfg.across_races:
+        race_comp = compare_across_races(df, cfg)
+        print("\n[6] Across-race baseline fit")
+        print(race_comp.to_string(index=False))
+
+    print("\n[pfilter evaluators] pfilter calls and XLA backend compiles")
+    print(evaluator_stats().to_string(index=False))
 
     # Narrative summary
     lines = [
@@ -1274,15 +1486,192 @@ def run(cfg: RunConfig):
 
     print("\nDone. Plots, CSV tables, and the summary file saved in the working directory.")
 
+    best = comparison.loc[comparison["aic"].idxmin()]
+    return {
+        "race": cfg.race,
+        "pomp_loglik": float(ll_mle),
+        "pomp_aic": float(pomp_aic),
+        "arma_aic": float(arma["aic"]) if arma else np.nan,
+        "best_model": best["model"],
+        "best_aic": float(best["aic"]),
+        "profile_b0": float(profs["b0"][0][int(np.argmax(profs["b0"][1]))]),
+        "profile_rho": float(profs["rho"][0][int(np.argmax(profs["rho"][1]))]),
+    }
+
+
+# =============================================================================
+# All races in parallel
+# =============================================================================
+
+def _init_race_worker(slot: int, threads: int | None, mem_fraction: float):
+    # XLA reads these when the backend is first used, i.e. after this runs.
+    # They only apply to GPU/TPU backends; CPU runs ignore them.
+    os.environ["XLA_PYTHON_CLIENT_PREALLOCATE"] = "false"
+    os.environ["XLA_PYTHON_CLIENT_MEM_FRACTION"] = f"{mem_fraction:.3f}"
+    if threads is not None:
+        # Pin the worker to its own block of `threads` CPUs. XLA sizes its
+        # CPU thread pools from the affinity mask, so this caps the threads.
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, cpus[slot * threads:(slot + 1) * threads])
+    matplotlib.use("Agg")
+
+
+def _run_race_worker(cfg: RunConfig, slot: int, threads: int | None, mem_fraction: float,
+                     result_queue) -> None:
+    _init_race_worker(slot, threads, mem_fraction)
+    try:
+        result = run(cfg)
+    except Exception:
+        result = {"race": cfg.race, "error": traceback.format_exc()}
+    result_queue.put(result)
+
 
-def parse_args() -> RunConfig:
+def run_all_races(
+    cfg: RunConfig,
+    races: List[str] | None = None,
+    n_workers: int | None = None,
+    mem_fraction: float | None = None,
+    threads: int | None = None,
+    poll_seconds: float = 1.0,
+) -> pd.DataFrame:
+    """Run the full per-race pipeline for every race, up to `n_workers` at once.
+
+    Each race runs in its own spawned process (JAX is not fork-safe, and the
+    process returns the race's device memory when it exits). With `threads`,
+    each running worker is pinned to its own block of that many CPUs (Linux
+    only); the block goes back to the pool when the worker exits, however it
+    exits. On GPU/TPU, workers do not preallocate and are capped
+    at `mem_fraction` of device memory, 0.9 / n_workers by default; the cap
+    has no effect on CPU. Stage results go through the shared ResultStore,
+    so an interrupted run resumes where it stopped. A race that raises, or
+    whose worker dies without reporting (e.g. segfault or OOM kill), is
+    reported and left out; the others still finish.
+
+    Returns the across-race baseline table merged with each race's fitted
+    results; it is also written to race_comparison_full.csv.
+    """
+    df = load_data(DATA_FILE)
+    if races is None:
+        races = sorted(df["Race"].dropna().unique().tolist())
+    n_workers = min(n_workers or os.cpu_count() or 1, len(races))
+    if mem_fraction is None:
+        mem_fraction = 0.9 / n_workers
+    if threads is not None:
+        if not hasattr(os, "sched_setaffinity"):
+            raise ValueError("threads needs os.sched_setaffinity (Linux)")
+        n_cpus = len(os.sched_getaffinity(0))
+        if n_workers * threads > n_cpus:
+            raise ValueError(
+                f"{n_workers} workers x {threads} threads exceeds the {n_cpus} available CPUs"
+            )
+
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+    pending = list(races)
+    running: Dict[str, Tuple[mp.Process, int]] = {}
+    free_slots = list(range(n_workers))
+    reported = set()
+    rows, failed = [], {}
+
+    def handle(res: Dict[str, Any]) -> None:
+        reported.add(res["race"])
+        if "error" in res:
+            failed[res["race"]] = res["error"]
+            print(f"[all races] {res['race']} failed")
+        else:
+            rows.append(res)
+            print(f"[all races] {res['race']} done: SEIR-POMP logLik = {res['pomp_loglik']:.2f}")
+
+    while pending or running:
+        while pending and free_slots:
+            race = pending.pop(0)
+            slot = free_slots.pop(0)
+            proc = ctx.Process(
+                target=_run_race_worker,
+                args=(replace(cfg, race=race, across_races=False), slot, threads,
+                      mem_fraction, result_queue),
+                name=f"race-{safe_name(race)}",
+            )
+            proc.start()
+            running[race] = (proc, slot)
+
+        try:
+            handle(result_queue.get(timeout=poll_seconds))
+        except queue.Empty:
+            pass
+
+        for race, (proc, slot) in list(running.items()):
+            if proc.is_alive():
+                continue
+            # drain what a finished worker flushed before exiting
+            while race not in reported:
+                try:
+                    handle(result_queue.get(timeout=poll_seconds))
+                except queue.Empty:
+                    break
+            proc.join()
+            if race not in reported:
+                reported.add(race)
+                failed[race] = f"worker exited with code {proc.exitcode} without a result"
+                print(f"[all races] {race} failed")
+            del running[race]
+            free_slots.append(slot)
+
+    for race, err in failed.items():
+        print(f"\n[all races] {race}:\n{err}")
+
+    comp = compare_across_races(df[df["Race"].isin(races)], cfg)
+    fitted = pd.DataFrame(rows, columns=[
+        "race", "pomp_loglik", "pomp_aic", "arma_aic", "best_model", "best_aic",
+        "profile_b0", "profile_rho",
+    ])
+    full = comp.merge(fitted, on="race", how="left")
+    full.to_csv("race_comparison_full.csv", index=False)
+    return full
+
+
+def parse_args() -> Tuple[RunConfig, argparse.Namespace]:
     p = argparse.ArgumentParser(description="STATS 531 SEIR-POMP final project workflow")
     p.add_argument("--race", type=str, default="White")
     p.add_argument("--quick", action="store_true")
     p.add_argument("--force-recompute", action="store_true")
+    p.add_argument("--profile-grid-n", type=int, default=None)
+    p.add_argument(
+        "--recompute-stage", nargs="+", choices=CACHED_STAGES, default=[],
+        help="ignore cached results of these stages only",
+    )
+    p.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB)
+    p.add_argument(
+        "--all-races", action="store_true",
+        help="run every race on a process pool (ignores --race)",
+    )
+    p.add_argument("--races", nargs="+", default=None, help="subset for --all-races")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument(
+        "--worker-mem-fraction", type=float, default=None,
+        help="GPU/TPU memory fraction per worker (default 0.9 / workers; no effect on CPU)",
+    )
+    p.add_argument(
+        "--worker-threads", type=int, default=None,
+        help="pin each worker to this many CPUs (Linux only)",
+    )
     a = p.parse_args()
-    return RunConfig(race=a.race, quick=a.quick, force_recompute=a.force_recompute)
+    cfg = RunConfig(
+        race=a.race, quick=a.quick, force_recompute=a.force_recompute,
+        profile_points=a.profile_grid_n,
+        recompute_stages=tuple(a.recompute_stage),
+        cache_max_mb=a.cache_max_mb,
+    )
+    return cfg, a
 
 
 if __name__ == "__main__":
-    run(parse_args())
+    cfg, a = parse_args()
+    if a.all_races:
+        full = run_all_races(
+            cfg, races=a.races, n_workers=a.workers,
+            mem_fraction=a.worker_mem_fraction, threads=a.worker_threads,
+        )
+        print(full.to_string(index=False))
+    else:
+        run(cfg)
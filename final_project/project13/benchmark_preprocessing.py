@@ -0,0 +1,126 @@
+"""Benchmark of the vectorized decision-window and hours-since-send code.
+
+Builds a synthetic cohort (10 participants x 1 year of hourly rows by
+default), runs the previous loop implementations (kept below as references)
+and the current hw8_analysis versions on every participant, checks that the
+outputs are identical and prints the time taken by each.
+
+    python benchmark_preprocessing.py --participants 10 --hours 8760
+"""
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+import hw8_analysis as hw8
+
+
+def hours_since_send_loop(send_series: pd.Series) -> np.ndarray:
+    hours_since_send = np.full(len(send_series), np.inf, dtype=float)
+    last_send_index = None
+    for index, sent_flag in enumerate(send_series.to_numpy(dtype=float)):
+        if sent_flag >= 0.5:
+            last_send_index = index
+            hours_since_send[index] = 0.0
+        elif last_send_index is not None:
+            hours_since_send[index] = float(index - last_send_index)
+    return hours_since_send
+
+
+def build_decision_windows_loop(frame: pd.DataFrame) -> pd.DataFrame:
+    decision_rows = frame.loc[frame["local_hour"] == 15].copy()
+    rows = []
+    for decision_id, (_, row) in enumerate(decision_rows.iterrows(), start=1):
+        start_pos = int(row.name)
+        window = frame.iloc[start_pos : start_pos + 24].copy()
+        hours_in_window = len(window)
+        complete_window = hours_in_window == 24
+        fitbit_observed = int(window["fitbit_observed"].sum())
+        fitbit_coverage_fraction = fitbit_observed / hours_in_window if hours_in_window > 0 else 0.0
+
+        if not complete_window:
+            status = "truncated_range"
+        elif fitbit_observed >= 24:
+            status = "fully_observed"
+        elif fitbit_coverage_fraction >= 0.5:
+            status = "partially_observed"
+        else:
+            status = "heavily_imputed"
+
+        rows.append(
+            {
+                "decision_id": decision_id,
+                "decision_time_utc": row["time_utc"],
+                "decision_local_time": row["local_time"],
+                "decision_local_date": row["local_date"],
+                "hours_in_window": hours_in_window,
+                "complete_window": bool(complete_window),
+                "fitbit_observed_hours": fitbit_observed,
+                "fitbit_coverage_fraction": fitbit_coverage_fraction,
+                "reward_window_status": status,
+                "window_start_position": start_pos,
+                "window_end_position": start_pos + hours_in_window - 1,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def synthetic_participant(rng: np.random.Generator, n_hours: int, timezone: str) -> pd.DataFrame:
+    time_utc = pd.date_range("2023-01-01 03:00", periods=n_hours, freq="h", tz="UTC")
+    # missingness comes in multi-hour gaps, as with a watch taken off
+    observed = np.repeat(rng.random(n_hours // 6 + 1) > 0.3, 6)[:n_hours]
+    frame = pd.DataFrame(
+        {
+            "time_utc": time_utc,
+            "fitbitSteps": np.where(observed, rng.poisson(250, n_hours), np.nan),
+            "messageSent": (rng.random(n_hours) < 0.02).astype(float),
+        }
+    )
+    frame["local_time"] = frame["time_utc"].dt.tz_convert(timezone)
+    frame["local_date"] = frame["local_time"].dt.date
+    frame["local_hour"] = frame["local_time"].dt.hour.astype(int)
+    frame["fitbit_observed"] = frame["fitbitSteps"].notna().astype(int)
+    return frame
+
+
+def time_call(fn, frames: list[pd.DataFrame]) -> tuple[float, list]:
+    start = perf_counter()
+    outputs = [fn(frame) for frame in frames]
+    return perf_counter() - start, outputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=10)
+    parser.add_argument("--hours", type=int, default=24 * 365)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frames = [synthetic_participant(rng, args.hours, "America/New_York") for _ in range(args.participants)]
+    send_series = [frame["messageSent"] for frame in frames]
+    print(f"{args.participants} participants x {args.hours} hours")
+
+    rows = []
+    for name, before, after, inputs in [
+        ("hours_since_send", hours_since_send_loop, hw8.compute_hours_since_send, send_series),
+        ("build_decision_windows", build_decision_windows_loop, hw8.build_decision_windows, frames),
+    ]:
+        t_before, out_before = time_call(before, inputs)
+        t_after, out_after = time_call(after, inputs)
+        for x, y in zip(out_before, out_after):
+            if isinstance(x, pd.DataFrame):
+                pd.testing.assert_frame_equal(x, y)
+            else:
+                np.testing.assert_array_equal(x, y)
+        rows.append({"function": name, "loop (s)": t_before, "vectorized (s)": t_after, "speedup": t_before / t_after})
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
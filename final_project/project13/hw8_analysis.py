@@ -1,10 +1,22 @@
 
 from __future__ import annotations
 
+import contextlib
 import copy
+import dbm
+import fcntl
 import hashlib
 import json
+import multiprocessing as mp
+import os
+import pickle
+import queue
 import shelve
+import shutil
+import tempfile
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -17,6 +29,12 @@ import jax.numpy as jnp
 from jax.scipy.special import gammaln
 from pypomp import Pomp, ParTrans, RWSigma
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: without it participants are read by scanning the CSV
+    pa = pq = None
+
 
 # -----------------------------
 # Configuration + public dataclasses
@@ -29,8 +47,13 @@ class CacheConfig:
     cache_version_token: str = "hw8_cache_v1"
     shelve_cache_directory: str = ".hw8_cache"
     shelve_cache_basename: str = "HW8"     # can be overridden in QMD
+    cache_backend: str = "shelve"          # "shelve" or "files" (one pickle per key; does not read shelve caches)
+    cache_max_bytes: int | None = 4 * 2**30
 
     csv_path: str = "FitbitHourly.csv"
+    # Opt-in Parquet copy of the CSV, one file per participant (needs pyarrow;
+    # the first load writes it). None, the default, scans the CSV instead.
+    participant_store_directory: str | None = None
 
 
 @dataclass(frozen=True)
@@ -61,6 +84,10 @@ class AnalysisConfig:
     global_search_include_current_theta_as_start: bool = True
     global_search_jitter_scale: float = 0.10
     global_search_box_shrink_factor_per_stage: float = 1.00
+    # "serial", "process" (process pool) or "stacked" (one multi-theta Pomp per
+    # stage; opt-in: it draws one random stream per stage, so results differ)
+    global_search_candidate_executor: str = "serial"
+    global_search_max_workers: int | None = None
 
     # Global start box
     global_start_box_phi_low: float = -0.95
@@ -130,24 +157,197 @@ def _cache_key_default(value):
     raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable.")
 
 
+class CacheReadError(Exception):
+    """A cache entry exists but cannot be loaded."""
+
+
+@contextlib.contextmanager
+def _file_lock(path: Path, *, shared: bool = False, remove: bool = False):
+    """flock on `path`. With remove=True the lock file is deleted on release.
+
+    A process that was waiting on a removed file finds that `path` no longer
+    names the file it locked and retries on the current one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        handle = open(path, "a+b")
+        fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        if not remove:
+            break
+        try:
+            if os.stat(path).st_ino == os.fstat(handle.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+    try:
+        yield
+    finally:
+        if remove:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+
+def _cache_file_name(cache_key: str) -> str:
+    cache_name, _, digest = cache_key.rpartition(":")
+    return f"{cache_name}-{digest}"
+
+
+class FileCacheBackend:
+    """Directory of pickles named by cache key; safe for concurrent processes.
+
+    Values are written to a temp file and published with os.replace, so readers
+    see either nothing or a complete entry. Reads refresh the entry's mtime and,
+    once the directory exceeds `max_bytes`, the least recently used entries are
+    deleted down to 90% of it. The directory is scanned on the first write,
+    then its size is tracked by adding each write and only rescanned when that
+    running total passes `max_bytes` (other processes' writes are picked up
+    at that rescan).
+    """
+    def __init__(self, root: Path, max_bytes: int | None = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.total_bytes: int | None = None
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, cache_key: str) -> Path:
+        return self.root / f"{_cache_file_name(cache_key)}.pkl"
+
+    def lock_path(self, cache_key: str) -> Path:
+        return self.root / "locks" / f"{_cache_file_name(cache_key)}.lock"
+
+    def get(self, cache_key: str):
+        path = self.entry_path(cache_key)
+        try:
+            with open(path, "rb") as handle:
+                value = pickle.load(handle)
+        except FileNotFoundError:
+            return False, None
+        except Exception as exc:
+            raise CacheReadError(str(path)) from exc
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return True, value
+
+    def put(self, cache_key: str, value) -> None:
+        path = self.entry_path(cache_key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=".pkl")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
+        if self.max_bytes is None:
+            return
+        if self.total_bytes is not None:
+            with contextlib.suppress(FileNotFoundError):
+                self.total_bytes += path.stat().st_size
+            if self.total_bytes <= self.max_bytes:
+                return
+        self.evict(keep=path)
+
+    def delete(self, cache_key: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.entry_path(cache_key))
+
+    def clear(self) -> None:
+        for path in self.root.glob("*.pkl"):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+    def evict(self, keep: Path | None = None) -> None:
+        if self.max_bytes is None:
+            return
+        entries = []
+        for path in self.root.glob("*.pkl"):
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes if total <= self.max_bytes else 0.9 * self.max_bytes
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            total -= size
+        self.total_bytes = total
+
+
+class ShelveCacheBackend:
+    """The original single-file shelve store, serialized by a lock file."""
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db_lock = self.cache_path.with_name(self.cache_path.name + ".lock")
+
+    def lock_path(self, cache_key: str) -> Path:
+        return self.cache_path.parent / "locks" / f"{self.cache_path.name}-{_cache_file_name(cache_key)}.lock"
+
+    def get(self, cache_key: str):
+        with _file_lock(self._db_lock, shared=True):
+            # read-only under the shared lock; a db that does not exist yet is a miss
+            if dbm.whichdb(str(self.cache_path)) is None:
+                return False, None
+            with shelve.open(str(self.cache_path), flag="r") as db:
+                if cache_key not in db:
+                    return False, None
+                try:
+                    return True, db[cache_key]
+                except Exception as exc:
+                    raise CacheReadError(str(self.cache_path)) from exc
+
+    def put(self, cache_key: str, value) -> None:
+        with _file_lock(self._db_lock), shelve.open(str(self.cache_path)) as db:
+            db[cache_key] = value
+
+    def delete(self, cache_key: str) -> None:
+        with _file_lock(self._db_lock), shelve.open(str(self.cache_path)) as db:
+            with contextlib.suppress(KeyError):
+                del db[cache_key]
+
+    def clear(self) -> None:
+        with _file_lock(self._db_lock), shelve.open(str(self.cache_path)) as db:
+            db.clear()
+
+
+CACHE_BACKENDS = ("files", "shelve")
+
+
 class ShelveCache:
-    """Small wrapper so cache path + CSV signature live in one object."""
+    """Small wrapper so cache path + CSV signature live in one object.
+
+    Storage is delegated to a backend (CacheConfig.cache_backend). Computing a
+    missing entry holds a per-key lock file, so concurrent processes asking for
+    the same key compute it once and the others read the published result. The
+    lock file is removed once the entry is published.
+    """
     def __init__(self, cfg: CacheConfig):
         self.cfg = cfg
         self.csv_path = Path(cfg.csv_path)
         if not self.csv_path.exists():
             raise FileNotFoundError(f"{cfg.csv_path} must be in the working directory.")
-        self.csv_signature = {
-            "csv_size_bytes": int(self.csv_path.stat().st_size),
-            "csv_modified_ns": int(self.csv_path.stat().st_mtime_ns),
-        }
+        self.csv_signature = csv_file_signature(self.csv_path)
         self.cache_dir = Path(cfg.shelve_cache_directory)
         self.cache_path = self.cache_dir / cfg.shelve_cache_basename
+        self.backend = None
         if cfg.enable_shelve_cache:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if cfg.cache_backend == "files":
+                self.backend = FileCacheBackend(self.cache_path, max_bytes=cfg.cache_max_bytes)
+            elif cfg.cache_backend == "shelve":
+                self.backend = ShelveCacheBackend(self.cache_path)
+            else:
+                raise ValueError(f"Unknown cache_backend {cfg.cache_backend!r}; expected one of {CACHE_BACKENDS}.")
             if cfg.clear_shelve_cache:
-                with shelve.open(str(self.cache_path)) as db:
-                    db.clear()
+                self.backend.clear()
 
     def build_cache_key(self, cache_name: str, **cache_inputs) -> str:
         payload = {
@@ -159,35 +359,43 @@ class ShelveCache:
         encoded = json.dumps(payload, sort_keys=True, default=_cache_key_default).encode("utf-8")
         return f"{cache_name}:{hashlib.sha256(encoded).hexdigest()}"
 
+    def _lookup(self, cache_key: str):
+        try:
+            hit, value = self.backend.get(cache_key)
+        except CacheReadError as exc:
+            self.backend.delete(cache_key)
+            return False, None, exc
+        return hit, value, None
+
     def get_or_compute(self, cache_name: str, cache_inputs: dict, compute_fn, *, prepare_for_store=None):
         cache_key = self.build_cache_key(cache_name, **cache_inputs)
         cache_load_error = None
-        if self.cfg.enable_shelve_cache:
-            with shelve.open(str(self.cache_path)) as db:
-                if cache_key in db:
-                    try:
-                        return db[cache_key]
-                    except Exception as exc:
-                        cache_load_error = exc
-                        try:
-                            del db[cache_key]
-                        except Exception:
-                            pass
+        if self.backend is not None:
+            hit, value, cache_load_error = self._lookup(cache_key)
+            if hit:
+                return value
         if self.cfg.require_existing_cache_hits:
             if cache_load_error is not None:
                 raise FileNotFoundError(
-                    f"Unreadable shelve cache entry for {cache_name!r} in {self.cache_path} "
+                    f"Unreadable cache entry for {cache_name!r} in {self.cache_path} "
                     f"while require_existing_cache_hits=True."
                 ) from cache_load_error
             raise FileNotFoundError(
-                f"Missing required shelve cache entry for {cache_name!r} in {self.cache_path} "
+                f"Missing required cache entry for {cache_name!r} in {self.cache_path} "
                 f"while require_existing_cache_hits=True."
             )
-        value = compute_fn()
-        stored_value = prepare_for_store(value) if prepare_for_store is not None else value
-        if self.cfg.enable_shelve_cache:
-            with shelve.open(str(self.cache_path)) as db:
-                db[cache_key] = stored_value
+        if self.backend is None:
+            value = compute_fn()
+            return prepare_for_store(value) if prepare_for_store is not None else value
+
+        with _file_lock(self.backend.lock_path(cache_key), remove=True):
+            # whoever held the lock before us may have published the entry
+            hit, value, _ = self._lookup(cache_key)
+            if hit:
+                return value
+            value = compute_fn()
+            stored_value = prepare_for_store(value) if prepare_for_store is not None else value
+            self.backend.put(cache_key, stored_value)
         return stored_value
 
 
@@ -423,7 +631,203 @@ def load_participant_hourly_from_csv(
     if not chunks:
         raise ValueError(f"No hourly rows were found for {participant_id}.")
 
-    return pd.concat(chunks, ignore_index=True).sort_values("time_utc").reset_index(drop=True)
+    return pd.concat(chunks, ignore_index=True).sort_values("time_utc", kind="stable").reset_index(drop=True)
+
+
+# -----------------------------
+# Columnar participant store
+# -----------------------------
+# One-time ingest of the CSV into one Parquet file per participant, sorted by a
+# typed UTC time_utc and split into week-long row groups. index.json maps each
+# participant to its file and the time range of every row group, so a window
+# reads only the overlapping row groups of one file. date_utc/hour_of_day_utc
+# are derived from time_utc on load, as load_participant_hourly_from_csv does.
+PARTICIPANT_STORE_VERSION = 1
+PARTICIPANT_STORE_ROW_GROUP_HOURS = 24 * 7
+PARTICIPANT_STORE_COLUMNS = [c for c in CSV_COLUMNS if c not in ("date_utc", "hour_of_day_utc")]
+PARTICIPANT_STORE_STRING_COLUMNS = ["PARTICIPANTIDENTIFIER", "STUDY_USER_ID"]
+
+
+def csv_file_signature(csv_path: str | Path) -> dict[str, int]:
+    stat = Path(csv_path).stat()
+    return {"csv_size_bytes": int(stat.st_size), "csv_modified_ns": int(stat.st_mtime_ns)}
+
+
+def _participant_store_schema():
+    fields = []
+    for column in PARTICIPANT_STORE_COLUMNS:
+        if column in PARTICIPANT_STORE_STRING_COLUMNS:
+            fields.append(pa.field(column, pa.string()))
+        elif column == "time_utc":
+            fields.append(pa.field(column, pa.timestamp("ns", tz="UTC")))
+        else:
+            fields.append(pa.field(column, pa.float64()))
+    return pa.schema(fields)
+
+
+def _participant_file_name(participant_id: str) -> str:
+    return hashlib.sha1(participant_id.encode("utf-8")).hexdigest()[:16] + ".parquet"
+
+
+def build_participant_store(
+    csv_path: str | Path,
+    store_dir: str | Path,
+    *,
+    chunksize: int = 250_000,
+    row_group_hours: int = PARTICIPANT_STORE_ROW_GROUP_HOURS,
+) -> dict:
+    """Ingest the wearable CSV into a per-participant Parquet store; returns the index.
+
+    The store is built in a temporary sibling directory and moved into place at
+    the end, so concurrent readers never see a half-written store.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to build the participant store.")
+    csv_path = Path(csv_path)
+    store_dir = Path(store_dir)
+    store_dir.parent.mkdir(parents=True, exist_ok=True)
+    schema = _participant_store_schema()
+    build_dir = Path(tempfile.mkdtemp(prefix=f"{store_dir.name}.build-", dir=store_dir.parent))
+    staging_dir = build_dir / "_staging"
+
+    try:
+        # pass 1: split every CSV chunk by participant into staging files
+        staged: dict[str, list[Path]] = {}
+        reader = pd.read_csv(
+            csv_path,
+            usecols=PARTICIPANT_STORE_COLUMNS,
+            dtype={c: str for c in PARTICIPANT_STORE_STRING_COLUMNS},
+            chunksize=chunksize,
+        )
+        for chunk_index, chunk in enumerate(reader):
+            chunk["time_utc"] = pd.to_datetime(chunk["time_utc"], utc=True, errors="coerce").astype("datetime64[ns, UTC]")
+            chunk = chunk.dropna(subset=["PARTICIPANTIDENTIFIER", "time_utc"])
+            for column in PARTICIPANT_STORE_COLUMNS:
+                if column not in PARTICIPANT_STORE_STRING_COLUMNS and column != "time_utc":
+                    chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype(float)
+            for participant_id, rows in chunk.groupby("PARTICIPANTIDENTIFIER", sort=False):
+                part_dir = staging_dir / _participant_file_name(participant_id).removesuffix(".parquet")
+                part_dir.mkdir(parents=True, exist_ok=True)
+                path = part_dir / f"chunk-{chunk_index:06d}.parquet"
+                pq.write_table(pa.Table.from_pandas(rows, schema=schema, preserve_index=False), path)
+                staged.setdefault(participant_id, []).append(path)
+
+        # pass 2: one time-sorted file per participant, week-long row groups
+        participants = {}
+        for participant_id, paths in staged.items():
+            frame = pd.concat([pq.read_table(path).to_pandas() for path in paths], ignore_index=True)
+            frame = frame.sort_values("time_utc", kind="stable").reset_index(drop=True)
+            file_name = _participant_file_name(participant_id)
+            pq.write_table(
+                pa.Table.from_pandas(frame, schema=schema, preserve_index=False),
+                build_dir / file_name,
+                row_group_size=row_group_hours,
+            )
+            times = frame["time_utc"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+            row_groups = [
+                [int(times[i]), int(times[min(i + row_group_hours, len(times)) - 1]), int(min(row_group_hours, len(times) - i))]
+                for i in range(0, len(times), row_group_hours)
+            ]
+            participants[participant_id] = {"file": file_name, "rows": int(len(frame)), "row_groups": row_groups}
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        index = {
+            "store_version": PARTICIPANT_STORE_VERSION,
+            "csv_path": str(csv_path),
+            "csv_signature": csv_file_signature(csv_path),
+            "participants": participants,
+        }
+        with open(build_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+        if open_participant_store(csv_path, store_dir) is not None:
+            # another process published a current store meanwhile; use that one
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return open_participant_store(csv_path, store_dir)
+        if store_dir.exists():
+            shutil.rmtree(store_dir)
+        try:
+            os.replace(build_dir, store_dir)
+        except OSError:
+            # another process published a store first; use that one
+            shutil.rmtree(build_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    return index
+
+
+def open_participant_store(csv_path: str | Path, store_dir: str | Path) -> dict | None:
+    """Index of the store if it exists and was built from the current CSV, else None."""
+    try:
+        with open(Path(store_dir) / "index.json", encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if index.get("store_version") != PARTICIPANT_STORE_VERSION:
+        return None
+    if index.get("csv_signature") != csv_file_signature(csv_path):
+        return None
+    return index
+
+
+def ensure_participant_store(csv_path: str | Path, store_dir: str | Path) -> dict:
+    index = open_participant_store(csv_path, store_dir)
+    if index is None:
+        build_participant_store(csv_path, store_dir)
+        index = open_participant_store(csv_path, store_dir)
+        if index is None:
+            raise RuntimeError(f"Participant store in {store_dir} does not match {csv_path}.")
+    return index
+
+
+def load_participant_hourly_from_store(
+    store_dir: str | Path,
+    index: dict,
+    participant_id: str,
+    start_iso: str,
+    end_iso: str,
+    lookback_hours: int = 48,
+) -> pd.DataFrame:
+    """Same frame as load_participant_hourly_from_csv, read from the participant store."""
+    start_utc = pd.Timestamp(start_iso).tz_convert("UTC") - pd.Timedelta(hours=lookback_hours)
+    end_utc = pd.Timestamp(end_iso).tz_convert("UTC")
+
+    entry = index["participants"].get(participant_id)
+    if entry is None:
+        raise ValueError(f"No hourly rows were found for {participant_id}.")
+    start_ns, end_ns = start_utc.value, end_utc.value
+    row_groups = [
+        i for i, (first_ns, last_ns, _) in enumerate(entry["row_groups"])
+        if last_ns >= start_ns and first_ns <= end_ns
+    ]
+    if not row_groups:
+        raise ValueError(f"No hourly rows were found for {participant_id}.")
+
+    frame = pq.ParquetFile(Path(store_dir) / entry["file"]).read_row_groups(row_groups).to_pandas()
+    frame = frame.loc[frame["time_utc"].between(start_utc, end_utc, inclusive="both")].copy()
+    if frame.empty:
+        raise ValueError(f"No hourly rows were found for {participant_id}.")
+
+    frame["date_utc"] = frame["time_utc"].dt.date
+    frame["hour_of_day_utc"] = frame["time_utc"].dt.hour
+    return frame[CSV_COLUMNS].reset_index(drop=True)
+
+
+def load_participant_hourly(
+    csv_path: str,
+    participant_id: str,
+    start_iso: str,
+    end_iso: str,
+    lookback_hours: int = 48,
+    *,
+    store_dir: str | Path | None = None,
+) -> pd.DataFrame:
+    """Read from the participant store (built on first use) or, without one, scan the CSV."""
+    if store_dir is None or pa is None:
+        return load_participant_hourly_from_csv(csv_path, participant_id, start_iso, end_iso, lookback_hours)
+    index = ensure_participant_store(csv_path, store_dir)
+    return load_participant_hourly_from_store(store_dir, index, participant_id, start_iso, end_iso, lookback_hours)
 
 
 def build_baseline_log_mean(step_proxy: pd.Series, local_hour: pd.Series, local_dayofweek: pd.Series) -> pd.Series:
@@ -451,6 +855,15 @@ def build_baseline_log_mean(step_proxy: pd.Series, local_hour: pd.Series, local_
     return pd.Series(baseline, index=step_proxy.index, dtype="float64")
 
 
+def compute_hours_since_send(send_series: pd.Series | np.ndarray) -> np.ndarray:
+    """Rows since the most recent row with a send (flag >= 0.5); inf before the first send."""
+    sent = np.asarray(send_series, dtype=float) >= 0.5
+    positions = np.arange(len(sent))
+    # running max of the positions of sends = position of the latest send so far
+    last_send = np.maximum.accumulate(np.where(sent, positions, -1)) if len(sent) else positions
+    return np.where(last_send >= 0, positions - last_send, np.inf).astype(float)
+
+
 def add_hourly_covariates(frame: pd.DataFrame) -> pd.DataFrame:
     result = frame.copy()
     step_proxy = pd.to_numeric(result["fitbitSteps"], errors="coerce").clip(lower=0.0)
@@ -467,14 +880,7 @@ def add_hourly_covariates(frame: pd.DataFrame) -> pd.DataFrame:
     result["cov_trail_mood_mean_24h"] = mood_score.fillna(mood_fill).shift(1).rolling(24, min_periods=1).mean()
 
     send_series = pd.to_numeric(result.get("messageSent", 0), errors="coerce").fillna(0.0).clip(lower=0.0, upper=1.0)
-    hours_since_send = np.full(len(result), np.inf, dtype=float)
-    last_send_index = None
-    for index, sent_flag in enumerate(send_series.to_numpy(dtype=float)):
-        if sent_flag >= 0.5:
-            last_send_index = index
-            hours_since_send[index] = 0.0
-        elif last_send_index is not None:
-            hours_since_send[index] = float(index - last_send_index)
+    hours_since_send = compute_hours_since_send(send_series)
 
     result["cov_send_lag_0_3h"] = ((hours_since_send >= 0) & (hours_since_send <= 3)).astype(float)
     result["cov_send_lag_4_11h"] = ((hours_since_send >= 4) & (hours_since_send <= 11)).astype(float)
@@ -502,41 +908,43 @@ def build_decision_windows(frame: pd.DataFrame) -> pd.DataFrame:
             ]
         )
 
-    rows = []
-    for decision_id, (_, row) in enumerate(decision_rows.iterrows(), start=1):
-        start_pos = int(row.name)
-        window = frame.iloc[start_pos : start_pos + 24].copy()
-        hours_in_window = len(window)
-        complete_window = hours_in_window == 24
-        fitbit_observed = int(window["fitbit_observed"].sum())
-        fitbit_coverage_fraction = fitbit_observed / hours_in_window if hours_in_window > 0 else 0.0
-
-        if not complete_window:
-            status = "truncated_range"
-        elif fitbit_observed >= 24:
-            status = "fully_observed"
-        elif fitbit_coverage_fraction >= 0.5:
-            status = "partially_observed"
-        else:
-            status = "heavily_imputed"
-
-        rows.append(
-            {
-                "decision_id": decision_id,
-                "decision_time_utc": row["time_utc"],
-                "decision_local_time": row["local_time"],
-                "decision_local_date": row["local_date"],
-                "hours_in_window": hours_in_window,
-                "complete_window": bool(complete_window),
-                "fitbit_observed_hours": fitbit_observed,
-                "fitbit_coverage_fraction": fitbit_coverage_fraction,
-                "reward_window_status": status,
-                "window_start_position": start_pos,
-                "window_end_position": start_pos + hours_in_window - 1,
-            }
-        )
-
-    return pd.DataFrame(rows)
+    # a window is the 24 rows starting at the decision row, truncated at the end
+    # of the frame; observed hours come from differences of a cumulative sum
+    n_rows = len(frame)
+    start_pos = decision_rows.index.to_numpy(dtype=np.int64)
+    end_pos = np.clip(start_pos + 24, 0, n_rows)
+    hours_in_window = np.maximum(end_pos - np.clip(start_pos, 0, n_rows), 0)
+    observed_cumsum = np.concatenate([[0], np.cumsum(frame["fitbit_observed"].to_numpy(dtype=np.int64))])
+    fitbit_observed = np.where(
+        hours_in_window > 0,
+        observed_cumsum[end_pos] - observed_cumsum[np.clip(start_pos, 0, n_rows)],
+        0,
+    ).astype(np.int64)
+    complete_window = hours_in_window == 24
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fitbit_coverage_fraction = np.where(hours_in_window > 0, fitbit_observed / hours_in_window, 0.0)
+
+    status = np.select(
+        [~complete_window, fitbit_observed >= 24, fitbit_coverage_fraction >= 0.5],
+        ["truncated_range", "fully_observed", "partially_observed"],
+        default="heavily_imputed",
+    ).astype(object)
+
+    return pd.DataFrame(
+        {
+            "decision_id": np.arange(1, len(decision_rows) + 1, dtype=np.int64),
+            "decision_time_utc": decision_rows["time_utc"].reset_index(drop=True),
+            "decision_local_time": decision_rows["local_time"].reset_index(drop=True),
+            "decision_local_date": decision_rows["local_date"].reset_index(drop=True),
+            "hours_in_window": hours_in_window.astype(np.int64),
+            "complete_window": complete_window,
+            "fitbit_observed_hours": fitbit_observed,
+            "fitbit_coverage_fraction": fitbit_coverage_fraction.astype(float),
+            "reward_window_status": status,
+            "window_start_position": start_pos,
+            "window_end_position": start_pos + hours_in_window - 1,
+        }
+    )
 
 
 def prepare_hourly_model_data(
@@ -651,12 +1059,13 @@ def get_cached_participant_hourly(
     return cache.get_or_compute(
         "participant_hourly_frame",
         cache_inputs,
-        lambda: load_participant_hourly_from_csv(
+        lambda: load_participant_hourly(
             cache.cfg.csv_path,
             participant_id,
             start_utc.isoformat(),
             end_utc.isoformat(),
             lookback_hours=lookback_hours,
+            store_dir=cache.cfg.participant_store_directory,
         ),
         prepare_for_store=lambda frame: frame.copy(deep=True),
     )
@@ -753,9 +1162,9 @@ def _nb_logpmf_mean_disp(obs: jax.Array, mean: jax.Array, disp: jax.Array) -> ja
         + obs * (jnp.log(mean) - jnp.log(disp + mean))
     )
 
-def _build_pomp_object(data: HourlyStepModelData, theta0: dict[str, float]) -> Pomp:
+def _build_pomp_object(data: HourlyStepModelData, theta0: dict[str, float] | list[dict[str, float]]) -> Pomp:
     cov_pairs = [(COVARIATE_SPECS[k].source_col, COVARIATE_SPECS[k].beta_param) for k in data.covariate_keys]
-    par_trans = _build_par_trans(theta0)
+    par_trans = _build_par_trans(theta0[0] if isinstance(theta0, list) else theta0)
 
     def rinit(theta_, key, covars, t0):
         return {"x": 0.0, "N": 1.0}
@@ -929,6 +1338,79 @@ def run_step_pomp_fit(
         runtime_breakdown=runtime_breakdown,
     )
 
+def _theta_rows(frame: pd.DataFrame, theta_index: int) -> pd.DataFrame:
+    if frame.empty or "theta_idx" not in frame.columns:
+        return frame.copy()
+    return frame.loc[frame["theta_idx"] == theta_index].reset_index(drop=True)
+
+def run_step_pomp_fit_stacked(
+    data: HourlyStepModelData,
+    *,
+    initial_params_list: list[dict[str, float]],
+    free_params: list[str] | None,
+    particles: int,
+    mif_iterations: int,
+    random_seed: int,
+    cooling_fraction: float,
+    rw_sd_scale: float,
+    evaluation_particles: int | None = None,
+    evaluation_pfilter_reps: int = 1,
+) -> list[StepPompFitResult]:
+    """run_step_pomp_fit for several starts at once: one Pomp holding every theta,
+    one mif and one pfilter call. Results come back in input order; the shared
+    Pomp is not attached to them (pomp_object=None)."""
+    fit_start = perf_counter()
+    thetas = [_build_theta0(params, data.covariate_keys) for params in initial_params_list]
+    theta0 = thetas[0]
+    pomp = _build_pomp_object(data, thetas)
+    free_param_names = theta0.keys() if free_params is None else [name for name in free_params if name in theta0]
+    mif_key = jax.random.key(int(random_seed))
+
+    fit_with_mif = bool(free_param_names) and int(mif_iterations) > 0
+    if fit_with_mif:
+        rw_sd = RWSigma({name: (float(rw_sd_scale) if name in free_param_names else 0.0) for name in theta0})
+        pomp.mif(J=int(particles), M=int(mif_iterations), rw_sd=rw_sd, a=float(cooling_fraction), key=mif_key)
+        mif_results = pomp.results(index=-1).copy()
+        mif_traces = pomp.traces().copy()
+
+    eval_particles = int(evaluation_particles or particles)
+    eval_reps = max(1, int(evaluation_pfilter_reps))
+    pomp.pfilter(J=eval_particles, reps=eval_reps, key=jax.random.fold_in(mif_key, 1), filter_mean=True)
+    pfilter_results = pomp.results(index=-1).copy()
+    timing_frame = pomp.time().copy()
+    seconds_per_fit = float(perf_counter() - fit_start) / len(thetas)
+
+    results = []
+    for theta_index, theta in enumerate(thetas):
+        if fit_with_mif:
+            mif_summary = _theta_rows(mif_results, theta_index)
+            theta_traces = _theta_rows(mif_traces, theta_index)
+        else:
+            mif_summary = pd.DataFrame([{"method": "fixed_theta", **theta}])
+            theta_traces = pd.DataFrame()
+        pfilter_summary = _theta_rows(pfilter_results, theta_index)
+        pfilter_row = pfilter_summary.iloc[0].drop("theta_idx", errors="ignore") if not pfilter_summary.empty else pd.Series(theta)
+        fitted_params = _coerce_param_row(pfilter_row)
+        for name, value in theta.items():
+            if name not in free_param_names:
+                fitted_params[name] = float(value)
+        loglik = float(pfilter_summary["logLik"].iloc[0]) if (not pfilter_summary.empty and "logLik" in pfilter_summary.columns) else float("nan")
+
+        results.append(
+            StepPompFitResult(
+                initial_params={name: float(value) for name, value in theta.items()},
+                fitted_params=fitted_params,
+                loglik=loglik,
+                pomp_object=None,
+                mif_summary=mif_summary,
+                mif_traces=theta_traces,
+                pfilter_summary=pfilter_summary,
+                timing_frame=timing_frame.copy(),
+                runtime_breakdown=pd.DataFrame([{"step": "fit_total", "seconds": seconds_per_fit}]),
+            )
+        )
+    return results
+
 def run_step_pomp_if2(
     data: HourlyStepModelData,
     *,
@@ -1077,6 +1559,83 @@ def _build_stage_candidates(*, stage_index: int, stage: GlobalSearchStageConfig,
     return candidates
 
 
+CANDIDATE_EXECUTORS = ("serial", "process", "stacked")
+
+def _fit_candidate(data: HourlyStepModelData, fit_kwargs: dict) -> dict[str, object]:
+    fit_start = perf_counter()
+    fit_result, error_text = None, ""
+    try:
+        fit_result = run_step_pomp_fit(data, **fit_kwargs)
+    except Exception as exc:
+        error_text = str(exc)
+    return {"fit_result": fit_result, "error": error_text, "runtime_seconds": float(perf_counter() - fit_start), "runtime_is_shared": False}
+
+def _fit_candidate_in_worker(data: HourlyStepModelData, fit_kwargs: dict) -> dict[str, object]:
+    outcome = _fit_candidate(data, fit_kwargs)
+    # Pomp objects hold jitted closures and do not pickle
+    if outcome["fit_result"] is not None:
+        outcome["fit_result"] = strip_step_pomp_fit_result(outcome["fit_result"])
+    return outcome
+
+def _fit_stage_candidates(
+    data: HourlyStepModelData,
+    fit_kwargs_list: list[dict],
+    *,
+    stage_seed: int,
+    executor: str,
+    max_workers: int | None,
+) -> list[dict[str, object]]:
+    """Fit every candidate of a stage; one outcome dict per candidate, in order.
+
+    "serial" fits the candidates one after another in this process and
+    "process" fits them on a process pool, with identical results. The pool
+    defaults to one worker per CPU this process may run on, so inside a
+    pinned run_cohort worker it stays within that worker's CPUs.
+
+    "stacked" runs the stage as one multi-theta Pomp. It draws one random
+    stream for the whole stage, so its fits differ from the per-candidate
+    ones, and runtime_seconds is the stage time split evenly (flagged by
+    runtime_is_shared). It needs a
+    common particle count, IF2 schedule and evaluation setting and gives up a
+    failing candidate's own error message; if the candidates differ or the
+    stacked fit raises (with a warning carrying the traceback), the stage
+    falls back to "process".
+    """
+    if executor not in CANDIDATE_EXECUTORS:
+        raise ValueError(f"Unknown candidate executor {executor!r}; expected one of {CANDIDATE_EXECUTORS}.")
+
+    if executor == "stacked":
+        shared = [{k: v for k, v in kwargs.items() if k not in {"initial_params", "random_seed"}} for kwargs in fit_kwargs_list]
+        if all(s == shared[0] for s in shared):
+            stage_start = perf_counter()
+            try:
+                fit_results = run_step_pomp_fit_stacked(
+                    data,
+                    initial_params_list=[kwargs["initial_params"] for kwargs in fit_kwargs_list],
+                    random_seed=stage_seed,
+                    **shared[0],
+                )
+            except Exception:
+                warnings.warn(
+                    "Stacked stage fit failed; refitting the candidates one by one.\n" + traceback.format_exc(),
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+            else:
+                seconds = float(perf_counter() - stage_start) / len(fit_results)
+                return [{"fit_result": r, "error": "", "runtime_seconds": seconds, "runtime_is_shared": True} for r in fit_results]
+        executor = "process"
+
+    if executor == "process" and max_workers is None:
+        max_workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    if executor == "process" and len(fit_kwargs_list) > 1 and max_workers > 1:
+        max_workers = min(max_workers, len(fit_kwargs_list))
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context("spawn")) as pool:
+            futures = [pool.submit(_fit_candidate_in_worker, data, kwargs) for kwargs in fit_kwargs_list]
+            return [future.result() for future in futures]
+
+    return [_fit_candidate(data, kwargs) for kwargs in fit_kwargs_list]
+
 def run_multistage_step_pomp_search(
     data: HourlyStepModelData,
     *,
@@ -1088,6 +1647,8 @@ def run_multistage_step_pomp_search(
     include_current_theta_as_start: bool = True,
     jitter_scale: float = 0.10,
     box_shrink_factor_per_stage: float = 1.0,
+    candidate_executor: str = "serial",
+    max_workers: int | None = None,
 ) -> GlobalSearchResult:
     normalized_initial = {name: float(value) for name, value in initial_params.items()}
     normalized_free_params = _coerce_free_params(free_params, normalized_initial)
@@ -1122,41 +1683,42 @@ def run_multistage_step_pomp_search(
             rng=rng,
         )
 
+        stage_seed = int(random_seed) + stage_index * 10_000
+        fit_kwargs_list = [
+            {
+                "initial_params": dict(candidate["params"]),
+                "free_params": normalized_free_params,
+                "particles": stage.particles,
+                "mif_iterations": stage.mif_iterations,
+                "random_seed": stage_seed + candidate_index,
+                "cooling_fraction": stage.cooling_fraction,
+                "rw_sd_scale": stage.rw_sd_scale,
+                "evaluation_particles": stage.evaluation_particles,
+                "evaluation_pfilter_reps": stage.evaluation_pfilter_reps,
+            }
+            for candidate_index, candidate in enumerate(stage_candidates, start=1)
+        ]
+        outcomes = _fit_stage_candidates(data, fit_kwargs_list, stage_seed=stage_seed, executor=candidate_executor, max_workers=max_workers)
+
         stage_rows = []
-        for candidate_index, candidate in enumerate(stage_candidates, start=1):
+        for candidate_index, (candidate, outcome) in enumerate(zip(stage_candidates, outcomes), start=1):
             candidate_id = f"stage_{stage_index + 1:02d}_cand_{candidate_index:03d}"
-            fit_seed = int(random_seed) + stage_index * 10_000 + candidate_index
-            fit_start = perf_counter()
+            fit_seed = stage_seed + candidate_index
             fitted_params = {}
             fit_initial_params = dict(candidate["params"])
             loglik = float("nan")
-            error_text = ""
-            fit_succeeded = False
-            fit_result = None
+            error_text = outcome["error"]
+            fit_result = outcome["fit_result"]
+            fit_succeeded = fit_result is not None
 
-            try:
-                fit_result = run_step_pomp_fit(
-                    data,
-                    initial_params=fit_initial_params,
-                    free_params=normalized_free_params,
-                    particles=stage.particles,
-                    mif_iterations=stage.mif_iterations,
-                    random_seed=fit_seed,
-                    cooling_fraction=stage.cooling_fraction,
-                    rw_sd_scale=stage.rw_sd_scale,
-                    evaluation_particles=stage.evaluation_particles,
-                    evaluation_pfilter_reps=stage.evaluation_pfilter_reps,
-                )
-                fit_succeeded = True
+            if fit_succeeded:
                 loglik = float(fit_result.loglik)
                 fitted_params = dict(fit_result.fitted_params)
                 fit_initial_params = dict(fit_result.initial_params)
                 if best_fit is None or (np.isfinite(loglik) and (not np.isfinite(best_fit.loglik) or loglik > float(best_fit.loglik))):
                     best_fit = fit_result
-            except Exception as exc:
-                error_text = str(exc)
 
-            runtime_seconds = float(perf_counter() - fit_start)
+            runtime_seconds = float(outcome["runtime_seconds"])
             total_runtime_seconds += runtime_seconds
 
             row = {
@@ -1169,6 +1731,7 @@ def run_multistage_step_pomp_search(
                 "fit_succeeded": fit_succeeded,
                 "loglik": loglik,
                 "runtime_seconds": runtime_seconds,
+                "runtime_is_shared": bool(outcome["runtime_is_shared"]),
                 "particles": stage.particles,
                 "mif_iterations": stage.mif_iterations,
                 "cooling_fraction": stage.cooling_fraction,
@@ -1215,6 +1778,7 @@ def run_multistage_step_pomp_search(
                 "best_loglik": float(pd.to_numeric(stage_frame["loglik"], errors="coerce").max()) if stage_frame["loglik"].notna().any() else np.nan,
                 "median_loglik": float(pd.to_numeric(successful_frame["loglik"], errors="coerce").median()) if not successful_frame.empty else np.nan,
                 "runtime_seconds": float(pd.to_numeric(stage_frame["runtime_seconds"], errors="coerce").sum()),
+                "runtime_is_shared": bool(stage_frame["runtime_is_shared"].any()),
                 "fresh_random_starts": stage.n_fresh_random_starts,
                 "jittered_restarts": stage.n_jittered_restarts,
                 "stage_best_candidate_id": str(stage_frame.iloc[0]["candidate_id"]),
@@ -1265,6 +1829,8 @@ def get_cached_global_search_result(
     include_current_theta_as_start: bool,
     jitter_scale: float,
     box_shrink_factor_per_stage: float,
+    candidate_executor: str = "serial",
+    max_workers: int | None = None,
 ) -> GlobalSearchResult:
     stage_config_snapshot = [
         {
@@ -1296,6 +1862,10 @@ def get_cached_global_search_result(
         "jitter_scale": float(jitter_scale),
         "box_shrink_factor_per_stage": float(box_shrink_factor_per_stage),
     }
+    if candidate_executor == "stacked":
+        # stacked fits draw one random stream per stage, so results differ; the
+        # per-candidate executors keep the key searches were cached under
+        cache_inputs["candidate_executor"] = "stacked"
     return cache.get_or_compute(
         "global_step_pomp_search_result",
         cache_inputs,
@@ -1309,6 +1879,8 @@ def get_cached_global_search_result(
             include_current_theta_as_start=include_current_theta_as_start,
             jitter_scale=jitter_scale,
             box_shrink_factor_per_stage=box_shrink_factor_per_stage,
+            candidate_executor=candidate_executor,
+            max_workers=max_workers,
         ),
         prepare_for_store=strip_global_search_result,
     )
@@ -1440,6 +2012,8 @@ def run_participant(participant_id: str, *, cache_cfg: CacheConfig, cfg: Analysi
         include_current_theta_as_start=bool(cfg.global_search_include_current_theta_as_start),
         jitter_scale=float(cfg.global_search_jitter_scale),
         box_shrink_factor_per_stage=float(cfg.global_search_box_shrink_factor_per_stage),
+        candidate_executor=str(cfg.global_search_candidate_executor),
+        max_workers=cfg.global_search_max_workers,
     )
 
     global_best_fit = global_search_result.best_fit
@@ -1487,3 +2061,165 @@ def run_participant(participant_id: str, *, cache_cfg: CacheConfig, cfg: Analysi
         global_stage_summary=global_stage_summary,
         coefficient_table=coefficient_table,
     )
+
+
+# -----------------------------
+# Cohort runner
+# -----------------------------
+@dataclass(frozen=True)
+class CohortWorkerLimits:
+    max_workers: int = 2
+    threads_per_worker: int = 1
+    jax_platform: str | None = None          # e.g. "cpu"; None keeps JAX's default
+    devices: list[str] | None = None         # GPU ids handed out round-robin, one per worker
+    memory_fraction: float | None = None     # per-worker GPU memory cap (no effect on CPU); default 0.9 / max_workers
+
+
+@dataclass
+class CohortResult:
+    results: dict[str, ParticipantResult]
+    failures: pd.DataFrame
+
+    participant_summary: pd.DataFrame
+    local_mle_summary: pd.DataFrame
+    global_best_summary: pd.DataFrame
+    global_stage_summary: pd.DataFrame
+    coefficient_table: pd.DataFrame
+
+
+def _pin_worker_cpus(slot: int, threads: int) -> None:
+    """Pin this process to the `threads` CPUs of worker `slot`.
+
+    XLA sizes its CPU thread pools from the affinity mask, so this is what
+    bounds JAX's threads. Blocks wrap around when the workers ask for more
+    CPUs than there are; platforms without sched_setaffinity are left as is.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    cpus = sorted(os.sched_getaffinity(0))
+    os.sched_setaffinity(0, {cpus[(slot * threads + i) % len(cpus)] for i in range(threads)})
+
+
+def _apply_worker_limits(limits: CohortWorkerLimits, slot: int) -> None:
+    # must run before this process first touches a JAX backend
+    threads = max(int(limits.threads_per_worker), 1)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    _pin_worker_cpus(slot, threads)
+    # the XLA_PYTHON_CLIENT_* settings only apply to GPU/TPU backends
+    os.environ["XLA_PYTHON_CLIENT_PREALLOCATE"] = "false"
+    memory_fraction = limits.memory_fraction
+    if memory_fraction is None:
+        memory_fraction = 0.9 / max(int(limits.max_workers), 1)
+    os.environ["XLA_PYTHON_CLIENT_MEM_FRACTION"] = f"{memory_fraction:.3f}"
+    if limits.jax_platform is not None:
+        os.environ["JAX_PLATFORMS"] = limits.jax_platform
+    if limits.devices:
+        os.environ["CUDA_VISIBLE_DEVICES"] = str(limits.devices[slot % len(limits.devices)])
+
+
+def _cohort_worker(participant_id, cache_cfg, cfg, limits, slot, result_queue) -> None:
+    _apply_worker_limits(limits, slot)
+    try:
+        result = run_participant(participant_id, cache_cfg=cache_cfg, cfg=cfg)
+        result_queue.put((participant_id, result, None))
+    except BaseException:
+        result_queue.put((participant_id, None, traceback.format_exc()))
+
+
+def _concat_tables(results: list[ParticipantResult], attr: str) -> pd.DataFrame:
+    frames = [getattr(r, attr) for r in results]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def run_cohort(
+    participant_ids: list[str],
+    *,
+    cache_cfg: CacheConfig,
+    cfg: AnalysisConfig,
+    limits: CohortWorkerLimits = CohortWorkerLimits(),
+    poll_seconds: float = 1.0,
+) -> CohortResult:
+    """Run run_participant for every participant on separate worker processes.
+
+    Each participant runs in its own spawned process, which applies `limits`
+    before it imports JAX: it is pinned to `threads_per_worker` CPUs of its
+    slot, gets one of `devices`, and on GPU is capped at `memory_fraction` of
+    device memory. All workers share `cache_cfg` unchanged, so existing caches
+    are read as in a single-participant run; the cache backends lock around
+    concurrent access. Workers report through one result queue; an
+    exception, or a worker that dies without reporting (e.g. killed for
+    memory), is recorded in `failures` and the remaining participants still
+    run. Summary tables are concatenated in the order of `participant_ids`.
+    """
+    participant_ids = list(dict.fromkeys(participant_ids))
+    if cache_cfg.participant_store_directory is not None and pa is not None:
+        # build once here rather than in every worker
+        ensure_participant_store(cache_cfg.csv_path, cache_cfg.participant_store_directory)
+
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+    pending = list(participant_ids)
+    running: dict[str, mp.Process] = {}
+    results: dict[str, ParticipantResult] = {}
+    failures: list[dict[str, str]] = []
+    reported: set[str] = set()
+    free_slots = list(range(max(int(limits.max_workers), 1)))
+    slot_of: dict[str, int] = {}
+
+    def handle(message) -> None:
+        participant_id, result, error = message
+        reported.add(participant_id)
+        if error is None:
+            results[participant_id] = result
+        else:
+            failures.append({"Participant ID": participant_id, "error": error.strip().splitlines()[-1], "traceback": error})
+
+    while pending or running:
+        while pending and free_slots:
+            participant_id = pending.pop(0)
+            slot = free_slots.pop(0)
+            process = ctx.Process(
+                target=_cohort_worker,
+                args=(participant_id, cache_cfg, cfg, limits, slot, result_queue),
+                name=f"cohort-{participant_id}",
+            )
+            process.start()
+            running[participant_id] = process
+            slot_of[participant_id] = slot
+
+        try:
+            handle(result_queue.get(timeout=poll_seconds))
+        except queue.Empty:
+            pass
+
+        for participant_id, process in list(running.items()):
+            if process.is_alive():
+                continue
+            # drain what a finished worker flushed before exiting
+            while participant_id not in reported:
+                try:
+                    handle(result_queue.get(timeout=poll_seconds))
+                except queue.Empty:
+                    break
+            process.join()
+            if participant_id not in reported:
+                reported.add(participant_id)
+                failures.append({
+                    "Participant ID": participant_id,
+                    "error": f"worker exited with code {process.exitcode} without a result",
+                    "traceback": "",
+                })
+            del running[participant_id]
+            free_slots.append(slot_of.pop(participant_id))
+
+    ordered = [results[pid] for pid in participant_ids if pid in results]
+    return CohortResult(
+        results={r.participant_id: r for r in ordered},
+        failures=pd.DataFrame(failures, columns=["Participant ID", "error", "traceback"]),
+        participant_summary=_concat_tables(ordered, "participant_summary"),
+        local_mle_summary=_concat_tables(ordered, "local_mle_summary"),
+        global_best_summary=_concat_tables(ordered, "global_best_summary"),
+        global_stage_summary=_concat_tables(ordered, "global_stage_summary"),
+        coefficient_table=_concat_tables(ordered, "coefficient_table"),
+    )
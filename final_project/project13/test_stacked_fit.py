@@ -0,0 +1,106 @@
+"""Two-candidate stacked fit against the serial path.
+
+The stacked executor draws one random stream for the whole stage, so its
+fits do not match the per-candidate ones draw for draw. With theta held
+fixed (no IF2 iterations) the fitted parameters must be identical and the
+log-likelihoods must agree within Z_TOL combined Monte Carlo standard
+errors. With IF2 iterations the two paths must return the same kind of
+result for every candidate.
+
+Run from this directory with `python -m pytest test_stacked_fit.py`.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+import hw8_analysis as hw8
+
+N_HOURS = 24 * 4
+PARTICLES = 500
+PFILTER_REPS = 5
+SEED = 7
+Z_TOL = 4.0
+
+
+def small_model_data() -> hw8.HourlyStepModelData:
+    rng = np.random.default_rng(SEED)
+    time_utc = pd.date_range("2023-01-01 05:00", periods=N_HOURS, freq="h", tz="UTC")
+    observed = np.repeat(rng.random(N_HOURS // 6 + 1) > 0.3, 6)[:N_HOURS]
+    frame = pd.DataFrame(
+        {
+            "time_utc": time_utc,
+            "fitbitSteps": np.where(observed, rng.poisson(250, N_HOURS), np.nan),
+            "messageSent": (rng.random(N_HOURS) < 0.05).astype(float),
+            "fitbitSleepMinutes": np.where(observed, rng.integers(0, 60, N_HOURS), np.nan),
+            "fitbitHRAvg": np.where(observed, rng.normal(70, 8, N_HOURS), np.nan),
+            "moodScore": np.nan,
+        }
+    )
+    return hw8.prepare_hourly_model_data(
+        frame,
+        participant_id="synthetic",
+        start_utc=time_utc[0],
+        end_utc=time_utc[-1],
+        covariate_keys=["trail_steps_24h"],
+        assumed_timezone="America/New_York",
+    )
+
+
+def two_starts(data: hw8.HourlyStepModelData) -> list[dict[str, float]]:
+    base = hw8.build_step_pomp_default_params(data)
+    return [base, {**base, "phi": 0.5, "sigma": 0.6}]
+
+
+def model_params(fitted_params: dict[str, float]) -> dict[str, float]:
+    # the serial path keeps pypomp's theta_idx column in fitted_params
+    return {name: value for name, value in fitted_params.items() if name != "theta_idx"}
+
+
+def fit_kwargs(initial_params: dict[str, float], random_seed: int, mif_iterations: int) -> dict:
+    return {
+        "initial_params": initial_params,
+        "free_params": ["phi", "sigma"],
+        "particles": PARTICLES,
+        "mif_iterations": mif_iterations,
+        "random_seed": random_seed,
+        "cooling_fraction": 0.5,
+        "rw_sd_scale": 0.02,
+        "evaluation_particles": PARTICLES,
+        "evaluation_pfilter_reps": PFILTER_REPS,
+    }
+
+
+def test_stacked_fixed_theta_matches_serial():
+    data = small_model_data()
+    kwargs_list = [fit_kwargs(params, SEED + i, mif_iterations=0) for i, params in enumerate(two_starts(data), start=1)]
+    serial = [hw8.run_step_pomp_fit(data, **kwargs) for kwargs in kwargs_list]
+    stacked = hw8.run_step_pomp_fit_stacked(
+        data,
+        initial_params_list=[kwargs["initial_params"] for kwargs in kwargs_list],
+        random_seed=SEED,
+        **{k: v for k, v in kwargs_list[0].items() if k not in {"initial_params", "random_seed"}},
+    )
+
+    assert len(stacked) == len(serial)
+    for ser, stk in zip(serial, stacked):
+        assert stk.fitted_params == model_params(ser.fitted_params)
+        se = math.hypot(float(ser.pfilter_summary["se"].iloc[0]), float(stk.pfilter_summary["se"].iloc[0]))
+        assert abs(stk.loglik - ser.loglik) < Z_TOL * se
+
+
+def test_stacked_stage_matches_serial_stage():
+    data = small_model_data()
+    kwargs_list = [fit_kwargs(params, SEED + i, mif_iterations=2) for i, params in enumerate(two_starts(data), start=1)]
+    serial = hw8._fit_stage_candidates(data, kwargs_list, stage_seed=SEED, executor="serial", max_workers=None)
+    stacked = hw8._fit_stage_candidates(data, kwargs_list, stage_seed=SEED, executor="stacked", max_workers=None)
+
+    assert len(stacked) == len(serial) == 2
+    for ser, stk in zip(serial, stacked):
+        assert ser["error"] == stk["error"] == ""
+        assert not ser["runtime_is_shared"] and stk["runtime_is_shared"]
+        assert stk["fit_result"].fitted_params.keys() == model_params(ser["fit_result"].fitted_params).keys()
+        assert stk["fit_result"].initial_params == ser["fit_result"].initial_params
+        assert np.isfinite(stk["fit_result"].loglik) and np.isfinite(ser["fit_result"].loglik)
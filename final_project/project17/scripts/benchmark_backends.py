@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Parity and throughput check for the poliopomp_robust filter backends.
+
+Runs pfilter repeatedly with each backend on the monthly polio series and
+reports the mean log-likelihood, its Monte Carlo standard error and the
+mean wall time per filter. A backend passes the parity check when its mean
+differs from the NumPy reference by less than `--z` combined standard
+errors. The first call of each compiled backend is excluded from the
+timings (compilation).
+
+On the reference machine (J=3000, T=420, 20 filters) numba runs about
+2.6-3.2x faster than NumPy per filter; the per-filter Monte Carlo standard
+error at this theta is about 20 log units. test_backend_parity.py runs the
+same comparison with fixed seeds as a regression test.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import poliopomp_robust as pr
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument(
+        "--data",
+        type=str,
+        default="data/aggregated_monthly_polio_1930_1964.csv",
+    )
+    p.add_argument(
+        "--backends",
+        nargs="+",
+        choices=pr.FILTER_BACKENDS,
+        default=list(pr.FILTER_BACKENDS),
+    )
+    p.add_argument("--particles", type=int, default=3000)
+    p.add_argument("--reps", type=int, default=20)
+    p.add_argument("--z", type=float, default=3.0)
+    p.add_argument("--seed", type=int, default=1)
+    return p.parse_args()
+
+
+def run_backend(backend, theta, n_particles, n_reps, seed):
+    compile_t0 = time.perf_counter()
+    pr.pfilter(pr.y, theta, n_particles=n_particles, seed=0, backend=backend)
+    compile_time = time.perf_counter() - compile_t0
+
+    seeds = np.random.default_rng(seed).integers(2**31, size=n_reps)
+    lls = np.zeros(n_reps)
+    t0 = time.perf_counter()
+    for r, s in enumerate(seeds):
+        lls[r] = pr.pfilter(
+            pr.y, theta, n_particles=n_particles, seed=int(s), backend=backend
+        )["log_lik"]
+    per_filter = (time.perf_counter() - t0) / n_reps
+    return {
+        "mean": float(np.mean(lls)),
+        "se": float(np.std(lls, ddof=1) / np.sqrt(n_reps)),
+        "per_filter": per_filter,
+        "first_call": compile_time,
+    }
+
+
+def reference_theta():
+    return pr.transform(
+        beta0=4.0,
+        a1=0.60,
+        b1=-0.20,
+        a2=0.15,
+        b2=-0.05,
+        delta_post=-1.20,
+        alpha=0.92,
+        nu=min(800.0, pr.MAX_NU),
+        k_proc=20.0,
+        sigma_A=0.20,
+        eta=0.45,
+        I0=max(20.0, float(np.median(pr.y_raw[:6]))),
+        sigma_obs=0.45,
+    )
+
+
+def parity_z(result, ref):
+    return (result["mean"] - ref["mean"]) / np.hypot(result["se"], ref["se"])
+
+
+def main():
+    args = parse_args()
+    dat = pr.load_monthly_data(args.data)
+    pr.initialize_covariates(dat)
+    theta = reference_theta()
+
+    backends = ["numpy"] + [b for b in args.backends if b != "numpy"]
+    results = {
+        b: run_backend(b, theta, args.particles, args.reps, args.seed)
+        for b in backends
+    }
+    ref = results["numpy"]
+
+    print(f"J={args.particles}, T={pr.T}, {args.reps} filters per backend")
+    print(
+        f"{'backend':<8} {'loglik':>11} {'se':>7} {'s/filter':>9} "
+        f"{'speedup':>8} {'z':>6}"
+    )
+    failed = []
+    for b, r in results.items():
+        z = parity_z(r, ref)
+        if abs(z) > args.z:
+            failed.append(b)
+        print(
+            f"{b:<8} {r['mean']:11.2f} {r['se']:7.2f} "
+            f"{r['per_filter']:9.3f} "
+            f"{ref['per_filter'] / r['per_filter']:7.1f}x {z:6.2f}"
+        )
+    if failed:
+        print(f"parity check failed for: {', '.join(failed)}")
+        sys.exit(1)
+    print("parity check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Microbenchmark of one particle-filter time step in poliopomp_robust.
+
+Compares the reference kernel (clamp_theta + untransform inside every model
+call, fresh arrays each step) with the preallocated in-place kernel. For
+each, one "step" is dmeasure, weight normalization, systematic resampling
+and the state transition, as in the body of pfilter.
+
+Reports mean wall time per step and, from tracemalloc, the mean peak of
+heap memory allocated within a step.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import poliopomp_robust as pr
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument(
+        "--data",
+        type=str,
+        default="data/aggregated_monthly_polio_1930_1964.csv",
+    )
+    p.add_argument("--particles", type=int, default=3000)
+    p.add_argument("--steps", type=int, default=400)
+    p.add_argument("--seed", type=int, default=1)
+    return p.parse_args()
+
+
+def reference_step(state, theta_particles, t, rng):
+    log_w = pr.dmeasure_log(state, theta_particles, pr.y[t])
+    max_lw = np.max(log_w)
+    w = np.exp(log_w - max_lw)
+    w /= np.sum(w)
+    idx = pr.systematic_resample(w, rng)
+    state = state[idx]
+    theta_particles = theta_particles[idx]
+    return pr.step_particles(state, theta_particles, t + 1, rng)
+
+
+def inplace_step(ws, t, rng):
+    nat = pr.untransform_into(ws["theta"], ws)
+    log_w = pr.dmeasure_log_into(ws["state"], nat, pr.y[t], ws)
+    pr.weight_update_into(log_w, ws["w"].shape[0], ws)
+    idx = pr.systematic_resample_into(ws["w"], rng, ws)
+    pr.resample_into(ws, idx, ("state", "theta", "nat"))
+    pr.step_particles_into(ws["state"], ws["nat"], t + 1, rng, ws)
+
+
+def measure(step, n_steps):
+    # Timing pass without tracing, then a traced pass for allocations.
+    t0 = time.perf_counter()
+    for k in range(n_steps):
+        step(k % (pr.T - 1))
+    per_step = (time.perf_counter() - t0) / n_steps
+
+    tracemalloc.start()
+    peaks = []
+    for k in range(n_steps):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        step(k % (pr.T - 1))
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return per_step, float(np.mean(peaks))
+
+
+def main():
+    args = parse_args()
+    dat = pr.load_monthly_data(args.data)
+    pr.initialize_covariates(dat)
+    theta = pr.transform(
+        beta0=4.0,
+        a1=0.60,
+        b1=-0.20,
+        a2=0.15,
+        b2=-0.05,
+        delta_post=-1.20,
+        alpha=0.92,
+        nu=min(800.0, pr.MAX_NU),
+        k_proc=20.0,
+        sigma_A=0.20,
+        eta=0.45,
+        I0=max(20.0, float(np.median(pr.y_raw[:6]))),
+        sigma_obs=0.45,
+    )
+    J = args.particles
+
+    rng = np.random.default_rng(args.seed)
+    ref = {
+        "theta": np.broadcast_to(theta, (J, pr.N_PARAMS)).copy(),
+    }
+    ref["state"] = pr.init_state(ref["theta"], rng)
+
+    def ref_step(t):
+        ref["state"] = reference_step(ref["state"], ref["theta"], t, rng)
+
+    ws = pr.make_workspace(J)
+    np.copyto(ws["theta"], theta)
+    pr.init_state_into(pr.untransform_into(ws["theta"], ws), rng, ws)
+
+    rows = [
+        ("reference", *measure(ref_step, args.steps)),
+        ("inplace", *measure(lambda t: inplace_step(ws, t, rng), args.steps)),
+    ]
+    print(f"J={J}, {args.steps} steps")
+    print(f"{'kernel':<10} {'ms/step':>9} {'peak KiB/step':>14}")
+    for name, per_step, peak in rows:
+        print(f"{name:<10} {1e3 * per_step:9.3f} {peak / 1024:14.1f}")
+    print(
+        f"speedup {rows[0][1] / rows[1][1]:.2f}x, "
+        f"peak allocation reduced {rows[0][2] / max(rows[1][2], 1):.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import matplotlib
@@ -48,16 +51,103 @@ def parse_args():
     p.add_argument("--local-cooling", type=float, default=0.3)
     p.add_argument("--rep-particles", type=int, default=3000)
     p.add_argument("--rep-reps", type=int, default=10)
+    p.add_argument(
+        "--rep-target-se",
+        type=float,
+        default=None,
+        help="Adapt particles/reps per candidate until the log-lik SE "
+        "reaches this value; --rep-particles/--rep-reps are the start.",
+    )
+    p.add_argument(
+        "--rep-budget",
+        type=int,
+        default=None,
+        help="Particle budget per adaptive evaluation (particles summed "
+        "over filters; default 8 * rep_particles * rep_reps).",
+    )
     p.add_argument("--filter-particles", type=int, default=1200)
+    p.add_argument(
+        "--quantile-method",
+        choices=QUANTILE_METHODS,
+        default="sort",
+        help="Weighted-quantile estimator for the filtered latent bands.",
+    )
+    p.add_argument(
+        "--batched-eval",
+        action="store_true",
+        help="Score IF2 trace candidates with one batched particle filter.",
+    )
+    p.add_argument(
+        "--eval-max-batch",
+        type=int,
+        default=None,
+        help="Max thetas per batched filter sweep (bounds memory).",
+    )
     p.add_argument("--simulations", type=int, default=200)
     p.add_argument("--seed", type=int, default=20260421)
     p.add_argument("--verbose-if2", action="store_true")
+    p.add_argument(
+        "--trace-dir",
+        type=str,
+        default=None,
+        help="Stream each IF2 chain's per-iteration trace to .npy files here.",
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Checkpoint each stage under OUTDIR/checkpoints and reuse the "
+        "checkpoints of an earlier --resume run with the same arguments and "
+        "data. Without it no checkpoints are written.",
+    )
+    p.add_argument(
+        "--backend",
+        choices=FILTER_BACKENDS,
+        default="numpy",
+        help="Particle-filter implementation for log-likelihood evaluation.",
+    )
+    p.add_argument(
+        "--inplace-kernel",
+        action="store_true",
+        help="Use the preallocated in-place model kernel in pfilter/mif2.",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to run independent IF2 chains in parallel.",
+    )
     p.add_argument("--run-profile", action="store_true")
     p.add_argument("--profile-points", type=int, default=7)
     p.add_argument("--profile-restarts", type=int, default=5)
     p.add_argument("--profile-iters", type=int, default=40)
     p.add_argument("--profile-particles", type=int, default=1000)
-    return p.parse_args()
+    p.add_argument(
+        "--profile-warm-start",
+        action="store_true",
+        help="Continue each profile point from its converged neighbour.",
+    )
+    p.add_argument(
+        "--profile-warm-iters",
+        type=int,
+        default=None,
+        help="IF2 iterations for warm-started profile points "
+        "(default: half of --profile-iters).",
+    )
+    p.add_argument(
+        "--profile-warm-segments",
+        type=int,
+        default=2,
+        help="With --profile-warm-start, split the grid into this many "
+        "continuation segments, each starting cold from the MLE. Segments "
+        "run in parallel, so at most this many --workers are used; more "
+        "segments mean more cold starts.",
+    )
+    args = p.parse_args()
+    if args.batched_eval and (
+        args.rep_target_se is not None or args.rep_budget is not None
+    ):
+        p.error("--batched-eval does not support --rep-target-se/--rep-budget")
+    return args
 
 
 def load_monthly_data(path, year_start=1930, year_end=1964):
@@ -297,19 +387,41 @@ def systematic_resample(w, rng):
     return np.clip(idx, 0, n - 1)
 
 
-def init_state(theta_particles, rng):
+def systematic_resample_batched(w, rng):
+    # Row-wise systematic resampling for weights of shape (..., n). Each row
+    # is shifted by its row number so that a single searchsorted over the
+    # flattened cumulative sums resolves every row at once.
+    batch_shape = w.shape[:-1]
+    n = w.shape[-1]
+    n_rows = int(np.prod(batch_shape, dtype=int))
+    u = rng.uniform(size=batch_shape).reshape(n_rows, 1)
+    offsets = np.arange(n_rows, dtype=float)[:, np.newaxis]
+    positions = (u + np.arange(n)) / n + offsets
+    cumsum = np.cumsum(w.reshape(n_rows, n), axis=-1)
+    cumsum[:, -1] = 1.0
+    cumsum += offsets
+    idx = np.searchsorted(cumsum.ravel(), positions.ravel())
+    idx = idx.reshape(n_rows, n) - n * np.arange(n_rows)[:, np.newaxis]
+    return np.clip(idx, 0, n - 1).reshape(w.shape)
+
+
+def init_state(theta_particles, rng, shape=None):
+    # `shape` gives the particle batch shape when `theta_particles` only
+    # broadcasts against it, e.g. (n_thetas, 1, 1, N_PARAMS) for a
+    # (n_thetas, n_reps, n_particles) batch.
     theta_particles = clamp_theta(theta_particles)
-    n_particles = theta_particles.shape[0]
+    if shape is None:
+        shape = theta_particles.shape[:-1]
     p = untransform(theta_particles)
 
     S0 = p["eta"] * N_EFF
-    I0 = p["I0"] * rng.lognormal(mean=0.0, sigma=0.15, size=n_particles)
-    A0 = np.zeros(n_particles)
+    I0 = p["I0"] * rng.lognormal(mean=0.0, sigma=0.15, size=shape)
+    A0 = np.zeros(shape)
 
-    state = np.zeros((n_particles, 3), dtype=float)
-    state[:, 0] = np.clip(S0, 0.0, N_EFF)
-    state[:, 1] = np.clip(I0, 0.0, MAX_LATENT_I)
-    state[:, 2] = A0
+    state = np.zeros(tuple(shape) + (3,), dtype=float)
+    state[..., 0] = np.clip(S0, 0.0, N_EFF)
+    state[..., 1] = np.clip(I0, 0.0, MAX_LATENT_I)
+    state[..., 2] = A0
     return state
 
 
@@ -317,12 +429,12 @@ def step_particles(state, theta_particles, t_next, rng):
     theta_particles = clamp_theta(theta_particles)
     p = untransform(theta_particles)
 
-    S = np.clip(state[:, 0], 0.0, N_EFF)
-    I = np.clip(state[:, 1], 0.0, MAX_LATENT_I)
-    A = state[:, 2].copy()
+    S = np.clip(state[..., 0], 0.0, N_EFF)
+    I = np.clip(state[..., 1], 0.0, MAX_LATENT_I)
+    A = state[..., 2].copy()
 
     if year_change[t_next] == 1:
-        A = rng.normal(loc=0.0, scale=p["sigma_A"], size=A.shape[0])
+        A = rng.normal(loc=0.0, scale=p["sigma_A"], size=A.shape)
         A = np.clip(A, -4.0, 4.0)
 
     season = seasonal_log_effect(theta_particles, t_next)
@@ -347,16 +459,16 @@ def step_particles(state, theta_particles, t_next, rng):
     S_next = np.clip(S + replenishment - I_next, 0.0, N_EFF)
 
     out = np.empty_like(state)
-    out[:, 0] = S_next
-    out[:, 1] = I_next
-    out[:, 2] = A
+    out[..., 0] = S_next
+    out[..., 1] = I_next
+    out[..., 2] = A
     return out
 
 
 def dmeasure_log(state, theta_particles, y_t):
     theta_particles = clamp_theta(theta_particles)
     p = untransform(theta_particles)
-    mu_log = np.log1p(np.maximum(state[:, 1], 0.0))
+    mu_log = np.log1p(np.maximum(state[..., 1], 0.0))
     sigma = np.maximum(p["sigma_obs"], 1e-8)
     return norm.logpdf(y_t, loc=mu_log, scale=sigma)
 
@@ -364,13 +476,577 @@ def dmeasure_log(state, theta_particles, y_t):
 def rmeasure_log(state, theta_particles, rng):
     theta_particles = clamp_theta(theta_particles)
     p = untransform(theta_particles)
-    mu_log = np.log1p(np.maximum(state[:, 1], 0.0))
+    mu_log = np.log1p(np.maximum(state[..., 1], 0.0))
     y_log = rng.normal(mu_log, np.maximum(p["sigma_obs"], 1e-8))
     y_raw_sim = np.maximum(np.expm1(y_log), 0.0)
     return y_log, y_raw_sim
 
 
-def pfilter(y_obs, theta, n_particles=600, seed=None, return_filtered=False):
+# In-place kernel. The functions below compute the same quantities as
+# untransform, step_particles, dmeasure_log and systematic_resample, but
+# write into a workspace of preallocated buffers (see make_workspace) using
+# ufunc `out=` arguments. Natural-scale parameters are held as an
+# (N_PARAMS, n_particles) array whose row i is the natural version of
+# theta[:, i], so they are computed once per step and can be permuted with
+# a single np.take on resampling. The remaining per-step allocations are
+# the Poisson draw and the searchsorted index array, which NumPy cannot
+# write into an existing buffer (see benchmark_step_kernel.py).
+NORM_LOGPDF_CONST = 0.5 * np.log(2.0 * np.pi)
+
+
+def make_workspace(n_particles):
+    def vec():
+        return np.empty(n_particles)
+
+    return {
+        "theta": np.empty((n_particles, N_PARAMS)),
+        "theta_swap": np.empty((n_particles, N_PARAMS)),
+        "noise": np.empty((n_particles, N_PARAMS)),
+        "nat": np.empty((N_PARAMS, n_particles)),
+        "nat_swap": np.empty((N_PARAMS, n_particles)),
+        "state": np.empty((n_particles, 3)),
+        "state_swap": np.empty((n_particles, 3)),
+        "S": vec(),
+        "I": vec(),
+        "A": vec(),
+        "tmp": vec(),
+        "tmp2": vec(),
+        "log_lam": vec(),
+        "log_w": vec(),
+        "w": vec(),
+        "cumsum": vec(),
+        "positions": vec(),
+        "arange": np.arange(n_particles, dtype=float),
+    }
+
+
+def sigmoid_into(x, out):
+    np.clip(x, -40, 40, out=out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)
+    out += 1.0
+    return np.divide(1.0, out, out=out)
+
+
+def untransform_into(theta_particles, ws):
+    th = ws["theta"]
+    if theta_particles is not th:
+        np.copyto(th, theta_particles)
+    # Column-wise clipping with scalar bounds; np.clip with the (N_PARAMS,)
+    # bound arrays would allocate broadcast buffers.
+    for i in range(N_PARAMS):
+        np.clip(th[:, i], THETA_LOWER[i], THETA_UPPER[i], out=th[:, i])
+    nat = ws["nat"]
+    for i in (IDX_A1, IDX_B1, IDX_A2, IDX_B2, IDX_DELTA_POST):
+        np.copyto(nat[i], th[:, i])
+    for i in (
+        IDX_LOG_BETA0,
+        IDX_LOG_NU,
+        IDX_LOG_KPROC,
+        IDX_LOG_SIGMA_A,
+        IDX_LOG_I0,
+        IDX_LOG_SIGMA_OBS,
+    ):
+        np.exp(th[:, i], out=nat[i])
+    sigmoid_into(th[:, IDX_Z_ALPHA], nat[IDX_Z_ALPHA])
+    nat[IDX_Z_ALPHA] *= 0.5
+    nat[IDX_Z_ALPHA] += 0.6
+    sigmoid_into(th[:, IDX_LOGIT_ETA], nat[IDX_LOGIT_ETA])
+    return nat
+
+
+def init_state_into(nat, rng, ws):
+    state = ws["state"]
+    tmp = ws["tmp"]
+    np.multiply(nat[IDX_LOGIT_ETA], N_EFF, out=tmp)
+    np.clip(tmp, 0.0, N_EFF, out=state[:, 0])
+    rng.standard_normal(out=tmp)
+    tmp *= 0.15
+    np.exp(tmp, out=tmp)
+    np.multiply(nat[IDX_LOG_I0], tmp, out=tmp)
+    np.clip(tmp, 0.0, MAX_LATENT_I, out=state[:, 1])
+    state[:, 2] = 0.0
+    return state
+
+
+def step_particles_into(state, nat, t_next, rng, ws):
+    # Overwrites `state` with the state at t_next.
+    S, I, A, tmp, log_lam = ws["S"], ws["I"], ws["A"], ws["tmp"], ws["log_lam"]
+    np.clip(state[:, 0], 0.0, N_EFF, out=S)
+    np.clip(state[:, 1], 0.0, MAX_LATENT_I, out=I)
+    if year_change[t_next] == 1:
+        rng.standard_normal(out=A)
+        A *= nat[IDX_LOG_SIGMA_A]
+        np.clip(A, -4.0, 4.0, out=A)
+    else:
+        np.copyto(A, state[:, 2])
+
+    # log_lam = log(beta0) + season + post_shift + A + depletion
+    #           + alpha * log1p(I), accumulated left to right.
+    np.log(nat[IDX_LOG_BETA0], out=log_lam)
+    season = ws["tmp2"]
+    np.multiply(nat[IDX_A1], SEASON_COS1[t_next], out=season)
+    np.multiply(nat[IDX_B1], SEASON_SIN1[t_next], out=tmp)
+    season += tmp
+    np.multiply(nat[IDX_A2], SEASON_COS2[t_next], out=tmp)
+    season += tmp
+    np.multiply(nat[IDX_B2], SEASON_SIN2[t_next], out=tmp)
+    season += tmp
+    log_lam += season
+    np.multiply(nat[IDX_DELTA_POST], post[t_next], out=tmp)
+    log_lam += tmp
+    log_lam += A
+    np.maximum(S, 0.0, out=tmp)
+    np.log1p(tmp, out=tmp)
+    tmp -= np.log1p(N_EFF)
+    log_lam += tmp
+    np.maximum(I, 0.0, out=tmp)
+    np.log1p(tmp, out=tmp)
+    tmp *= nat[IDX_Z_ALPHA]
+    log_lam += tmp
+    np.clip(log_lam, -20.0, np.log(MAX_POISSON_LAM), out=log_lam)
+    np.exp(log_lam, out=log_lam)
+
+    # Negative binomial draw as in sample_nb_mean_disp:
+    # Poisson(Gamma(k, mean / k)).
+    k = ws["tmp2"]
+    np.clip(nat[IDX_LOG_KPROC], 1e-10, 1e6, out=k)
+    np.clip(log_lam, 1e-10, MAX_POISSON_LAM, out=log_lam)
+    log_lam /= k
+    rng.standard_gamma(k, out=tmp)
+    tmp *= log_lam
+    np.clip(tmp, 0.0, MAX_POISSON_LAM, out=tmp)
+    np.copyto(I, rng.poisson(tmp))
+    np.clip(I, 0.0, MAX_LATENT_I, out=I)
+
+    np.divide(S, N_EFF, out=tmp)
+    np.subtract(1.0, tmp, out=tmp)
+    tmp *= nat[IDX_LOG_NU]
+    tmp += S
+    tmp -= I
+    np.clip(tmp, 0.0, N_EFF, out=state[:, 0])
+    np.copyto(state[:, 1], I)
+    np.copyto(state[:, 2], A)
+    return state
+
+
+def dmeasure_log_into(state, nat, y_t, ws):
+    log_w, tmp = ws["log_w"], ws["tmp"]
+    np.maximum(state[:, 1], 0.0, out=log_w)
+    np.log1p(log_w, out=log_w)
+    np.maximum(nat[IDX_LOG_SIGMA_OBS], 1e-8, out=tmp)
+    np.subtract(y_t, log_w, out=log_w)
+    log_w /= tmp
+    np.square(log_w, out=log_w)
+    log_w *= -0.5
+    log_w -= NORM_LOGPDF_CONST
+    np.log(tmp, out=tmp)
+    log_w -= tmp
+    return log_w
+
+
+def systematic_resample_into(w, rng, ws):
+    n = w.shape[0]
+    positions = np.add(ws["arange"], rng.uniform(), out=ws["positions"])
+    positions /= n
+    cumsum = np.cumsum(w, out=ws["cumsum"])
+    cumsum[-1] = 1.0
+    idx = np.searchsorted(cumsum, positions)
+    return np.clip(idx, 0, n - 1, out=idx)
+
+
+def resample_into(ws, idx, keys):
+    # Permutes the particle axis of each named buffer by swapping it with
+    # its preallocated twin.
+    for key in keys:
+        axis = 1 if key == "nat" else 0
+        # mode="clip" avoids the buffered copy np.take makes for out= in
+        # the default "raise" mode; idx is already within bounds.
+        np.take(ws[key], idx, axis=axis, out=ws[key + "_swap"], mode="clip")
+        ws[key], ws[key + "_swap"] = ws[key + "_swap"], ws[key]
+
+
+def weight_update_into(log_w, n_particles, ws):
+    # Returns the log-likelihood increment and the ESS, leaving the
+    # normalized weights in ws["w"]; inc is -inf when every weight is zero.
+    max_lw = np.max(log_w)
+    if not np.isfinite(max_lw):
+        return -np.inf, 0.0
+    w = ws["w"]
+    np.subtract(log_w, max_lw, out=w)
+    np.exp(w, out=w)
+    sum_w = np.sum(w)
+    inc = max_lw + np.log(sum_w) - np.log(n_particles)
+    w /= sum_w
+    np.square(w, out=ws["tmp"])
+    return inc, 1.0 / np.sum(ws["tmp"])
+
+
+FILTER_QUANTILES = (0.025, 0.5, 0.975)
+QUANTILE_METHODS = ("sort", "select", "histogram")
+
+
+def weighted_quantiles_sort(x, w, probs):
+    # Exact: the smallest x whose cumulative weight in sorted order exceeds
+    # q. O(J log J).
+    n = x.shape[0]
+    order = np.argsort(x)
+    cw = np.cumsum(w[order])
+    pos = np.minimum(np.searchsorted(cw, probs, side="right"), n - 1)
+    return x[order][pos]
+
+
+def weighted_quantiles_binned(x, w, probs, n_bins=256, exact=True):
+    # Bins the particles on the log1p scale in O(J) and locates, for each q,
+    # the bin b whose cumulative weight first exceeds q. Every particle in a
+    # lower bin precedes b in sorted order and those carry total weight <= q,
+    # so the exact weighted quantile lies in bin b.
+    #
+    # exact=True ("select"): sorts only the particles in bin b and returns
+    #   the same value as weighted_quantiles_sort, up to floating-point
+    #   summation order. Cost O(J + m log m) for m particles in the bin.
+    # exact=False ("histogram"): interpolates linearly in cumulative weight
+    #   within bin b. On the log1p scale the error is at most the bin width,
+    #   (log1p(max x) - log1p(min x)) / n_bins, i.e. a relative error in
+    #   1 + x of at most exp(width) - 1.
+    z = np.log1p(np.maximum(x, 0.0))
+    lo = np.min(z)
+    width = (np.max(z) - lo) / n_bins
+    if not width > 0.0:
+        return np.full(len(probs), x[0])
+    b_idx = np.minimum(((z - lo) / width).astype(int), n_bins - 1)
+    cum_bins = np.cumsum(np.bincount(b_idx, weights=w, minlength=n_bins))
+
+    out = np.empty(len(probs))
+    for j, q in enumerate(probs):
+        b = int(np.searchsorted(cum_bins, q, side="right"))
+        if b >= n_bins:
+            out[j] = np.max(x)
+            continue
+        below = cum_bins[b - 1] if b > 0 else 0.0
+        if exact:
+            members = np.flatnonzero(b_idx == b)
+            order = members[np.argsort(x[members])]
+            cw = below + np.cumsum(w[order])
+            pos = min(
+                int(np.searchsorted(cw, q, side="right")), len(order) - 1
+            )
+            out[j] = x[order[pos]]
+        else:
+            frac = (q - below) / (cum_bins[b] - below)
+            out[j] = np.expm1(lo + width * (b + frac))
+    return out
+
+
+def filtered_summaries(latent_I, w, quantile_method="sort"):
+    if quantile_method == "sort":
+        q_raw = weighted_quantiles_sort(latent_I, w, FILTER_QUANTILES)
+    elif quantile_method in ("select", "histogram"):
+        q_raw = weighted_quantiles_binned(
+            latent_I,
+            w,
+            FILTER_QUANTILES,
+            exact=quantile_method == "select",
+        )
+    else:
+        raise ValueError(
+            f"quantile_method must be one of {QUANTILE_METHODS}, "
+            f"got {quantile_method!r}"
+        )
+    latent_logI = np.log1p(np.maximum(latent_I, 0.0))
+    return q_raw, np.sum(w * latent_I), np.sum(w * latent_logI)
+
+
+def pfilter_into(
+    y_obs,
+    theta,
+    n_particles=600,
+    seed=None,
+    return_filtered=False,
+    quantile_method="sort",
+):
+    # pfilter on the in-place kernel. The parameters are shared by all
+    # particles, so they are untransformed once and never resampled.
+    rng = np.random.default_rng(seed)
+    ws = make_workspace(n_particles)
+    np.copyto(ws["theta"], np.asarray(theta, dtype=float))
+    nat = untransform_into(ws["theta"], ws)
+    init_state_into(nat, rng, ws)
+
+    log_lik = 0.0
+    log_lik_t = np.zeros(T)
+    ess = np.zeros(T)
+    filt_q_raw = np.zeros((T, 3)) if return_filtered else None
+    filt_mean_raw = np.zeros(T) if return_filtered else None
+    filt_mean_log = np.zeros(T) if return_filtered else None
+
+    for t in range(T):
+        log_w = dmeasure_log_into(ws["state"], nat, y_obs[t], ws)
+        inc, ess[t] = weight_update_into(log_w, n_particles, ws)
+        if not np.isfinite(inc):
+            log_lik_t[t] = -np.inf
+            log_lik = -np.inf
+            break
+        log_lik_t[t] = inc
+        log_lik += inc
+
+        if return_filtered:
+            (
+                filt_q_raw[t],
+                filt_mean_raw[t],
+                filt_mean_log[t],
+            ) = filtered_summaries(
+                ws["state"][:, 1], ws["w"], quantile_method
+            )
+
+        idx = systematic_resample_into(ws["w"], rng, ws)
+        resample_into(ws, idx, ("state",))
+
+        if t < T - 1:
+            step_particles_into(ws["state"], nat, t + 1, rng, ws)
+
+    return {
+        "log_lik": float(log_lik),
+        "log_lik_t": log_lik_t,
+        "ess": ess,
+        "filtered_q_raw": filt_q_raw,
+        "filtered_mean_raw": filt_mean_raw,
+        "filtered_mean_log": filt_mean_log,
+    }
+
+
+# Compiled backend. The whole pfilter time loop (measurement density,
+# weight normalization, systematic resampling and the state transition) is
+# fused into one numba kernel. It draws from its own random stream, so it
+# agrees with the NumPy path only within Monte Carlo error (see
+# benchmark_backends.py and test_backend_parity.py). Measured with
+# benchmark_backends.py (J=3000, T=420, 20 filters) the kernel is about
+# 2.6-3.2x faster than NumPy per pfilter call; it covers pfilter only, so
+# mif2 searches still run on NumPy. A JAX version of the same kernel was
+# no faster than NumPy on CPU (0.9-1.1x) and has been dropped. numba is
+# optional and is imported only when selected; the kernel is built once
+# per process.
+FILTER_BACKENDS = ("numpy", "numba")
+COMPILED_FILTERS = {}
+
+
+def natural_param_vector(theta):
+    nat = untransform(clamp_theta(theta))
+    return np.array([float(nat[name]) for name in PARAM_NAMES])
+
+
+def covariate_arrays():
+    return (
+        SEASON_COS1,
+        SEASON_SIN1,
+        SEASON_COS2,
+        SEASON_SIN2,
+        post,
+        year_change.astype(np.int64),
+    )
+
+
+def build_numba_filter():
+    try:
+        import numba
+    except ImportError as e:
+        raise ImportError("backend 'numba' requires the numba package") from e
+
+    log_c = NORM_LOGPDF_CONST
+
+    @numba.njit
+    def kernel(
+        y_obs,
+        nat,
+        cos1,
+        sin1,
+        cos2,
+        sin2,
+        post_,
+        year_change_,
+        n_eff,
+        max_latent_i,
+        max_lam,
+        n_particles,
+        seed,
+    ):
+        np.random.seed(seed)
+        n_t = y_obs.shape[0]
+        J = n_particles
+        log_beta0 = np.log(nat[IDX_LOG_BETA0])
+        alpha = nat[IDX_Z_ALPHA]
+        nu = nat[IDX_LOG_NU]
+        k = min(max(nat[IDX_LOG_KPROC], 1e-10), 1e6)
+        sigma_a = nat[IDX_LOG_SIGMA_A]
+        sigma = max(nat[IDX_LOG_SIGMA_OBS], 1e-8)
+        log_sigma = np.log(sigma)
+        log_max_lam = np.log(max_lam)
+        log1p_n_eff = np.log1p(n_eff)
+
+        S = np.empty(J)
+        I = np.empty(J)
+        A = np.zeros(J)
+        S2 = np.empty(J)
+        I2 = np.empty(J)
+        A2 = np.empty(J)
+        w = np.empty(J)
+        cum = np.empty(J)
+        log_lik_t = np.zeros(n_t)
+        ess = np.zeros(n_t)
+        log_lik = 0.0
+
+        s0 = min(max(nat[IDX_LOGIT_ETA] * n_eff, 0.0), n_eff)
+        for j in range(J):
+            S[j] = s0
+            i0 = nat[IDX_LOG_I0] * np.random.lognormal(0.0, 0.15)
+            I[j] = min(max(i0, 0.0), max_latent_i)
+
+        for t in range(n_t):
+            max_lw = -np.inf
+            for j in range(J):
+                z = (y_obs[t] - np.log1p(max(I[j], 0.0))) / sigma
+                w[j] = -0.5 * z * z - log_c - log_sigma
+                if w[j] > max_lw:
+                    max_lw = w[j]
+            if not np.isfinite(max_lw):
+                log_lik_t[t] = -np.inf
+                log_lik = -np.inf
+                break
+
+            sum_w = 0.0
+            for j in range(J):
+                w[j] = np.exp(w[j] - max_lw)
+                sum_w += w[j]
+            inc = max_lw + np.log(sum_w) - np.log(J)
+            log_lik_t[t] = inc
+            log_lik += inc
+
+            sum_w2 = 0.0
+            c = 0.0
+            for j in range(J):
+                wj = w[j] / sum_w
+                sum_w2 += wj * wj
+                c += wj
+                cum[j] = c
+            ess[t] = 1.0 / sum_w2
+            cum[J - 1] = 1.0
+
+            # Systematic resampling as a single merge over the sorted
+            # positions (equivalent to searchsorted with side="left").
+            u = np.random.uniform(0.0, 1.0)
+            i = 0
+            for j in range(J):
+                pos = (u + j) / J
+                while i < J - 1 and cum[i] < pos:
+                    i += 1
+                S2[j] = S[i]
+                I2[j] = I[i]
+                A2[j] = A[i]
+            S, S2 = S2, S
+            I, I2 = I2, I
+            A, A2 = A2, A
+
+            if t < n_t - 1:
+                tn = t + 1
+                base = (
+                    log_beta0
+                    + nat[IDX_A1] * cos1[tn]
+                    + nat[IDX_B1] * sin1[tn]
+                    + nat[IDX_A2] * cos2[tn]
+                    + nat[IDX_B2] * sin2[tn]
+                    + nat[IDX_DELTA_POST] * post_[tn]
+                )
+                new_year = year_change_[tn] == 1
+                for j in range(J):
+                    s = min(max(S[j], 0.0), n_eff)
+                    ii = min(max(I[j], 0.0), max_latent_i)
+                    if new_year:
+                        a = np.random.normal(0.0, sigma_a)
+                        A[j] = min(max(a, -4.0), 4.0)
+                    log_lam = (
+                        base
+                        + A[j]
+                        + np.log1p(max(s, 0.0))
+                        - log1p_n_eff
+                        + alpha * np.log1p(max(ii, 0.0))
+                    )
+                    lam = np.exp(min(max(log_lam, -20.0), log_max_lam))
+                    mean = min(max(lam, 1e-10), max_lam)
+                    g = min(max(np.random.gamma(k, mean / k), 0.0), max_lam)
+                    i_next = min(float(np.random.poisson(g)), max_latent_i)
+                    I[j] = i_next
+                    s_next = s + nu * (1.0 - s / n_eff) - i_next
+                    S[j] = min(max(s_next, 0.0), n_eff)
+
+        return log_lik, log_lik_t, ess
+
+    def run(y_obs, nat, n_particles, seed):
+        return kernel(
+            np.asarray(y_obs, dtype=float),
+            nat,
+            *covariate_arrays(),
+            N_EFF,
+            MAX_LATENT_I,
+            MAX_POISSON_LAM,
+            n_particles,
+            seed,
+        )
+
+    return run
+
+
+def pfilter_compiled(
+    y_obs, theta, n_particles=600, seed=None, backend="numba"
+):
+    if backend != "numba":
+        raise ValueError(
+            f"backend must be one of {FILTER_BACKENDS}, got {backend!r}"
+        )
+    key = ("numba",)
+    if key not in COMPILED_FILTERS:
+        COMPILED_FILTERS[key] = build_numba_filter()
+    if seed is None:
+        seed = int(np.random.default_rng().integers(2**31))
+    log_lik, log_lik_t, ess = COMPILED_FILTERS[key](
+        y_obs, natural_param_vector(theta), n_particles, int(seed)
+    )
+    return {
+        "log_lik": float(log_lik),
+        "log_lik_t": np.asarray(log_lik_t, dtype=float),
+        "ess": np.asarray(ess, dtype=float),
+        "filtered_q_raw": None,
+        "filtered_mean_raw": None,
+        "filtered_mean_log": None,
+    }
+
+
+def pfilter(
+    y_obs,
+    theta,
+    n_particles=600,
+    seed=None,
+    return_filtered=False,
+    inplace=False,
+    quantile_method="sort",
+    backend="numpy",
+):
+    # quantile_method selects the filtered-quantile estimator used when
+    # return_filtered=True; see weighted_quantiles_binned for the error
+    # bounds of "select" and "histogram". The numba backend only returns
+    # log_lik, log_lik_t and ess, so filtered summaries always use NumPy.
+    if backend != "numpy" and not return_filtered:
+        return pfilter_compiled(
+            y_obs, theta, n_particles=n_particles, seed=seed, backend=backend
+        )
+    if inplace:
+        return pfilter_into(
+            y_obs,
+            theta,
+            n_particles=n_particles,
+            seed=seed,
+            return_filtered=return_filtered,
+            quantile_method=quantile_method,
+        )
     rng = np.random.default_rng(seed)
     theta = np.asarray(theta, dtype=float)
 
@@ -403,16 +1079,11 @@ def pfilter(y_obs, theta, n_particles=600, seed=None, return_filtered=False):
         ess[t] = 1.0 / np.sum(w**2)
 
         if return_filtered:
-            latent_I = state[:, 1]
-            latent_logI = np.log1p(np.maximum(latent_I, 0.0))
-            order = np.argsort(latent_I)
-            cw = np.cumsum(w[order])
-            for j, q in enumerate((0.025, 0.5, 0.975)):
-                pos = np.searchsorted(cw, q, side="right")
-                pos = min(pos, n_particles - 1)
-                filt_q_raw[t, j] = latent_I[order][pos]
-            filt_mean_raw[t] = np.sum(w * latent_I)
-            filt_mean_log[t] = np.sum(w * latent_logI)
+            (
+                filt_q_raw[t],
+                filt_mean_raw[t],
+                filt_mean_log[t],
+            ) = filtered_summaries(state[:, 1], w, quantile_method)
 
         idx = systematic_resample(w, rng)
         state = state[idx]
@@ -431,7 +1102,31 @@ def pfilter(y_obs, theta, n_particles=600, seed=None, return_filtered=False):
     }
 
 
-def pfilter_replicated(y_obs, theta, n_particles=3000, n_reps=10, seed=None):
+def pfilter_replicated(
+    y_obs,
+    theta,
+    n_particles=3000,
+    n_reps=10,
+    seed=None,
+    inplace=False,
+    backend="numpy",
+    target_se=None,
+    budget=None,
+):
+    # With target_se set, n_particles and n_reps are only the starting point
+    # of pfilter_adaptive.
+    if target_se is not None:
+        return pfilter_adaptive(
+            y_obs,
+            theta,
+            target_se,
+            n_particles=n_particles,
+            n_reps=n_reps,
+            budget=budget,
+            seed=seed,
+            inplace=inplace,
+            backend=backend,
+        )
     rng = np.random.default_rng(seed)
     lls = np.zeros(n_reps)
     for r in range(n_reps):
@@ -440,6 +1135,8 @@ def pfilter_replicated(y_obs, theta, n_particles=3000, n_reps=10, seed=None):
             theta,
             n_particles=n_particles,
             seed=int(rng.integers(2**31)),
+            inplace=inplace,
+            backend=backend,
         )
         lls[r] = out["log_lik"]
     return {
@@ -451,28 +1148,289 @@ def pfilter_replicated(y_obs, theta, n_particles=3000, n_reps=10, seed=None):
     }
 
 
+def pfilter_adaptive(
+    y_obs,
+    theta,
+    target_se,
+    n_particles=1000,
+    n_reps=5,
+    max_particles=32000,
+    budget=None,
+    seed=None,
+    inplace=False,
+    backend="numpy",
+):
+    # Grows the filter until the replicated log-likelihood SE is at most
+    # target_se or the budget is spent. The budget counts particles summed
+    # over every filter run (default: 8 * n_particles * n_reps). Each round
+    # either doubles J, when the per-replicate SD exceeds 1 log unit (where
+    # extra particles also reduce the downward bias of log-lik estimates),
+    # or doubles the reps at the current J. Replicates at different J are
+    # not pooled, so doubling J restarts with n_reps fresh replicates.
+    if budget is None:
+        budget = 8 * n_particles * n_reps
+    rng = np.random.default_rng(seed)
+    J = n_particles
+    R = n_reps
+    lls = []
+    spent = 0
+    history = []
+    converged = False
+    while True:
+        need = R - len(lls)
+        if spent + need * J > budget:
+            break
+        for _ in range(need):
+            out = pfilter(
+                y_obs,
+                theta,
+                n_particles=J,
+                seed=int(rng.integers(2**31)),
+                inplace=inplace,
+                backend=backend,
+            )
+            lls.append(out["log_lik"])
+        spent += need * J
+        sd = float(np.std(lls, ddof=1)) if R > 1 else np.inf
+        se = float(sd / np.sqrt(R))
+        history.append(
+            {
+                "n_particles": J,
+                "n_reps": R,
+                "log_lik_mean": float(np.mean(lls)),
+                "log_lik_se": se,
+            }
+        )
+        last_lls = np.array(lls)
+        if se <= target_se:
+            converged = True
+            break
+        if sd > 1.0 and 2 * J <= max_particles:
+            J *= 2
+            R = n_reps
+            lls = []
+        else:
+            R *= 2
+
+    if not history:
+        raise ValueError(
+            f"budget={budget} is below one round of "
+            f"{n_reps} x {n_particles} particles"
+        )
+    last = history[-1]
+    return {
+        "log_lik_reps": last_lls,
+        "log_lik_mean": last["log_lik_mean"],
+        "log_lik_se": last["log_lik_se"],
+        "n_particles": last["n_particles"],
+        "n_reps": last["n_reps"],
+        "converged": converged,
+        "particles_spent": spent,
+        "history": history,
+    }
+
+
+def pfilter_batched(y_obs, thetas, n_particles=3000, n_reps=10, seed=None):
+    # Filters every (theta, rep) pair in one pass over T using a state tensor
+    # of shape (n_thetas, n_reps, n_particles, 3). Parameters are constant
+    # within a filter, so they are kept at shape (n_thetas, 1, 1, N_PARAMS)
+    # and broadcast instead of being resampled with the particles.
+    rng = np.random.default_rng(seed)
+    thetas = clamp_theta(np.atleast_2d(np.asarray(thetas, dtype=float)))
+    n_thetas = thetas.shape[0]
+    batch_shape = (n_thetas, n_reps, n_particles)
+    theta_particles = thetas[:, np.newaxis, np.newaxis, :]
+    state = init_state(theta_particles, rng, shape=batch_shape)
+
+    log_lik = np.zeros((n_thetas, n_reps))
+    log_lik_t = np.zeros((n_thetas, n_reps, T))
+    ess = np.zeros((n_thetas, n_reps, T))
+    alive = np.ones((n_thetas, n_reps), dtype=bool)
+
+    for t in range(T):
+        log_w = dmeasure_log(state, theta_particles, y_obs[t])
+        max_lw = np.max(log_w, axis=-1)
+        failed = alive & ~np.isfinite(max_lw)
+        if np.any(failed):
+            # Mirror pfilter: a failed filter records -inf at t and stops
+            # accumulating, leaving the remaining entries at zero.
+            log_lik_t[failed, t] = -np.inf
+            log_lik[failed] = -np.inf
+            alive &= ~failed
+        if not np.any(alive):
+            break
+
+        max_lw = np.where(alive, max_lw, 0.0)
+        w_unnorm = np.exp(log_w - max_lw[..., np.newaxis])
+        w_unnorm[~alive] = 1.0
+        sum_w = np.sum(w_unnorm, axis=-1)
+        inc = max_lw + np.log(sum_w) - np.log(n_particles)
+
+        log_lik_t[alive, t] = inc[alive]
+        log_lik[alive] += inc[alive]
+
+        w = w_unnorm / sum_w[..., np.newaxis]
+        ess[alive, t] = 1.0 / np.sum(w[alive] ** 2, axis=-1)
+
+        idx = systematic_resample_batched(w, rng)
+        state = np.take_along_axis(state, idx[..., np.newaxis], axis=-2)
+
+        if t < T - 1:
+            state = step_particles(state, theta_particles, t + 1, rng)
+
+    return {
+        "log_lik": log_lik,
+        "log_lik_t": log_lik_t,
+        "ess": ess,
+    }
+
+
+def pfilter_replicated_batched(
+    y_obs, thetas, n_particles=3000, n_reps=10, seed=None, max_batch=None
+):
+    # Batched counterpart of pfilter_replicated: returns one summary dict per
+    # row of `thetas`. `max_batch` caps the number of thetas filtered together
+    # to bound the size of the state tensor.
+    thetas = np.atleast_2d(np.asarray(thetas, dtype=float))
+    n_thetas = thetas.shape[0]
+    if max_batch is None:
+        max_batch = n_thetas
+    rng = np.random.default_rng(seed)
+    lls = np.zeros((n_thetas, n_reps))
+    for start in range(0, n_thetas, max(int(max_batch), 1)):
+        stop = min(start + max(int(max_batch), 1), n_thetas)
+        out = pfilter_batched(
+            y_obs,
+            thetas[start:stop],
+            n_particles=n_particles,
+            n_reps=n_reps,
+            seed=int(rng.integers(2**31)),
+        )
+        lls[start:stop] = out["log_lik"]
+    return [
+        {
+            "log_lik_reps": lls[i],
+            "log_lik_mean": float(np.mean(lls[i])),
+            "log_lik_se": float(np.std(lls[i], ddof=1) / np.sqrt(n_reps))
+            if n_reps > 1
+            else 0.0,
+        }
+        for i in range(n_thetas)
+    ]
+
+
 def simulate_from_model(theta, n_sims=100, seed=None):
     rng = np.random.default_rng(seed)
     theta = clamp_theta(theta)
     sims_raw = np.zeros((n_sims, T), dtype=float)
     sims_log = np.zeros((n_sims, T), dtype=float)
 
-    for s in range(n_sims):
-        theta_particles = theta[np.newaxis, :].copy()
-        state = init_state(theta_particles, rng)
-        y_log0, y_raw0 = rmeasure_log(state, theta_particles, rng)
-        sims_log[s, 0] = y_log0[0]
-        sims_raw[s, 0] = y_raw0[0]
+    # The replicates play the role of the particle axis, so all simulations
+    # advance together through step_particles and rmeasure_log.
+    theta_particles = theta[np.newaxis, :]
+    state = init_state(theta_particles, rng, shape=(n_sims,))
+    sims_log[:, 0], sims_raw[:, 0] = rmeasure_log(state, theta_particles, rng)
 
-        for t in range(1, T):
-            state = step_particles(state, theta_particles, t, rng)
-            y_log_t, y_raw_t = rmeasure_log(state, theta_particles, rng)
-            sims_log[s, t] = y_log_t[0]
-            sims_raw[s, t] = y_raw_t[0]
+    for t in range(1, T):
+        state = step_particles(state, theta_particles, t, rng)
+        sims_log[:, t], sims_raw[:, t] = rmeasure_log(
+            state, theta_particles, rng
+        )
 
     return {"raw": sims_raw, "log": sims_log}
 
 
+# Streaming IF2 traces. Each chain's trace is a memory-mapped .npy of shape
+# (n_iterations + 1, len(TRACE_COLUMNS)), preallocated with NaN and written
+# one row per iteration, so a killed chain keeps its history and other
+# processes can read a running chain with load_trace. Row 0 holds the
+# starting theta; log_lik is NaN there. Thetas are on the estimation
+# (transformed) scale, in PARAM_NAMES order.
+TRACE_COLUMNS = ("iteration", "log_lik") + tuple(PARAM_NAMES)
+
+
+def open_trace_sink(path, n_iterations, theta_start):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sink = np.lib.format.open_memmap(
+        path,
+        mode="w+",
+        dtype=float,
+        shape=(n_iterations + 1, len(TRACE_COLUMNS)),
+    )
+    sink[:] = np.nan
+    write_trace_row(sink, 0, np.nan, theta_start)
+    return sink
+
+
+def write_trace_row(sink, iteration, log_lik, theta):
+    sink[iteration, 2:] = theta
+    sink[iteration, 1] = log_lik
+    # The iteration column is written last so readers can treat a non-NaN
+    # iteration as a complete row.
+    sink[iteration, 0] = iteration
+    sink.flush()
+
+
+def load_trace(path):
+    # Returns the rows written so far, also while the chain is running.
+    arr = np.load(path, mmap_mode="r")
+    done = ~np.isnan(arr[:, 0])
+    return pd.DataFrame(np.array(arr[done]), columns=TRACE_COLUMNS)
+
+
+def print_if2_progress(m, n_iterations, ll_m, theta):
+    nat = untransform(theta)
+    print(
+        f"iter {m + 1:3d}/{n_iterations}  "
+        f"loglik={ll_m:11.2f}  "
+        f"beta0={nat['beta0']:.3f}  "
+        f"alpha={nat['alpha']:.3f}  "
+        f"nu={nat['nu']:.1f}  "
+        f"k_proc={nat['k_proc']:.3f}  "
+        f"sigma_A={nat['sigma_A']:.3f}  "
+        f"sigma_obs={nat['sigma_obs']:.3f}  "
+        f"eta={nat['eta']:.3f}  "
+        f"I0={nat['I0']:.1f}"
+    )
+
+
+def if2_pass_into(y_obs, theta, sd_m, rng, ws, fixed_indices, fixed_values):
+    # One IF2 filtering pass on the in-place kernel. Returns the pass
+    # log-likelihood and the final (resampled) parameter particles.
+    n_particles = ws["theta"].shape[0]
+    noise = ws["noise"]
+
+    def perturb(base):
+        rng.standard_normal(out=noise)
+        np.multiply(noise, sd_m, out=noise)
+        np.add(base, noise, out=ws["theta"])
+        if fixed_indices.size > 0:
+            ws["theta"][:, fixed_indices] = fixed_values
+        return untransform_into(ws["theta"], ws)
+
+    nat = perturb(theta[np.newaxis, :])
+    init_state_into(nat, rng, ws)
+
+    ll_m = 0.0
+    for t in range(T):
+        nat = perturb(ws["theta"])
+        log_w = dmeasure_log_into(ws["state"], nat, y_obs[t], ws)
+        inc, _ = weight_update_into(log_w, n_particles, ws)
+        if not np.isfinite(inc):
+            ll_m = -np.inf
+            break
+        ll_m += inc
+
+        idx = systematic_resample_into(ws["w"], rng, ws)
+        resample_into(ws, idx, ("state", "theta", "nat"))
+
+        if t < T - 1:
+            step_particles_into(ws["state"], ws["nat"], t + 1, rng, ws)
+
+    return ll_m, ws["theta"]
+
+
 def mif2(
     y_obs,
     theta_start,
@@ -484,9 +1442,12 @@ def mif2(
     verbose=True,
     fixed_indices=None,
     fixed_values=None,
+    inplace=False,
+    trace_path=None,
 ):
     rng = np.random.default_rng(seed)
     theta = clamp_theta(np.asarray(theta_start, dtype=float).copy())
+    ws = make_workspace(n_particles) if inplace else None
 
     if rw_sd is None:
         rw_sd = default_rw_sd()
@@ -510,6 +1471,9 @@ def mif2(
     log_liks = np.zeros(n_iterations)
     theta_trace = np.zeros((n_iterations + 1, N_PARAMS))
     theta_trace[0] = theta
+    sink = None
+    if trace_path is not None:
+        sink = open_trace_sink(trace_path, n_iterations, theta)
 
     for m in range(n_iterations):
         cool = cooling ** (m / max(n_iterations - 1, 1))
@@ -518,56 +1482,51 @@ def mif2(
             sd_m = sd_m.copy()
             sd_m[fixed_indices] = 0.0
 
-        theta_particles = theta[np.newaxis, :] + rng.normal(
-            0.0, sd_m, size=(n_particles, N_PARAMS)
-        )
-        theta_particles = apply_fixed(theta_particles)
-        state = init_state(theta_particles, rng)
-
-        ll_m = 0.0
-        for t in range(T):
-            theta_particles = theta_particles + rng.normal(
-                0.0, sd_m, size=theta_particles.shape
+        if inplace:
+            ll_m, theta_particles = if2_pass_into(
+                y_obs, theta, sd_m, rng, ws, fixed_indices, fixed_values
+            )
+        else:
+            theta_particles = theta[np.newaxis, :] + rng.normal(
+                0.0, sd_m, size=(n_particles, N_PARAMS)
             )
             theta_particles = apply_fixed(theta_particles)
-
-            log_w = dmeasure_log(state, theta_particles, y_obs[t])
-            max_lw = np.max(log_w)
-            if not np.isfinite(max_lw):
-                ll_m = -np.inf
-                break
-
-            w_unnorm = np.exp(log_w - max_lw)
-            sum_w = np.sum(w_unnorm)
-            inc = max_lw + np.log(sum_w) - np.log(n_particles)
-            ll_m += inc
-
-            w = w_unnorm / sum_w
-            idx = systematic_resample(w, rng)
-            state = state[idx]
-            theta_particles = theta_particles[idx]
-
-            if t < T - 1:
-                state = step_particles(state, theta_particles, t + 1, rng)
+            state = init_state(theta_particles, rng)
+
+            ll_m = 0.0
+            for t in range(T):
+                theta_particles = theta_particles + rng.normal(
+                    0.0, sd_m, size=theta_particles.shape
+                )
+                theta_particles = apply_fixed(theta_particles)
+
+                log_w = dmeasure_log(state, theta_particles, y_obs[t])
+                max_lw = np.max(log_w)
+                if not np.isfinite(max_lw):
+                    ll_m = -np.inf
+                    break
+
+                w_unnorm = np.exp(log_w - max_lw)
+                sum_w = np.sum(w_unnorm)
+                inc = max_lw + np.log(sum_w) - np.log(n_particles)
+                ll_m += inc
+
+                w = w_unnorm / sum_w
+                idx = systematic_resample(w, rng)
+                state = state[idx]
+                theta_particles = theta_particles[idx]
+
+                if t < T - 1:
+                    state = step_particles(state, theta_particles, t + 1, rng)
 
         theta = apply_fixed(np.mean(theta_particles, axis=0))
         log_liks[m] = ll_m
         theta_trace[m + 1] = theta
+        if sink is not None:
+            write_trace_row(sink, m + 1, ll_m, theta)
 
         if verbose:
-            nat = untransform(theta)
-            print(
-                f"iter {m + 1:3d}/{n_iterations}  "
-                f"loglik={ll_m:11.2f}  "
-                f"beta0={nat['beta0']:.3f}  "
-                f"alpha={nat['alpha']:.3f}  "
-                f"nu={nat['nu']:.1f}  "
-                f"k_proc={nat['k_proc']:.3f}  "
-                f"sigma_A={nat['sigma_A']:.3f}  "
-                f"sigma_obs={nat['sigma_obs']:.3f}  "
-                f"eta={nat['eta']:.3f}  "
-                f"I0={nat['I0']:.1f}"
-            )
+            print_if2_progress(m, n_iterations, ll_m, theta)
 
     best_iter = int(np.nanargmax(log_liks))
     theta_best_if2 = theta_trace[1 + best_iter].copy()
@@ -637,45 +1596,317 @@ def random_theta0(rng):
     )
 
 
+def top_trace_indices(fit, top_k=5):
+    ord_idx = np.argsort(fit["log_liks"])[::-1]
+    return ord_idx[: min(top_k, len(ord_idx))]
+
+
+def trace_candidate_row(fit, rank, idx, rep):
+    theta_cand = fit["theta_trace"][1:][idx]
+    nat = untransform(theta_cand)
+    return {
+        "trace_rank": rank,
+        "iter": int(idx + 1),
+        "if2_loglik": float(fit["log_liks"][idx]),
+        "rep_loglik": float(rep["log_lik_mean"]),
+        "rep_se": float(rep["log_lik_se"]),
+        "beta0": float(nat["beta0"]),
+        "delta_post": float(nat["delta_post"]),
+        "alpha": float(nat["alpha"]),
+        "nu": float(nat["nu"]),
+        "k_proc": float(nat["k_proc"]),
+        "sigma_A": float(nat["sigma_A"]),
+        "eta": float(nat["eta"]),
+        "I0": float(nat["I0"]),
+        "sigma_obs": float(nat["sigma_obs"]),
+        "theta": theta_cand.copy(),
+    }
+
+
 def evaluate_trace_candidates(
-    y_obs, fit, top_k=5, n_particles=3000, n_reps=10, seed=1
+    y_obs,
+    fit,
+    top_k=5,
+    n_particles=3000,
+    n_reps=10,
+    seed=1,
+    inplace=False,
+    backend="numpy",
+    target_se=None,
+    budget=None,
 ):
-    log_liks = fit["log_liks"]
     trace = fit["theta_trace"][1:]
-    ord_idx = np.argsort(log_liks)[::-1]
-    keep = ord_idx[: min(top_k, len(ord_idx))]
+    keep = top_trace_indices(fit, top_k)
 
     rows = []
     for rank, idx in enumerate(keep, start=1):
-        theta_cand = trace[idx]
         rep = pfilter_replicated(
             y_obs,
-            theta_cand,
+            trace[idx],
             n_particles=n_particles,
             n_reps=n_reps,
             seed=seed + rank,
+            inplace=inplace,
+            backend=backend,
+            target_se=target_se,
+            budget=budget,
         )
-        nat = untransform(theta_cand)
-        rows.append(
+        rows.append(trace_candidate_row(fit, rank, idx, rep))
+    return pd.DataFrame(rows)
+
+
+def evaluate_trace_candidates_batched(
+    y_obs, fits, top_k=5, n_particles=3000, n_reps=10, seed=1, max_batch=None
+):
+    # Scores the top trace points of every fit with a single batched filter
+    # sweep instead of one pfilter_replicated call per candidate.
+    picks = []
+    for j, fit in enumerate(fits):
+        for rank, idx in enumerate(top_trace_indices(fit, top_k), start=1):
+            picks.append((j, rank, idx))
+    thetas = np.array(
+        [fits[j]["theta_trace"][1:][idx] for j, _, idx in picks]
+    )
+    reps = pfilter_replicated_batched(
+        y_obs,
+        thetas,
+        n_particles=n_particles,
+        n_reps=n_reps,
+        seed=seed,
+        max_batch=max_batch,
+    )
+    frames = [[] for _ in fits]
+    for (j, rank, idx), rep in zip(picks, reps):
+        frames[j].append(trace_candidate_row(fits[j], rank, idx, rep))
+    return [pd.DataFrame(rows) for rows in frames]
+
+
+# Stage checkpoints. Each finished IF2 chain, candidate table and profile
+# point is written to its own .npz under a directory keyed by a hash of the
+# run arguments and the data file, so --resume only reuses results that
+# were produced from identical inputs.
+CHECKPOINT_IGNORED_ARGS = (
+    "data",
+    "outdir",
+    "resume",
+    "workers",
+    "verbose_if2",
+    "trace_dir",
+    "inplace_kernel",
+    "quantile_method",
+)
+
+
+def checkpoint_dir_for(args, outdir):
+    payload = {
+        k: v
+        for k, v in vars(args).items()
+        if k not in CHECKPOINT_IGNORED_ARGS
+    }
+    h = hashlib.sha256(json.dumps(payload, sort_keys=True).encode())
+    h.update(Path(args.data).read_bytes())
+    return Path(outdir) / "checkpoints" / h.hexdigest()[:16]
+
+
+def save_npz_atomic(path, **arrays):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def save_fit(path, fit):
+    save_npz_atomic(
+        path,
+        **{
+            k: fit[k]
+            for k in (
+                "theta",
+                "theta_best_if2",
+                "best_iter",
+                "log_liks",
+                "theta_trace",
+                "wall_time",
+            )
+        },
+    )
+
+
+def load_fit(path):
+    with np.load(path) as z:
+        fit = {k: z[k] for k in z.files}
+    fit["best_iter"] = int(fit["best_iter"])
+    fit["wall_time"] = float(fit["wall_time"])
+    return fit
+
+
+def load_profile_point(path):
+    with np.load(path) as z:
+        row = {k: float(z[k]) for k in z.files if k != "theta"}
+        return row, z["theta"].copy()
+
+
+def save_frame_npz(path, df):
+    # Candidate tables hold a "theta" column of arrays, which is stored as
+    # one stacked matrix next to the scalar columns.
+    arrays = {"columns": np.array(df.columns, dtype=str)}
+    for col in df.columns:
+        if col == "theta":
+            arrays["col_theta"] = np.vstack(df["theta"].to_list())
+        else:
+            arrays[f"col_{col}"] = df[col].to_numpy()
+    save_npz_atomic(path, **arrays)
+
+
+def load_frame_npz(path):
+    with np.load(path) as z:
+        cols = [str(c) for c in z["columns"]]
+        data = {c: z[f"col_{c}"] for c in cols}
+    data["theta"] = list(data["theta"])
+    return pd.DataFrame(data, columns=cols)
+
+
+def cached_frame(path, resume, compute):
+    if path is not None and resume and path.exists():
+        print(f"[checkpoint] loaded {path.name}", flush=True)
+        return load_frame_npz(path)
+    df = compute()
+    if path is not None:
+        save_frame_npz(path, df)
+    return df
+
+
+COVARIATE_GLOBALS = (
+    "SEASON_COS1",
+    "SEASON_SIN1",
+    "SEASON_COS2",
+    "SEASON_SIN2",
+    "post",
+    "year_change",
+    "YEAR",
+    "MONTH",
+    "N_EFF",
+    "MAX_NU",
+    "MAX_LATENT_I",
+    "MAX_POISSON_LAM",
+    "y_raw",
+    "y",
+    "T",
+    "THETA_LOWER",
+    "THETA_UPPER",
+)
+
+
+def covariate_state():
+    return {name: globals()[name] for name in COVARIATE_GLOBALS}
+
+
+def init_worker(state):
+    # Worker processes do not necessarily inherit the module globals set by
+    # initialize_covariates (e.g. under the spawn start method).
+    globals().update(state)
+
+
+def run_if2_chain(task):
+    t0 = time.time()
+    fit = mif2(task["y_obs"], task["theta0"], **task["mif2_kwargs"])
+    fit["wall_time"] = time.time() - t0
+    return task["chain_id"], fit
+
+
+def run_if2_chains(
+    y_obs,
+    theta0s,
+    seeds,
+    workers=1,
+    label="IF2",
+    checkpoint_dir=None,
+    resume=False,
+    trace_dir=None,
+    **mif2_kwargs,
+):
+    # Runs one mif2 chain per (theta0, seed) pair. Seeds are drawn by the
+    # caller before any chain starts, so the output does not depend on the
+    # number of workers or on completion order. With checkpoint_dir set,
+    # each finished chain is saved as it completes and, with resume=True,
+    # chains already on disk are loaded instead of rerun. With trace_dir set,
+    # each chain streams its per-iteration trace to
+    # trace_dir/<label>_chain_<j>_trace.npy (see open_trace_sink).
+    n_chains = len(theta0s)
+    fits = [None] * n_chains
+
+    def chain_path(j):
+        if checkpoint_dir is None:
+            return None
+        return Path(checkpoint_dir) / f"{label}_chain_{j:03d}.npz"
+
+    tasks = []
+    for j, (theta0, chain_seed) in enumerate(zip(theta0s, seeds)):
+        path = chain_path(j)
+        if resume and path is not None and path.exists():
+            fits[j] = load_fit(path)
+            continue
+        chain_kwargs = dict(mif2_kwargs, seed=int(chain_seed))
+        if trace_dir is not None:
+            chain_kwargs["trace_path"] = (
+                Path(trace_dir) / f"{label}_chain_{j:03d}_trace.npy"
+            )
+        tasks.append(
             {
-                "trace_rank": rank,
-                "iter": int(idx + 1),
-                "if2_loglik": float(log_liks[idx]),
-                "rep_loglik": float(rep["log_lik_mean"]),
-                "rep_se": float(rep["log_lik_se"]),
-                "beta0": float(nat["beta0"]),
-                "delta_post": float(nat["delta_post"]),
-                "alpha": float(nat["alpha"]),
-                "nu": float(nat["nu"]),
-                "k_proc": float(nat["k_proc"]),
-                "sigma_A": float(nat["sigma_A"]),
-                "eta": float(nat["eta"]),
-                "I0": float(nat["I0"]),
-                "sigma_obs": float(nat["sigma_obs"]),
-                "theta": theta_cand.copy(),
+                "chain_id": j,
+                "y_obs": y_obs,
+                "theta0": theta0,
+                "mif2_kwargs": chain_kwargs,
             }
         )
-    return pd.DataFrame(rows)
+    if len(tasks) < n_chains:
+        print(
+            f"[{label}] loaded {n_chains - len(tasks)}/{n_chains} chains "
+            "from checkpoint",
+            flush=True,
+        )
+    if not tasks:
+        return fits
+
+    # per-chain progress only where it adds something: the serial default
+    # path prints nothing beyond mif2's own verbose output
+    show_progress = (workers is not None and workers > 1) or mif2_kwargs.get(
+        "verbose", False
+    )
+
+    def report(done, chain_id, fit):
+        if chain_path(chain_id) is not None:
+            save_fit(chain_path(chain_id), fit)
+        if not show_progress:
+            return
+        print(
+            f"[{label}] chain {chain_id + 1}/{n_chains} done "
+            f"({done}/{len(tasks)})  "
+            f"best_loglik={np.max(fit['log_liks']):11.2f}  "
+            f"wall={fit['wall_time']:.1f}s",
+            flush=True,
+        )
+
+    if workers is None or workers <= 1:
+        for done, task in enumerate(tasks, start=1):
+            chain_id, fit = run_if2_chain(task)
+            fits[chain_id] = fit
+            report(done, chain_id, fit)
+        return fits
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        initializer=init_worker,
+        initargs=(covariate_state(),),
+    ) as pool:
+        futures = [pool.submit(run_if2_chain, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            chain_id, fit = future.result()
+            fits[chain_id] = fit
+            report(done, chain_id, fit)
+    return fits
 
 
 def run_global_search(
@@ -687,22 +1918,37 @@ def run_global_search(
     rw_sd=None,
     seed=123,
     verbose=False,
+    workers=1,
+    inplace=False,
+    checkpoint_dir=None,
+    resume=False,
+    trace_dir=None,
 ):
     rng = np.random.default_rng(seed)
+    theta0s = []
+    seeds = []
+    for s in range(n_starts):
+        theta0s.append(random_theta0(rng))
+        seeds.append(int(rng.integers(2**31)))
+    chain_fits = run_if2_chains(
+        y_obs,
+        theta0s,
+        seeds,
+        workers=workers,
+        label="global",
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        trace_dir=trace_dir,
+        n_iterations=n_iterations,
+        n_particles=n_particles,
+        rw_sd=rw_sd,
+        cooling=cooling,
+        verbose=verbose,
+        inplace=inplace,
+    )
     fits = []
     summary_rows = []
-    for s in range(n_starts):
-        theta0 = random_theta0(rng)
-        fit = mif2(
-            y_obs,
-            theta0,
-            n_iterations=n_iterations,
-            n_particles=n_particles,
-            rw_sd=rw_sd,
-            cooling=cooling,
-            seed=int(rng.integers(2**31)),
-            verbose=verbose,
-        )
+    for s, (theta0, fit) in enumerate(zip(theta0s, chain_fits)):
         fit["theta0"] = theta0
         fit["start_id"] = s
         fits.append(fit)
@@ -729,18 +1975,52 @@ def run_global_search(
 
 
 def gather_global_candidates(
-    y_obs, fits, top_trace_per_fit=3, rep_particles=3000, rep_reps=10, seed=100
+    y_obs,
+    fits,
+    top_trace_per_fit=3,
+    rep_particles=3000,
+    rep_reps=10,
+    seed=100,
+    batched=False,
+    max_batch=None,
+    inplace=False,
+    backend="numpy",
+    target_se=None,
+    budget=None,
 ):
-    cand_frames = []
-    for j, fit in enumerate(fits):
-        df = evaluate_trace_candidates(
+    # The batched evaluator scores every candidate with a fixed particle
+    # count; adaptive allocation (target_se/budget) is per-candidate only.
+    if batched and (target_se is not None or budget is not None):
+        raise ValueError(
+            "target_se/budget are not supported with batched=True"
+        )
+    if batched:
+        dfs = evaluate_trace_candidates_batched(
             y_obs,
-            fit,
+            fits,
             top_k=top_trace_per_fit,
             n_particles=rep_particles,
             n_reps=rep_reps,
-            seed=seed + 50 * j,
+            seed=seed,
+            max_batch=max_batch,
         )
+    cand_frames = []
+    for j, fit in enumerate(fits):
+        if batched:
+            df = dfs[j]
+        else:
+            df = evaluate_trace_candidates(
+                y_obs,
+                fit,
+                top_k=top_trace_per_fit,
+                n_particles=rep_particles,
+                n_reps=rep_reps,
+                seed=seed + 50 * j,
+                inplace=inplace,
+                backend=backend,
+                target_se=target_se,
+                budget=budget,
+            )
         fit_id = fit.get("start_id", fit.get("local_id", j))
         df["start_id"] = fit_id
         cand_frames.append(df)
@@ -760,27 +2040,141 @@ def run_local_refinement(
     rw_sd=None,
     seed=456,
     verbose=False,
+    workers=1,
+    inplace=False,
+    checkpoint_dir=None,
+    resume=False,
+    trace_dir=None,
 ):
     rng = np.random.default_rng(seed)
     if rw_sd is None:
         rw_sd = 0.5 * default_rw_sd()
+    seeds = [int(rng.integers(2**31)) for _ in candidate_thetas]
+    chain_fits = run_if2_chains(
+        y_obs,
+        candidate_thetas,
+        seeds,
+        workers=workers,
+        label="local",
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        trace_dir=trace_dir,
+        n_iterations=n_iterations,
+        n_particles=n_particles,
+        rw_sd=rw_sd,
+        cooling=cooling,
+        verbose=verbose,
+        inplace=inplace,
+    )
     fits = []
-    for j, theta0 in enumerate(candidate_thetas):
+    for j, (theta0, fit) in enumerate(zip(candidate_thetas, chain_fits)):
+        fit["local_id"] = j
+        fit["start_id"] = j
+        fit["theta0"] = theta0
+        fits.append(fit)
+    return fits
+
+
+def profile_point(
+    y_obs,
+    theta_center,
+    val,
+    seed,
+    n_restarts=5,
+    n_iterations=40,
+    n_particles=1000,
+    rw_sd=None,
+    cooling=0.3,
+    rep_particles=3000,
+    rep_reps=10,
+    inplace=False,
+    backend="numpy",
+    target_se=None,
+    budget=None,
+):
+    # Returns the profile row and the trace candidate theta behind it, which
+    # warm-started neighbours use as their starting point.
+    rng = np.random.default_rng(seed)
+    best_rep = -np.inf
+    best_se = np.nan
+    best_theta = np.asarray(theta_center, dtype=float).copy()
+    for _ in range(n_restarts):
+        theta_start = theta_center.copy()
+        theta_start[IDX_DELTA_POST] = val
+        theta_start = clamp_theta(
+            theta_start + rng.normal(0.0, 0.1 * rw_sd, size=N_PARAMS)
+        )
+        theta_start[IDX_DELTA_POST] = val
+
         fit = mif2(
             y_obs,
-            theta0,
+            theta_start,
             n_iterations=n_iterations,
             n_particles=n_particles,
             rw_sd=rw_sd,
             cooling=cooling,
             seed=int(rng.integers(2**31)),
-            verbose=verbose,
+            verbose=False,
+            fixed_indices=[IDX_DELTA_POST],
+            fixed_values=[val],
+            inplace=inplace,
         )
-        fit["local_id"] = j
-        fit["start_id"] = j
-        fit["theta0"] = theta0
-        fits.append(fit)
-    return fits
+        cand = evaluate_trace_candidates(
+            y_obs,
+            fit,
+            top_k=3,
+            n_particles=rep_particles,
+            n_reps=rep_reps,
+            seed=int(rng.integers(2**31)),
+            inplace=inplace,
+            backend=backend,
+            target_se=target_se,
+            budget=budget,
+        )
+        row = cand.iloc[0]
+        if row["rep_loglik"] > best_rep:
+            best_rep = row["rep_loglik"]
+            best_se = row["rep_se"]
+            best_theta = row["theta"].copy()
+    return {
+        "delta_post": float(val),
+        "profile_loglik": float(best_rep),
+        "rep_se": float(best_se),
+    }, best_theta
+
+
+def run_profile_branch(task):
+    # Runs a sequence of grid points. With warm_start, every point after the
+    # first starts from the previous point's best theta and runs only
+    # warm_iterations IF2 iterations (a continuation along the grid).
+    theta_start = task["theta_center"]
+    results = []
+    for k, (i, val, point_seed) in enumerate(task["points"]):
+        path = None
+        if task["checkpoint_dir"] is not None:
+            path = Path(task["checkpoint_dir"]) / f"profile_point_{i:03d}.npz"
+        if path is not None and task["resume"] and path.exists():
+            row, theta_best = load_profile_point(path)
+        else:
+            point_kwargs = dict(task["point_kwargs"])
+            if task["warm_start"] and k > 0:
+                point_kwargs["n_iterations"] = task["warm_iterations"]
+            t0 = time.time()
+            row, theta_best = profile_point(
+                task["y_obs"], theta_start, val, point_seed, **point_kwargs
+            )
+            if path is not None:
+                save_npz_atomic(path, theta=theta_best, **row)
+            print(
+                f"[profile] point {i + 1} delta_post={val:.3f}  "
+                f"loglik={row['profile_loglik']:11.2f}  "
+                f"wall={time.time() - t0:.1f}s",
+                flush=True,
+            )
+        results.append((i, row))
+        if task["warm_start"]:
+            theta_start = theta_best
+    return results
 
 
 def profile_delta_post(
@@ -795,54 +2189,102 @@ def profile_delta_post(
     rep_particles=3000,
     rep_reps=10,
     seed=999,
+    inplace=False,
+    checkpoint_dir=None,
+    resume=False,
+    workers=1,
+    warm_start=False,
+    warm_iterations=None,
+    warm_segments=2,
+    backend="numpy",
+    target_se=None,
+    budget=None,
 ):
-    rng = np.random.default_rng(seed)
-    rows = []
+    # Each grid point draws from its own child seed, so a point's result
+    # does not depend on which other points were computed in this run or on
+    # the number of workers.
+    #
+    # Without warm_start every grid point is an independent task. With
+    # warm_start the grid is split at the point nearest theta_center into an
+    # ascending and a descending branch, and these into warm_segments
+    # contiguous segments in total (at least one per branch). Every segment
+    # starts cold from theta_center with n_iterations at its innermost point
+    # and continues outwards, each point starting from its inner neighbour's
+    # best theta with warm_iterations (default n_iterations // 2). Segments
+    # are the parallel tasks, so warm_segments caps the useful workers; the
+    # result depends on warm_segments but not on workers.
     if rw_sd is None:
         rw_sd = 0.5 * default_rw_sd()
-
-    for val in grid:
-        best_rep = -np.inf
-        best_se = np.nan
-        for _ in range(n_restarts):
-            theta_start = theta_center.copy()
-            theta_start[IDX_DELTA_POST] = val
-            theta_start = clamp_theta(
-                theta_start + rng.normal(0.0, 0.1 * rw_sd, size=N_PARAMS)
+    if warm_iterations is None:
+        warm_iterations = max(1, n_iterations // 2)
+    grid = np.asarray(grid, dtype=float)
+    point_seeds = np.random.SeedSequence(seed).spawn(len(grid))
+    points = list(zip(range(len(grid)), grid, point_seeds))
+
+    if warm_start:
+        anchor = int(np.argmin(np.abs(grid - theta_center[IDX_DELTA_POST])))
+        branches = [points[anchor:], points[:anchor][::-1]]
+        branches = [b for b in branches if b]
+        n_segments = [1] * len(branches)
+        for _ in range(max(int(warm_segments), len(branches)) - len(branches)):
+            # next segment goes to the branch with the longest segments
+            j = max(
+                range(len(branches)),
+                key=lambda b: len(branches[b]) / n_segments[b],
             )
-            theta_start[IDX_DELTA_POST] = val
+            if len(branches[j]) <= n_segments[j]:
+                break
+            n_segments[j] += 1
+        segments = []
+        for branch, n in zip(branches, n_segments):
+            for idx in np.array_split(np.arange(len(branch)), n):
+                segments.append(branch[idx[0] : idx[-1] + 1])
+        branches = segments
+    else:
+        branches = [[pt] for pt in points]
+
+    point_kwargs = {
+        "n_restarts": n_restarts,
+        "n_iterations": n_iterations,
+        "n_particles": n_particles,
+        "rw_sd": rw_sd,
+        "cooling": cooling,
+        "rep_particles": rep_particles,
+        "rep_reps": rep_reps,
+        "inplace": inplace,
+        "backend": backend,
+        "target_se": target_se,
+        "budget": budget,
+    }
+    tasks = [
+        {
+            "y_obs": y_obs,
+            "theta_center": np.asarray(theta_center, dtype=float),
+            "points": branch,
+            "point_kwargs": point_kwargs,
+            "warm_start": warm_start,
+            "warm_iterations": warm_iterations,
+            "checkpoint_dir": checkpoint_dir,
+            "resume": resume,
+        }
+        for branch in branches
+    ]
 
-            fit = mif2(
-                y_obs,
-                theta_start,
-                n_iterations=n_iterations,
-                n_particles=n_particles,
-                rw_sd=rw_sd,
-                cooling=cooling,
-                seed=int(rng.integers(2**31)),
-                verbose=False,
-                fixed_indices=[IDX_DELTA_POST],
-                fixed_values=[val],
-            )
-            cand = evaluate_trace_candidates(
-                y_obs,
-                fit,
-                top_k=3,
-                n_particles=rep_particles,
-                n_reps=rep_reps,
-                seed=int(rng.integers(2**31)),
-            )
-            row = cand.iloc[0]
-            if row["rep_loglik"] > best_rep:
-                best_rep = row["rep_loglik"]
-                best_se = row["rep_se"]
-        rows.append(
-            {
-                "delta_post": float(val),
-                "profile_loglik": float(best_rep),
-                "rep_se": float(best_se),
-            }
-        )
+    rows = [None] * len(grid)
+    if workers is None or workers <= 1:
+        for task in tasks:
+            for i, row in run_profile_branch(task):
+                rows[i] = row
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=init_worker,
+            initargs=(covariate_state(),),
+        ) as pool:
+            futures = [pool.submit(run_profile_branch, t) for t in tasks]
+            for future in as_completed(futures):
+                for i, row in future.result():
+                    rows[i] = row
     return pd.DataFrame(rows)
 
 
@@ -1018,6 +2460,11 @@ def main():
     with open(outdir / "run_config.json", "w") as f:
         json.dump(vars(args), f, indent=2)
 
+    ckpt_dir = None
+    if args.resume:
+        ckpt_dir = checkpoint_dir_for(args, outdir)
+        ckpt_dir.mkdir(parents=True, exist_ok=True)
+
     theta0 = transform(
         beta0=4.0,
         a1=0.60,
@@ -1050,17 +2497,32 @@ def main():
         rw_sd=global_rw_sd,
         seed=args.seed,
         verbose=args.verbose_if2,
+        workers=args.workers,
+        inplace=args.inplace_kernel,
+        checkpoint_dir=ckpt_dir,
+        resume=args.resume,
+        trace_dir=args.trace_dir,
     )
     global_summary.to_csv(outdir / "global_summary.csv", index=False)
     save_global_hist(global_summary, outdir)
 
-    global_candidates = gather_global_candidates(
-        y,
-        global_fits,
-        top_trace_per_fit=args.top_trace_per_fit,
-        rep_particles=args.rep_particles,
-        rep_reps=args.rep_reps,
-        seed=args.seed + 505,
+    global_candidates = cached_frame(
+        None if ckpt_dir is None else ckpt_dir / "global_candidates.npz",
+        args.resume,
+        lambda: gather_global_candidates(
+            y,
+            global_fits,
+            top_trace_per_fit=args.top_trace_per_fit,
+            rep_particles=args.rep_particles,
+            rep_reps=args.rep_reps,
+            seed=args.seed + 505,
+            batched=args.batched_eval,
+            max_batch=args.eval_max_batch,
+            inplace=args.inplace_kernel,
+            backend=args.backend,
+            target_se=args.rep_target_se,
+            budget=args.rep_budget,
+        ),
     )
     global_candidates_for_csv = global_candidates.copy()
     global_candidates_for_csv["theta"] = global_candidates_for_csv[
@@ -1081,15 +2543,30 @@ def main():
         rw_sd=local_rw_sd,
         seed=args.seed + 909,
         verbose=args.verbose_if2,
+        workers=args.workers,
+        inplace=args.inplace_kernel,
+        checkpoint_dir=ckpt_dir,
+        resume=args.resume,
+        trace_dir=args.trace_dir,
     )
 
-    local_candidates = gather_global_candidates(
-        y,
-        local_fits,
-        top_trace_per_fit=max(5, args.top_trace_per_fit),
-        rep_particles=args.rep_particles,
-        rep_reps=args.rep_reps,
-        seed=args.seed + 1111,
+    local_candidates = cached_frame(
+        None if ckpt_dir is None else ckpt_dir / "local_candidates.npz",
+        args.resume,
+        lambda: gather_global_candidates(
+            y,
+            local_fits,
+            top_trace_per_fit=max(5, args.top_trace_per_fit),
+            rep_particles=args.rep_particles,
+            rep_reps=args.rep_reps,
+            seed=args.seed + 1111,
+            batched=args.batched_eval,
+            max_batch=args.eval_max_batch,
+            inplace=args.inplace_kernel,
+            backend=args.backend,
+            target_se=args.rep_target_se,
+            budget=args.rep_budget,
+        ),
     )
     local_candidates_for_csv = local_candidates.copy()
     local_candidates_for_csv["theta"] = local_candidates_for_csv[
@@ -1115,6 +2592,10 @@ def main():
         n_particles=args.rep_particles,
         n_reps=args.rep_reps,
         seed=99,
+        inplace=args.inplace_kernel,
+        backend=args.backend,
+        target_se=args.rep_target_se,
+        budget=args.rep_budget,
     )
     out_hat = pfilter(
         y,
@@ -1122,6 +2603,8 @@ def main():
         n_particles=args.filter_particles,
         seed=321,
         return_filtered=True,
+        inplace=args.inplace_kernel,
+        quantile_method=args.quantile_method,
     )
     save_ess_plots(dat, out_hat, outdir)
 
@@ -1204,6 +2687,16 @@ def main():
             rep_particles=args.rep_particles,
             rep_reps=args.rep_reps,
             seed=args.seed + 1500,
+            inplace=args.inplace_kernel,
+            backend=args.backend,
+            target_se=args.rep_target_se,
+            budget=args.rep_budget,
+            checkpoint_dir=ckpt_dir,
+            resume=args.resume,
+            workers=args.workers,
+            warm_start=args.profile_warm_start,
+            warm_iterations=args.profile_warm_iters,
+            warm_segments=args.profile_warm_segments,
         )
         profile_df.to_csv(outdir / "profile_delta_post.csv", index=False)
         save_profile_plot(profile_df, outdir)
@@ -0,0 +1,33 @@
+"""Seeded parity test for the numba pfilter backend.
+
+The numba kernel draws from its own random stream, so single filters do not
+match the NumPy path. With fixed seeds the mean log-likelihood over a batch
+of filters is deterministic and must agree with the NumPy mean within
+Z_TOL combined Monte Carlo standard errors.
+
+Run from this directory with `python -m pytest test_backend_parity.py`.
+"""
+
+from pathlib import Path
+
+import pytest
+
+import benchmark_backends as bb
+import poliopomp_robust as pr
+
+pytest.importorskip("numba")
+
+DATA = Path(__file__).parent / "data" / "aggregated_monthly_polio_1930_1964.csv"
+N_PARTICLES = 1000
+N_REPS = 10
+SEED = 1
+Z_TOL = 3.0
+
+
+def test_numba_matches_numpy():
+    pr.initialize_covariates(pr.load_monthly_data(str(DATA)))
+    theta = bb.reference_theta()
+    ref = bb.run_backend("numpy", theta, N_PARTICLES, N_REPS, SEED)
+    res = bb.run_backend("numba", theta, N_PARTICLES, N_REPS, SEED)
+    assert abs(bb.parity_z(res, ref)) < Z_TOL
+    assert res["se"] < 3 * ref["se"]